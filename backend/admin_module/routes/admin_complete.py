@@ -16,6 +16,7 @@ from shared.models.coworking_user import CoworkingUser
 from shared.models.coworkingspacelisting import CoworkingSpaceListing
 from admin_module.auth.admin_auth import get_current_admin_user
 from app.auth import verify_password, create_access_token
+from app.utils.counters import read_counters
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -77,27 +78,19 @@ def get_dashboard_stats(
 ):
     """Get admin dashboard statistics"""
     
-    # Count all users
-    total_employers = db.query(Employer).count()
-    total_employees = db.query(Employee).count()
-    total_coworking_users = db.query(CoworkingUser).count()
-    
-    # Count coworking spaces
-    total_coworking_spaces = db.query(CoworkingSpaceListing).count()
-    verified_spaces = db.query(CoworkingSpaceListing).filter(
-        CoworkingSpaceListing.is_verified == True
-    ).count()
-    pending_spaces = db.query(CoworkingSpaceListing).filter(
-        CoworkingSpaceListing.is_verified == False
-    ).count()
+    # Counters are kept current on write; one indexed read instead of six table counts
+    counters = {name: int(value) for name, value in read_counters(db, "global", 0).items()}
+    total_employers = counters.get("employers", 0)
+    total_employees = counters.get("employees", 0)
+    total_coworking_users = counters.get("coworking_users", 0)
     
     return {
         "total_employers": total_employers,
         "total_employees": total_employees,
         "total_coworking_users": total_coworking_users,
-        "total_coworking_spaces": total_coworking_spaces,
-        "verified_spaces": verified_spaces,
-        "pending_spaces": pending_spaces,
+        "total_coworking_spaces": counters.get("spaces", 0),
+        "verified_spaces": counters.get("verified_spaces", 0),
+        "pending_spaces": counters.get("pending_spaces", 0),
         "total_users": total_employers + total_employees + total_coworking_users
     }
 
@@ -8,6 +8,28 @@ class Settings(BaseSettings):
     USE_FAKE_GEOCODING: bool = False
     GOOGLE_MAPS_API_KEY: str = "placeholder-google-maps-key"  # ✅ Added for geocoding support
     STRIPE_SECRET_KEY: str = "placeholder-stripe-key"  # ✅ Added for Stripe payment processing
+    GOOGLE_MAPS_BASE_URL: str = "https://maps.googleapis.com/maps/api"
+    MAPS_HTTP_TIMEOUT_SECONDS: float = 10.0  # Per-call timeout for the async Maps client
+    MAPS_HTTP_MAX_CONNECTIONS: int = 20
+    MAPS_HTTP_RETRIES: int = 3
+    TRAVEL_TIME_CACHE_TTL_SECONDS: int = 24 * 3600
+    TRAVEL_TIME_CACHE_MAX_ENTRIES: int = 100000
+    TRAVEL_TIME_MAX_CONCURRENT_BATCHES: int = 4  # Distance Matrix calls in flight per travel-time lookup
+    GEOCODE_CACHE_PATH: str = "geocode_cache.db"  # Local SQLite file for the persistent geocode cache
+    GEOCODE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    GEOCODE_CACHE_NEGATIVE_TTL_SECONDS: int = 3600  # How long an address with no geocoding result is remembered
+    GEOCODE_CACHE_MAX_ENTRIES: int = 50000
+    GEOCODE_CACHE_TOUCH_INTERVAL_SECONDS: int = 3600  # A cache hit records its use at most this often
+    GEOCODE_BULK_RATE_PER_SECOND: float = 40.0  # Stay under Google's 50 QPS geocoding limit
+    GEOCODE_BULK_CONCURRENCY: int = 10
+    GEOCODE_BULK_BATCH_SIZE: int = 200  # Rows geocoded and committed per checkpoint
+    PROXIMITY_TOP_K: int = 20  # Nearest spaces kept per employee in employee_space_proximity
+    PROXIMITY_BACKGROUND_UPDATES: bool = True  # False = recompute employee_space_proximity inside the committing request
+    BOOKING_OPEN_ENDED_HORIZON_DAYS: int = 365  # Days a proposed booking without an end date is checked ahead, at least
+    SPATIAL_INDEX_ENABLED: bool = True  # False = answer radius searches with a SQL bounding-box query
+    SPATIAL_INDEX_RESYNC_SECONDS: int = 300  # Reload the nearby-space index to pick up writes from other servers
+    THUMBNAIL_WORKERS: int = 2  # Processes generating thumbnails for uploaded coworking images
+    MAX_IMAGE_UPLOAD_BYTES: int = 25 * 1024 * 1024  # Larger image uploads are rejected while streaming
 
     class Config:
         env_file = ".env"
@@ -3,6 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.routes import admin
 from employer_module.routes import employer, employee
+from coworking_module.routes import images
+# Keep derived tables current on writes, including deletes that cascade to bookings
+from app.utils.listeners import register_listeners, shutdown_listeners
+register_listeners()
+from app.utils.geocode import geocode_cache, maps_client
 # Coworking routes removed - use main_coworking.py for coworking server
 
 # Import all models to ensure SQLAlchemy can establish relationships
@@ -42,13 +47,33 @@ app.include_router(employee.router, prefix="/employee")
 # Use main_employer.py for employer server (port 8000)
 # Use main_coworking.py for coworking server (port 8001)
 
+# Ahead of the /uploads mount: thumbnails are served as AVIF / WebP when the client accepts them
+app.include_router(images.router)
+
 # Mount static files for image serving
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("shutdown")
+async def close_maps_client():
+    # Release pooled Google Maps connections
+    await maps_client.aclose()
+    print(f"📊 Geocode cache: {geocode_cache.stats()}")
+    # Apply derived-table updates still queued by committed writes
+    shutdown_listeners()
+
 @app.get("/")
 def root():
     return {"message": "SecondHire API is running"}
 
+@app.get("/health")
+def health_check():
+    return {
+        "status": "healthy",
+        "service": "running",
+        # Hit/miss counters of this process's geocode cache
+        "geocode_cache": geocode_cache.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
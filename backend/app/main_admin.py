@@ -39,8 +39,13 @@ from shared.models.employee import Employee
 from shared.models.coworking_user import CoworkingUser
 from shared.models.coworkingspacelisting import CoworkingSpaceListing
 
+# Keep derived tables current on writes, including deletes that cascade to bookings
+from app.utils.listeners import register_listeners, shutdown_listeners
+register_listeners()
+
 # Import admin routes (independent module)
 from admin_module.routes import admin_complete
+from coworking_module.routes import images
 
 app = FastAPI(
     title="Remoty - Admin API",
@@ -75,9 +80,17 @@ app.add_middleware(
 # ✅ Include admin routes
 app.include_router(admin_complete.router)
 
+# Ahead of the /uploads mount: thumbnails are served as AVIF / WebP when the client accepts them
+app.include_router(images.router)
+
 # ✅ Mount static files for admin uploads
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("shutdown")
+def stop_listeners():
+    # Apply derived-table updates still queued by committed writes
+    shutdown_listeners()
+
 @app.get("/")
 def root():
     return {
@@ -32,8 +32,13 @@ from shared.models.coworkingspacelisting import CoworkingSpaceListing
 from shared.models.coworking_images import CoworkingImage
 from shared.models.booking import CoworkingBooking
 
+# Keep derived tables current on writes, including deletes that cascade to bookings
+from app.utils.listeners import register_listeners, shutdown_listeners
+register_listeners()
+
 # Import complete coworking routes (independent module)
-from coworking_module.routes import coworking_complete
+from coworking_module.routes import coworking_complete, images
+from coworking_module.utils import thumbnail_jobs
 
 app = FastAPI(
     title="Remoty - Coworking API",
@@ -67,10 +72,23 @@ app.add_middleware(
 
 # ✅ Include complete coworking routes
 app.include_router(coworking_complete.router, prefix="/coworking")
+# Ahead of the /uploads mount: thumbnails are served as AVIF / WebP when the client accepts them
+app.include_router(images.router)
 
 # ✅ Mount static files for image serving
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("startup")
+def resume_thumbnail_jobs():
+    # Thumbnail jobs live in memory; pick up images a restart left pending
+    thumbnail_jobs.requeue_pending()
+
+@app.on_event("shutdown")
+def stop_thumbnail_workers():
+    thumbnail_jobs.shutdown()
+    # Apply derived-table updates still queued by committed writes
+    shutdown_listeners()
+
 @app.get("/")
 def root():
     return {
@@ -41,6 +41,10 @@ from shared.models.employer import Employer
 from shared.models.coworkingspacelisting import CoworkingSpaceListing
 from shared.models.booking import CoworkingBooking
 
+# Keep derived tables current on writes, including deletes that cascade to bookings
+from app.utils.listeners import register_listeners, shutdown_listeners
+register_listeners()
+
 # Import complete employee routes (independent module)
 from employee_module.routes import employee_complete
 
@@ -77,6 +81,11 @@ app.add_middleware(
 # ✅ Include complete employee routes
 app.include_router(employee_complete.router)
 
+@app.on_event("shutdown")
+def stop_listeners():
+    # Apply derived-table updates still queued by committed writes
+    shutdown_listeners()
+
 @app.get("/")
 def root():
     return {
@@ -23,10 +23,16 @@ Handles all employer-related functionality without coworking dependencies
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
 # Import only employer-related routes
 from app.routes import admin
 from employer_module.routes import employer, employee
+from coworking_module.routes import images
+# Keep derived tables current on writes, including deletes that cascade to bookings
+from app.utils.listeners import register_listeners, shutdown_listeners
+register_listeners()
+from app.utils.geocode import geocode_cache, maps_client
 
 app = FastAPI(
     title="Remoty - Employer API",
@@ -61,6 +67,18 @@ app.include_router(employer.router)
 app.include_router(admin.router, prefix="/admin")
 app.include_router(employee.router, prefix="/employee")
 
+# Booking details link coworking images on this server; thumbnails are negotiated ahead of the /uploads mount
+app.include_router(images.router)
+app.mount("/uploads", StaticFiles(directory="uploads", check_dir=False), name="uploads")
+
+@app.on_event("shutdown")
+async def close_maps_client():
+    # Release pooled Google Maps connections
+    await maps_client.aclose()
+    print(f"📊 Geocode cache: {geocode_cache.stats()}")
+    # Apply derived-table updates still queued by committed writes
+    shutdown_listeners()
+
 @app.get("/")
 def root():
     return {
@@ -79,7 +97,9 @@ def health_check():
     return {
         "status": "healthy",
         "module": "employer",
-        "service": "running"
+        "service": "running",
+        # Hit/miss counters of this process's geocode cache
+        "geocode_cache": geocode_cache.stats()
     }
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -7,6 +7,7 @@ from datetime import date, datetime
 class CoworkingBookingCreate(BaseModel):
     employee_id: Optional[int] = None  # Optional for employer self-bookings
     coworking_space_id: int
+    package_id: Optional[str] = None  # Package in the space's packages JSON; counts against its capacity
     booking_type: str  # 'one-time' or 'subscription'
     start_date: date
     end_date: Optional[date] = None  # Optional if ongoing
@@ -25,6 +26,13 @@ class CoworkingBookingCreate(BaseModel):
         from_attributes = True
 
 
+# ✅ Bulk booking schema (one transaction and one payment intent for a team)
+class BulkCoworkingBookingCreate(BaseModel):
+    bookings: List[CoworkingBookingCreate] = Field(..., min_length=1, max_length=500)
+    currency: str = "usd"
+    partial: bool = False  # Book the valid rows and report the rest instead of rejecting the batch
+
+
 # ✅ Booking update schema (used for PUT – no employee_id or coworking_space_id)
 class CoworkingBookingUpdate(BaseModel):
     booking_type: str
@@ -41,6 +49,20 @@ class CoworkingBookingUpdate(BaseModel):
         from_attributes = True
 
 
+# ✅ Proposed booking for a conflict check (nothing is saved)
+class BookingProposal(BaseModel):
+    employee_id: Optional[int] = None  # None checks the employer's own calendar
+    coworking_space_id: Optional[int] = None
+    start_date: date
+    end_date: Optional[date] = None  # Open-ended when omitted
+    days_of_week: Optional[str] = None  # e.g. 'mon,wed'; omit for every day
+
+
+# ✅ Bulk conflict check schema (used for team-wide scheduling)
+class BookingConflictCheck(BaseModel):
+    bookings: List[BookingProposal] = Field(..., min_length=1, max_length=500)
+
+
 # ✅ Booking List View Schema
 class BookingListItem(BaseModel):
     id: int
@@ -0,0 +1,316 @@
+"""
+Booking conflict engine.
+
+Every coworking booking is expanded into the calendar days it actually
+occupies - the days between start_date and end_date that fall on one of its
+days_of_week - and stored in booking_days. A conflict check is then an index
+seek on (employee_id, day), or (employer_id, employee_id, day) for employer
+self-bookings, over the proposed date range: O(log n) in the number of stored
+days plus the days actually returned. Because only booked weekdays are
+stored, a Mon/Wed booking never collides with a Tue/Thu one.
+
+Rows are written in the same transaction as the booking through a session
+after_flush listener, so they can never disagree with committed bookings.
+
+Bookings without an end date have no end to expand to, so they get no day
+rows: their range stays on the booking itself (start_date, end_date NULL)
+and a check expands them over just the days it looks at, through the
+(employee_id, start_date) / (employer_id, start_date) booking indexes. A
+proposed open-ended booking is checked from its start through
+BOOKING_OPEN_ENDED_HORIZON_DAYS days, or through the owner's last booked
+day if that is later, so no stored booking is missed however far ahead it
+lies. The days reported for such a clash stop at that same point.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from shared.models.booking import CoworkingBooking
+from shared.models.booking_day import BookingDay
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+ALL_WEEKDAYS = frozenset(range(7))
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+# Columns that change which days a booking occupies, or whose they are
+_TRACKED_ATTRS = ("employer_id", "employee_id", "start_date", "end_date", "days_of_week")
+
+
+def parse_days_of_week(value: Optional[str]) -> frozenset:
+    """Weekday numbers (Mon=0) in a "mon,wed" / "Mon,Wed,Fri" / "monday" string; empty means every day"""
+    if not value:
+        return ALL_WEEKDAYS
+    days = frozenset(
+        WEEKDAYS.index(token[:3]) for token in (part.strip().lower() for part in value.split(","))
+        if token[:3] in WEEKDAYS
+    )
+    return days or ALL_WEEKDAYS
+
+
+def booking_dates(start_date: Optional[date], end_date: Optional[date], days_of_week: Optional[str],
+                  until: Optional[date] = None) -> List[date]:
+    """
+    Calendar days a booking occupies, in order.
+
+    A booking without an end date is expanded through until, or through
+    BOOKING_OPEN_ENDED_HORIZON_DAYS days from its start.
+    """
+    if start_date is None:
+        return []
+    if end_date is None:
+        end_date = until or start_date + timedelta(days=settings.BOOKING_OPEN_ENDED_HORIZON_DAYS - 1)
+    weekdays = parse_days_of_week(days_of_week)
+    return [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+        if (start_date + timedelta(days=offset)).weekday() in weekdays
+    ]
+
+
+def owner_key(employer_id: int, employee_id: Optional[int]) -> Tuple[str, int]:
+    """Whose calendar a booking lands on: the employee's, or the employer's own when there is no employee"""
+    if employee_id is not None:
+        return ("employee", employee_id)
+    return ("employer", employer_id)
+
+
+def _chunks(ids: List[int]):
+    for i in range(0, len(ids), _CHUNK_SIZE):
+        yield ids[i:i + _CHUNK_SIZE]
+
+
+def occupied_days(db: Session, owners: Iterable[Tuple[str, int]], first_day: date, last_day: date,
+                  exclude_booking_id: Optional[int] = None) -> Dict[Tuple[str, int], Dict[date, List[int]]]:
+    """{owner: {day: [booking ids]}} for the stored days of the given owners between two dates"""
+    employee_ids = sorted({owner_id for kind, owner_id in owners if kind == "employee"})
+    employer_ids = sorted({owner_id for kind, owner_id in owners if kind == "employer"})
+
+    queries = []
+    for chunk in _chunks(employee_ids):
+        queries.append(("employee", db.query(BookingDay.employee_id, BookingDay.day, BookingDay.booking_id).filter(
+            BookingDay.employee_id.in_(chunk)
+        )))
+    for chunk in _chunks(employer_ids):
+        queries.append(("employer", db.query(BookingDay.employer_id, BookingDay.day, BookingDay.booking_id).filter(
+            BookingDay.employer_id.in_(chunk),
+            BookingDay.employee_id.is_(None)
+        )))
+
+    days = defaultdict(lambda: defaultdict(list))
+    for kind, query in queries:
+        query = query.filter(BookingDay.day >= first_day, BookingDay.day <= last_day)
+        if exclude_booking_id is not None:
+            query = query.filter(BookingDay.booking_id != exclude_booking_id)
+        for owner_id, day, booking_id in query:
+            days[(kind, owner_id)][day].append(booking_id)
+
+    # Open-ended bookings have no day rows; expand them over the window
+    for booking in _open_ended_bookings(db, employee_ids, employer_ids, last_day, exclude_booking_id):
+        owner_days = days[owner_key(booking.employer_id, booking.employee_id)]
+        for day in booking_dates(max(booking.start_date, first_day), last_day, booking.days_of_week):
+            if booking.id not in owner_days[day]:
+                owner_days[day].append(booking.id)
+    return days
+
+
+def _open_ended_bookings(db: Session, employee_ids: List[int], employer_ids: List[int], last_day: date,
+                         exclude_booking_id: Optional[int] = None) -> List[CoworkingBooking]:
+    """Bookings without an end date of the given owners that start by last_day"""
+    columns = (
+        CoworkingBooking.id, CoworkingBooking.employer_id, CoworkingBooking.employee_id,
+        CoworkingBooking.start_date, CoworkingBooking.days_of_week
+    )
+    queries = [
+        db.query(*columns).filter(CoworkingBooking.employee_id.in_(chunk)) for chunk in _chunks(employee_ids)
+    ] + [
+        db.query(*columns).filter(CoworkingBooking.employer_id.in_(chunk), CoworkingBooking.employee_id.is_(None))
+        for chunk in _chunks(employer_ids)
+    ]
+
+    bookings = []
+    for query in queries:
+        query = query.filter(
+            CoworkingBooking.end_date.is_(None),
+            CoworkingBooking.start_date.isnot(None),
+            CoworkingBooking.start_date <= last_day
+        )
+        if exclude_booking_id is not None:
+            query = query.filter(CoworkingBooking.id != exclude_booking_id)
+        bookings.extend(query.all())
+    return bookings
+
+
+def _open_ended_until(db: Session, owners: Iterable[Tuple[str, int]], start_date: date) -> date:
+    """How far to expand a proposed open-ended booking: the horizon, or the owners' last booked day if later"""
+    until = start_date + timedelta(days=settings.BOOKING_OPEN_ENDED_HORIZON_DAYS - 1)
+    employee_ids = sorted({owner_id for kind, owner_id in owners if kind == "employee"})
+    employer_ids = sorted({owner_id for kind, owner_id in owners if kind == "employer"})
+    for chunk in _chunks(employee_ids):
+        last_day = db.query(func.max(BookingDay.day)).filter(BookingDay.employee_id.in_(chunk)).scalar()
+        until = max(until, last_day or until)
+    for chunk in _chunks(employer_ids):
+        last_day = db.query(func.max(BookingDay.day)).filter(
+            BookingDay.employer_id.in_(chunk), BookingDay.employee_id.is_(None)
+        ).scalar()
+        until = max(until, last_day or until)
+    return until
+
+
+def _conflicts_on(dates: List[date], booked: Dict[date, List[int]]) -> Dict[int, List[date]]:
+    conflicts = defaultdict(list)
+    for day in dates:
+        for booking_id in booked.get(day, ()):
+            conflicts[booking_id].append(day)
+    return dict(conflicts)
+
+
+def find_conflicts(db: Session, employer_id: int, employee_id: Optional[int], start_date: date,
+                   end_date: Optional[date], days_of_week: Optional[str] = None,
+                   exclude_booking_id: Optional[int] = None) -> Dict[int, List[date]]:
+    """Existing bookings that share at least one occupied day with the proposed one: {booking_id: [days]}"""
+    owner = owner_key(employer_id, employee_id)
+    until = _open_ended_until(db, [owner], start_date) if start_date and end_date is None else None
+    dates = booking_dates(start_date, end_date, days_of_week, until)
+    if not dates:
+        return {}
+    booked = occupied_days(db, [owner], dates[0], dates[-1], exclude_booking_id)
+    return _conflicts_on(dates, booked.get(owner, {}))
+
+
+def check_proposals(db: Session, employer_id: int, proposals: List[dict]) -> List[dict]:
+    """
+    Conflict report for a batch of proposed bookings, in input order.
+
+    Each proposal is a dict with employee_id (None for a self-booking),
+    start_date, end_date and days_of_week. Proposals are checked against
+    stored bookings and against each other with one query per 500 owners.
+    """
+    owners = [owner_key(employer_id, proposal.get("employee_id")) for proposal in proposals]
+    expanded = [
+        booking_dates(
+            proposal["start_date"], proposal.get("end_date"), proposal.get("days_of_week"),
+            _open_ended_until(db, [owner], proposal["start_date"]) if proposal.get("end_date") is None else None
+        )
+        for proposal, owner in zip(proposals, owners)
+    ]
+
+    all_dates = [day for dates in expanded for day in dates]
+    booked = occupied_days(db, set(owners), min(all_dates), max(all_dates)) if all_dates else {}
+
+    # Which proposals claim each owner's day, to catch clashes inside the batch
+    claimed = defaultdict(lambda: defaultdict(list))
+    for index, (owner, dates) in enumerate(zip(owners, expanded)):
+        for day in dates:
+            claimed[owner][day].append(index)
+
+    results = []
+    for index, (proposal, owner, dates) in enumerate(zip(proposals, owners, expanded)):
+        conflicts = _conflicts_on(dates, booked.get(owner, {}))
+        batch_conflicts = sorted({
+            other for day in dates for other in claimed[owner][day] if other != index
+        })
+        results.append({
+            "index": index,
+            "employee_id": proposal.get("employee_id"),
+            "start_date": proposal["start_date"].isoformat(),
+            "end_date": proposal["end_date"].isoformat() if proposal.get("end_date") else None,
+            "has_conflict": bool(conflicts or batch_conflicts),
+            "conflicts": [
+                {"booking_id": booking_id, "dates": [day.isoformat() for day in days]}
+                for booking_id, days in sorted(conflicts.items())
+            ],
+            "batch_conflicts": batch_conflicts
+        })
+    return results
+
+
+def first_come_overlaps(employer_id: int, proposals: List[dict], candidates: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Resolve clashes inside a batch in input order: {index: [earlier indexes it overlaps]}.
+
+    Only the candidate proposals take part. Each one keeps its days unless
+    they overlap days already kept by an earlier candidate, in which case it
+    is reported instead, so of two overlapping rows the first one wins.
+    Ongoing proposals (is_ongoing) keep their days and are never reported,
+    as conflict checks skip ongoing bookings.
+    """
+    kept = defaultdict(dict)
+    overlaps = {}
+    for index in sorted(candidates):
+        proposal = proposals[index]
+        owner = owner_key(employer_id, proposal.get("employee_id"))
+        dates = booking_dates(proposal["start_date"], proposal.get("end_date"), proposal.get("days_of_week"))
+        clashes = sorted({kept[owner][day] for day in dates if day in kept[owner]})
+        if clashes and not proposal.get("is_ongoing"):
+            overlaps[index] = clashes
+            continue
+        for day in dates:
+            kept[owner].setdefault(day, index)
+    return overlaps
+
+
+def _day_rows(booking) -> List[dict]:
+    if booking.end_date is None:
+        # Open-ended bookings are expanded when checked instead
+        return []
+    return [
+        {
+            "booking_id": booking.id,
+            "employer_id": booking.employer_id,
+            "employee_id": booking.employee_id,
+            "day": day
+        }
+        for day in booking_dates(booking.start_date, booking.end_date, booking.days_of_week)
+    ]
+
+
+def rebuild(db: Session) -> int:
+    """Recompute booking_days for every booking; does not commit. Returns the number of day rows written."""
+    db.query(BookingDay).delete(synchronize_session=False)
+    written = 0
+    for booking in db.query(CoworkingBooking).yield_per(_CHUNK_SIZE):
+        rows = _day_rows(booking)
+        if rows:
+            db.execute(BookingDay.__table__.insert(), rows)
+            written += len(rows)
+    return written
+
+
+# ===== TABLE MAINTENANCE =====
+
+def _occupancy_changed(booking) -> bool:
+    state = inspect(booking)
+    return any(getattr(state.attrs, attr).history.has_changes() for attr in _TRACKED_ATTRS)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_booking_days(session, flush_context):
+    """Rewrite the day rows of bookings created, changed or deleted in this flush, in the same transaction"""
+    stale = set()
+    fresh = []
+    for obj in session.new:
+        if isinstance(obj, CoworkingBooking) and obj.id is not None:
+            fresh.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, CoworkingBooking) and obj.id is not None and _occupancy_changed(obj):
+            stale.add(obj.id)
+            fresh.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, CoworkingBooking) and obj.id is not None:
+            stale.add(obj.id)
+
+    if not (stale or fresh):
+        return
+
+    connection = session.connection()
+    for chunk in _chunks(sorted(stale)):
+        connection.execute(BookingDay.__table__.delete().where(BookingDay.booking_id.in_(chunk)))
+    rows = [row for booking in fresh for row in _day_rows(booking)]
+    if rows:
+        connection.execute(BookingDay.__table__.insert(), rows)
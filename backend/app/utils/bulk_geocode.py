@@ -0,0 +1,220 @@
+"""
+Bulk geocoding for employee and employer addresses.
+
+Rows with missing coordinates, (0, 0), the city-centre placeholders the
+old employer registration stored, or an address that changed since it was
+last geocoded are geocoded concurrently through the persistent geocode
+cache. Each row keeps the address key its coordinates came from in
+geocoded_address, so a changed address no longer matches it. Identical addresses are looked up once, Maps calls
+are rate limited, and each batch of rows is committed before its last id is
+written to an optional checkpoint file, keyed by target and employer, so an
+interrupted run resumes where it stopped instead of starting over.
+"""
+import asyncio
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.geocode import GOOGLE_MAPS_API_KEY, async_geocode_address
+from app.utils.geocode_cache import normalize_address
+from app.utils.maps_client import AsyncMapsClient, AsyncRateLimiter
+from shared.database import SessionLocal
+from shared.models.employee import Employee
+from shared.models.employer import Employer
+from shared.models.employer_employee import EmployerEmployee
+
+# Coordinates register_employer used to store instead of geocoding
+LEGACY_EMPLOYER_COORDINATES = [
+    (31.5204, 74.3587),  # Lahore (also the default for every other city)
+    (24.8607, 67.0011),  # Karachi
+    (33.6844, 73.0479),  # Islamabad
+]
+
+TARGETS = ("employers", "employees")
+
+ADDRESS_FIELDS = ("address", "city", "state", "zip_code", "country")
+
+
+def _missing_coordinates(model):
+    return or_(
+        model.latitude.is_(None),
+        model.longitude.is_(None),
+        and_(model.latitude == 0, model.longitude == 0)
+    )
+
+
+def _address_key_column(model):
+    """SQL form of address_key(); fields a model lacks count as empty"""
+    parts = [func.coalesce(getattr(model, field), "") if hasattr(model, field) else "" for field in ADDRESS_FIELDS]
+    key = parts[0]
+    for part in parts[1:]:
+        key = key + "|" + part
+    return key
+
+
+def _address_changed(model):
+    return or_(model.geocoded_address.is_(None), model.geocoded_address != _address_key_column(model))
+
+
+def address_key(row) -> str:
+    """The address fields of an employee or employer row as stored in geocoded_address"""
+    return "|".join(getattr(row, field, None) or "" for field in ADDRESS_FIELDS)
+
+
+def pending_query(db: Session, target: str, employer_id: Optional[int] = None):
+    """Rows of one target ('employers' or 'employees') whose coordinates need geocoding, ordered by id"""
+    if target == "employers":
+        query = db.query(Employer).filter(or_(
+            _missing_coordinates(Employer),
+            _address_changed(Employer),
+            *[
+                and_(Employer.latitude == lat, Employer.longitude == lon)
+                for lat, lon in LEGACY_EMPLOYER_COORDINATES
+            ]
+        ))
+        if employer_id is not None:
+            query = query.filter(Employer.id == employer_id)
+        return query.order_by(Employer.id)
+
+    if target == "employees":
+        query = db.query(Employee).filter(or_(_missing_coordinates(Employee), _address_changed(Employee)))
+        if employer_id is not None:
+            query = query.join(EmployerEmployee, EmployerEmployee.employee_id == Employee.id).filter(
+                EmployerEmployee.employer_id == employer_id
+            )
+        return query.order_by(Employee.id)
+
+    raise ValueError(f"Unknown geocoding target: {target}")
+
+
+def full_address(row) -> str:
+    """Address string sent to the geocoder for an employee or employer row"""
+    parts = [row.address, row.city, getattr(row, "state", None), row.zip_code, row.country]
+    return ", ".join(part.strip() for part in parts if part and part.strip())
+
+
+async def geocode_unique(addresses: Iterable[str], client: AsyncMapsClient, concurrency: int) -> Dict[str, Tuple]:
+    """
+    Geocode each distinct address once.
+
+    Returns {normalized address: (lat, lon)}; (None, None) marks a failure.
+    """
+    unique = {}
+    for address in addresses:
+        unique.setdefault(normalize_address(address), address)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(address):
+        async with semaphore:
+            try:
+                return await async_geocode_address(address, client)
+            except Exception as e:
+                print(f"❌ Error geocoding {address}: {e}")
+                return None, None
+
+    results = await asyncio.gather(*[lookup(address) for address in unique.values()])
+    return dict(zip(unique.keys(), results))
+
+
+def checkpoint_key(target: str, employer_id: Optional[int]) -> str:
+    """Progress is kept per scope, so a run for one employer never skips rows of another"""
+    return f"{target}:{'all' if employer_id is None else employer_id}"
+
+
+def load_checkpoint(path: Optional[str]) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: Optional[str], checkpoint: dict):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+async def run_bulk_geocode(
+    db: Session,
+    targets: Iterable[str] = TARGETS,
+    employer_id: Optional[int] = None,
+    batch_size: int = settings.GEOCODE_BULK_BATCH_SIZE,
+    rate_per_second: float = settings.GEOCODE_BULK_RATE_PER_SECOND,
+    concurrency: int = settings.GEOCODE_BULK_CONCURRENCY,
+    checkpoint_path: Optional[str] = None
+) -> dict:
+    """
+    Geocode every pending row of the given targets, batch by batch.
+
+    Database work runs in a worker thread so the event loop keeps serving
+    requests when this is used as a background task. Rows that still fail
+    keep their old coordinates and are counted as failed. The checkpoint
+    file is removed once every target has finished; a leftover entry for
+    another employer is never read by this run.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    client = AsyncMapsClient(api_key=GOOGLE_MAPS_API_KEY, rate_limiter=AsyncRateLimiter(rate_per_second))
+    summary = {}
+
+    try:
+        for target in targets:
+            stats = {"geocoded": 0, "failed": 0, "lookups": 0}
+            summary[target] = stats
+            model = Employer if target == "employers" else Employee
+            scope = checkpoint_key(target, employer_id)
+
+            while True:
+                last_id = checkpoint.get(scope, 0)
+                rows = await asyncio.to_thread(
+                    lambda: pending_query(db, target, employer_id).filter(model.id > last_id).limit(batch_size).all()
+                )
+                if not rows:
+                    break
+
+                addresses = {row.id: full_address(row) for row in rows}
+                coordinates = await geocode_unique(addresses.values(), client, concurrency)
+                stats["lookups"] += len(coordinates)
+
+                for row in rows:
+                    lat, lon = coordinates[normalize_address(addresses[row.id])]
+                    if lat is None or lon is None:
+                        stats["failed"] += 1
+                        continue
+                    row.latitude = lat
+                    row.longitude = lon
+                    row.geocoded_address = address_key(row)
+                    stats["geocoded"] += 1
+
+                # Read before commit expires the rows
+                batch_last_id = rows[-1].id
+                await asyncio.to_thread(db.commit)
+                checkpoint[scope] = batch_last_id
+                save_checkpoint(checkpoint_path, checkpoint)
+                print(f"📍 {target}: {stats['geocoded']} geocoded, {stats['failed']} failed (through id {batch_last_id})")
+    finally:
+        await client.aclose()
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return summary
+
+
+async def bulk_geocode_in_background(employer_id: Optional[int] = None, targets: Iterable[str] = TARGETS):
+    """BackgroundTasks entry point; opens its own session since the request's is closed by then"""
+    db = SessionLocal()
+    try:
+        summary = await run_bulk_geocode(db, targets=targets, employer_id=employer_id)
+        print(f"✅ Bulk geocoding finished for employer {employer_id}: {summary}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Bulk geocoding failed for employer {employer_id}: {e}")
+    finally:
+        db.close()
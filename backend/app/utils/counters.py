@@ -0,0 +1,359 @@
+"""
+Pre-aggregated dashboard counters.
+
+dashboard_counters holds one value per (scope, scope_id, name, period):
+
+    employer/<id>         employees, active_tasks, unread_notifications,
+                          bookings_by_start_month (period YYYY-MM)
+    coworking_user/<id>   spaces, bookings, bookings_by_end_date (YYYY-MM-DD),
+                          revenue_by_created_month (YYYY-MM)
+    global/0              employers, employees, coworking_users, spaces,
+                          verified_spaces, pending_spaces
+
+Values are adjusted in the same transaction as the write that changes them,
+through a session after_flush listener: every created, updated or deleted
+row contributes +1 (or its amount) to the counters it belongs to, and an
+update takes back what its old values contributed. Time-relative figures
+("bookings from this month on", "bookings not yet ended") are stored per
+period and summed from the current period at read time, so a dashboard is
+one indexed read.
+
+The create_dashboard_counters_table migration seeds the table from the
+existing rows. Bulk query updates and deletes bypass the listener; the nightly
+scripts/reconcile_dashboard_counters.py recomputes everything with GROUP BY
+queries and repairs any drift. The listener is registered by
+app.utils.listeners.register_listeners().
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from shared.models.booking import CoworkingBooking
+from shared.models.coworking_user import CoworkingUser
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.dashboard_counter import DashboardCounter
+from shared.models.employee import Employee
+from shared.models.employer import Employer
+from shared.models.employer_employee import EmployerEmployee
+from shared.models.notification import Notification
+from shared.models.task import Task, TaskStatus
+
+ACTIVE_TASK_STATUSES = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+
+# Attributes whose changes move a row between counters
+_TRACKED_ATTRS = {
+    Employer: (),
+    Employee: (),
+    CoworkingUser: (),
+    CoworkingSpaceListing: ("is_verified", "coworking_user_id"),
+    EmployerEmployee: ("employer_id", "status"),
+    Task: ("employer_id", "status"),
+    Notification: ("employer_id", "is_read"),
+    CoworkingBooking: ("employer_id", "coworking_space_id", "start_date", "end_date", "created_at", "total_cost"),
+}
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+
+def _month(value) -> Optional[str]:
+    return value.strftime("%Y-%m") if value else None
+
+
+def _contributions(model, values, space_owners: Dict[int, Optional[int]]):
+    """(scope, scope_id, name, period, amount) entries a row with these values counts towards"""
+    if model is Employer:
+        yield ("global", 0, "employers", "", 1)
+    elif model is Employee:
+        yield ("global", 0, "employees", "", 1)
+    elif model is CoworkingUser:
+        yield ("global", 0, "coworking_users", "", 1)
+    elif model is CoworkingSpaceListing:
+        yield ("global", 0, "spaces", "", 1)
+        if values["is_verified"] is True:
+            yield ("global", 0, "verified_spaces", "", 1)
+        elif values["is_verified"] is False:
+            yield ("global", 0, "pending_spaces", "", 1)
+        if values["coworking_user_id"] is not None:
+            yield ("coworking_user", values["coworking_user_id"], "spaces", "", 1)
+    elif model is EmployerEmployee:
+        if values["status"] == "active":
+            yield ("employer", values["employer_id"], "employees", "", 1)
+    elif model is Task:
+        if values["status"] in ACTIVE_TASK_STATUSES:
+            yield ("employer", values["employer_id"], "active_tasks", "", 1)
+    elif model is Notification:
+        if values["is_read"] is False:
+            yield ("employer", values["employer_id"], "unread_notifications", "", 1)
+    elif model is CoworkingBooking:
+        if values["employer_id"] is not None and values["start_date"]:
+            yield ("employer", values["employer_id"], "bookings_by_start_month", _month(values["start_date"]), 1)
+        owner_id = space_owners.get(values["coworking_space_id"])
+        if owner_id is not None:
+            yield ("coworking_user", owner_id, "bookings", "", 1)
+            if values["end_date"]:
+                yield ("coworking_user", owner_id, "bookings_by_end_date", values["end_date"].isoformat(), 1)
+            if values["created_at"]:
+                yield ("coworking_user", owner_id, "revenue_by_created_month", _month(values["created_at"]),
+                       values["total_cost"] or 0)
+
+
+def _current_values(obj, attrs) -> dict:
+    return {attr: getattr(obj, attr) for attr in attrs}
+
+
+def _previous_values(obj, attrs) -> dict:
+    """Attribute values as they were before this flush (listeners below keep old values loaded)"""
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.added:
+            values[attr] = None
+        else:
+            values[attr] = getattr(obj, attr)
+    return values
+
+
+def _changed(obj, attrs) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def apply_deltas(connection, deltas: Dict[tuple, float]):
+    """Add amounts to counters, creating missing rows; runs on the given connection's transaction"""
+    rows = [
+        {"scope": scope, "scope_id": scope_id, "name": name, "period": period, "value": amount,
+         "updated_at": datetime.utcnow()}
+        for (scope, scope_id, name, period), amount in deltas.items()
+        if amount
+    ]
+    if not rows:
+        return
+    statement = sqlite_insert(DashboardCounter.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["scope", "scope_id", "name", "period"],
+        set_={
+            "value": DashboardCounter.__table__.c.value + statement.excluded.value,
+            "updated_at": statement.excluded.updated_at
+        }
+    )
+    connection.execute(statement, rows)
+
+
+def read_counters(db: Session, scope: str, scope_id: int, since: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """
+    {name: value} for one tenant in a single indexed query. Periodic counters
+    named in since are summed over the periods from since[name] on.
+    """
+    since = since or {}
+    periods = [DashboardCounter.period == ""] + [
+        (DashboardCounter.name == name) & (DashboardCounter.period >= floor)
+        for name, floor in since.items()
+    ]
+    rows = db.query(DashboardCounter.name, func.sum(DashboardCounter.value)).filter(
+        DashboardCounter.scope == scope,
+        DashboardCounter.scope_id == scope_id,
+        or_(*periods)
+    ).group_by(DashboardCounter.name).all()
+    return {name: value or 0 for name, value in rows}
+
+
+# ===== RECONCILIATION =====
+
+def expected_counters(db: Session, today: Optional[date] = None) -> Dict[tuple, float]:
+    """
+    Every counter recomputed from the source tables. Periods that can no
+    longer be read (months before this one, days before today) are left out.
+    """
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    expected = {}
+
+    def add(key, value):
+        if value:
+            expected[key] = float(value)
+
+    add(("global", 0, "employers", ""), db.query(func.count(Employer.id)).scalar())
+    add(("global", 0, "employees", ""), db.query(func.count(Employee.id)).scalar())
+    add(("global", 0, "coworking_users", ""), db.query(func.count(CoworkingUser.id)).scalar())
+    add(("global", 0, "spaces", ""), db.query(func.count(CoworkingSpaceListing.id)).scalar())
+    add(("global", 0, "verified_spaces", ""), db.query(func.count(CoworkingSpaceListing.id)).filter(
+        CoworkingSpaceListing.is_verified == True
+    ).scalar())
+    add(("global", 0, "pending_spaces", ""), db.query(func.count(CoworkingSpaceListing.id)).filter(
+        CoworkingSpaceListing.is_verified == False
+    ).scalar())
+
+    for owner_id, count in db.query(CoworkingSpaceListing.coworking_user_id, func.count(CoworkingSpaceListing.id)).filter(
+        CoworkingSpaceListing.coworking_user_id.isnot(None)
+    ).group_by(CoworkingSpaceListing.coworking_user_id):
+        add(("coworking_user", owner_id, "spaces", ""), count)
+
+    for employer_id, count in db.query(EmployerEmployee.employer_id, func.count(EmployerEmployee.id)).filter(
+        EmployerEmployee.status == "active"
+    ).group_by(EmployerEmployee.employer_id):
+        add(("employer", employer_id, "employees", ""), count)
+
+    for employer_id, count in db.query(Task.employer_id, func.count(Task.id)).filter(
+        Task.status.in_(ACTIVE_TASK_STATUSES)
+    ).group_by(Task.employer_id):
+        add(("employer", employer_id, "active_tasks", ""), count)
+
+    for employer_id, count in db.query(Notification.employer_id, func.count(Notification.id)).filter(
+        Notification.is_read == False
+    ).group_by(Notification.employer_id):
+        add(("employer", employer_id, "unread_notifications", ""), count)
+
+    start_month = func.strftime("%Y-%m", CoworkingBooking.start_date)
+    for employer_id, month, count in db.query(
+        CoworkingBooking.employer_id, start_month, func.count(CoworkingBooking.id)
+    ).filter(
+        CoworkingBooking.employer_id.isnot(None),
+        CoworkingBooking.start_date >= month_start
+    ).group_by(CoworkingBooking.employer_id, start_month):
+        add(("employer", employer_id, "bookings_by_start_month", month), count)
+
+    owner = CoworkingSpaceListing.coworking_user_id
+    owned_bookings = db.query(CoworkingBooking).join(
+        CoworkingSpaceListing, CoworkingSpaceListing.id == CoworkingBooking.coworking_space_id
+    ).filter(owner.isnot(None))
+
+    for owner_id, count in owned_bookings.with_entities(owner, func.count(CoworkingBooking.id)).group_by(owner):
+        add(("coworking_user", owner_id, "bookings", ""), count)
+
+    for owner_id, end_date, count in owned_bookings.with_entities(
+        owner, CoworkingBooking.end_date, func.count(CoworkingBooking.id)
+    ).filter(CoworkingBooking.end_date >= today).group_by(owner, CoworkingBooking.end_date):
+        add(("coworking_user", owner_id, "bookings_by_end_date", end_date.isoformat()), count)
+
+    created_month = func.strftime("%Y-%m", CoworkingBooking.created_at)
+    for owner_id, month, revenue in owned_bookings.with_entities(
+        owner, created_month, func.sum(CoworkingBooking.total_cost)
+    ).filter(CoworkingBooking.created_at >= month_start).group_by(owner, created_month):
+        add(("coworking_user", owner_id, "revenue_by_created_month", month), revenue)
+
+    return expected
+
+
+def reconcile(db: Session, today: Optional[date] = None) -> dict:
+    """
+    Replace the stored counters with freshly computed ones; does not commit.
+    Returns how many counters were wrong, missing or stale.
+    """
+    expected = expected_counters(db, today)
+    stored = {
+        (row.scope, row.scope_id, row.name, row.period): row.value
+        for row in db.query(DashboardCounter.scope, DashboardCounter.scope_id, DashboardCounter.name,
+                            DashboardCounter.period, DashboardCounter.value)
+    }
+
+    summary = {
+        "counters": len(expected),
+        "fixed": sum(1 for key, value in expected.items() if key in stored and abs(stored[key] - value) > 1e-6),
+        "missing": sum(1 for key in expected if key not in stored),
+        "removed": sum(1 for key in stored if key not in expected)
+    }
+
+    db.query(DashboardCounter).delete(synchronize_session=False)
+    apply_deltas(db.connection(), expected)
+    return summary
+
+
+# ===== MAINTENANCE =====
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value before a tracked attribute is overwritten so its history is complete
+for _model, _attrs in _TRACKED_ATTRS.items():
+    for _attr in _attrs:
+        event.listen(getattr(_model, _attr), "set", _keep_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_counters(session, flush_context):
+    """Turn this flush's inserts, updates and deletes into counter deltas in the same transaction"""
+    changes = []
+    for obj in session.new:
+        model = type(obj)
+        if model in _TRACKED_ATTRS:
+            changes.append((model, None, _current_values(obj, _TRACKED_ATTRS[model])))
+    for obj in session.dirty:
+        model = type(obj)
+        if model in _TRACKED_ATTRS and _TRACKED_ATTRS[model] and _changed(obj, _TRACKED_ATTRS[model]):
+            changes.append((model, _previous_values(obj, _TRACKED_ATTRS[model]), _current_values(obj, _TRACKED_ATTRS[model])))
+    for obj in session.deleted:
+        model = type(obj)
+        if model in _TRACKED_ATTRS:
+            changes.append((model, _current_values(obj, _TRACKED_ATTRS[model]), None))
+
+    if not changes:
+        return
+
+    connection = session.connection()
+
+    # Bookings count towards the owner of their space
+    space_ids = sorted({
+        values["coworking_space_id"]
+        for model, before, after in changes if model is CoworkingBooking
+        for values in (before, after) if values and values["coworking_space_id"] is not None
+    })
+    space_owners = {}
+    for i in range(0, len(space_ids), _CHUNK_SIZE):
+        space_owners.update(connection.execute(
+            select(CoworkingSpaceListing.id, CoworkingSpaceListing.coworking_user_id).where(
+                CoworkingSpaceListing.id.in_(space_ids[i:i + _CHUNK_SIZE])
+            )
+        ).all())
+
+    # A space's bookings count towards whoever owned it before and after the flush
+    owners_before = dict(space_owners)
+    moved = {}
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, CoworkingSpaceListing):
+            previous_owner = _previous_values(obj, ("coworking_user_id",))["coworking_user_id"]
+            owners_before[obj.id] = previous_owner
+            if obj in session.deleted:
+                # Already gone from the table
+                space_owners[obj.id] = previous_owner
+            else:
+                space_owners[obj.id] = obj.coworking_user_id
+                if previous_owner != obj.coworking_user_id:
+                    moved[obj.id] = previous_owner
+
+    # Bookings of a re-owned space that are not part of this flush move with it
+    if moved:
+        attrs = _TRACKED_ATTRS[CoworkingBooking]
+        changed_ids = {
+            obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, CoworkingBooking)
+        }
+        moved_ids = sorted(moved)
+        for i in range(0, len(moved_ids), _CHUNK_SIZE):
+            rows = connection.execute(
+                select(CoworkingBooking.id, *(getattr(CoworkingBooking, attr) for attr in attrs)).where(
+                    CoworkingBooking.coworking_space_id.in_(moved_ids[i:i + _CHUNK_SIZE])
+                )
+            )
+            for row in rows:
+                if row.id not in changed_ids:
+                    values = {attr: getattr(row, attr) for attr in attrs}
+                    changes.append((CoworkingBooking, values, values))
+
+    deltas = defaultdict(float)
+    for model, before, after in changes:
+        if before is not None:
+            for scope, scope_id, name, period, amount in _contributions(model, before, owners_before):
+                deltas[(scope, scope_id, name, period)] -= amount
+        if after is not None:
+            for scope, scope_id, name, period, amount in _contributions(model, after, space_owners):
+                deltas[(scope, scope_id, name, period)] += amount
+
+    apply_deltas(connection, deltas)
@@ -1,12 +1,81 @@
-from math import radians, cos, sin, asin, sqrt
+"""
+Great-circle distance helpers shared by every distance code path.
+
+The array helpers go through one NumPy haversine kernel that broadcasts over
+its inputs, so a single origin against N destinations (or an M x N matrix) is
+one vectorized call instead of N Python-level trig evaluations. A single
+pair stays on plain math, which is faster than building NumPy scalars.
+"""
+from math import radians, degrees, cos, sin, asin, sqrt
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0  # Radius of Earth in kilometers
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """Haversine kernel in kilometers; inputs are degrees and broadcast like NumPy arrays"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
 
 def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in kilometers
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    """Distance in kilometers between two points"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
 
     dlat = lat2 - lat1
     dlon = lon2 - lon1
 
-    a = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    return R * c
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(min(max(a, 0.0), 1.0)))
+
+
+def haversine_many(lat, lon, lats, lons):
+    """
+    Distances in kilometers from one origin to many destinations.
+
+    lats/lons are sequences (or arrays) of equal length; returns a float64
+    array of the same length.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return _haversine_km(lat, lon, lats, lons)
+
+
+def haversine_matrix(origin_lats, origin_lons, dest_lats, dest_lons):
+    """
+    Many-to-many distance matrix in kilometers.
+
+    Returns an array of shape (len(origins), len(destinations)).
+    """
+    origin_lats = np.asarray(origin_lats, dtype=np.float64)[:, np.newaxis]
+    origin_lons = np.asarray(origin_lons, dtype=np.float64)[:, np.newaxis]
+    dest_lats = np.asarray(dest_lats, dtype=np.float64)[np.newaxis, :]
+    dest_lons = np.asarray(dest_lons, dtype=np.float64)[np.newaxis, :]
+    return _haversine_km(origin_lats, origin_lons, dest_lats, dest_lons)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Smallest lat/lon box containing every point within radius_km of (lat, lon).
+
+    Returns (min_lat, max_lat, min_lon, max_lon). Longitudes are not wrapped:
+    min_lon may be below -180 or max_lon above 180 near the antimeridian, and
+    the full [-180, 180] range is returned when the circle reaches a pole.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    delta_lat = degrees(angular)
+    min_lat = lat - delta_lat
+    max_lat = lat + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    # Widest longitude spread of the circle (reached north/south of its centre)
+    delta_lon = degrees(asin(min(1.0, sin(angular) / cos(radians(lat)))))
+    return min_lat, max_lat, lon - delta_lon, lon + delta_lon
@@ -1,9 +1,15 @@
 import os
 import random
 import time
+from typing import Optional
+
 import requests
-from math import radians, sin, cos, sqrt, atan2
+from fastapi.concurrency import run_in_threadpool
 from app.config import settings
+from app.utils.distance import haversine_distance
+from app.utils.geocode_cache import GeocodeCache
+from app.utils.maps_client import AsyncMapsClient, MapsAPIError
+from app.utils.travel_time import TravelTimeService
 from dotenv import load_dotenv
 
 # ✅ Load from .env
@@ -17,28 +23,88 @@ if not GOOGLE_MAPS_API_KEY:
 # 🔁 Toggle between fake or real geocoding
 USE_FAKE_GEOCODING = settings.USE_FAKE_GEOCODING
 
-# 🧠 City-level base location cache for fake mode
-city_cache = {}
+# 🧠 Persistent geocode cache shared by real and fake mode
+geocode_cache = GeocodeCache()
+
+# 🌐 Pooled async client for Maps calls made from async endpoints
+maps_client = AsyncMapsClient(api_key=GOOGLE_MAPS_API_KEY)
+
+# 🚗 Batched, cached Distance Matrix lookups for ranking by travel time
+travel_time_service = TravelTimeService(maps_client)
+
+def cached_geocode(full_address: str, retries=3, delay=1.5):
+    """
+    Geocode through the persistent cache, calling Google only on a miss.
+    Addresses Google has no result for are cached too, so they return
+    (None, None) until they expire; errors are not, and are asked again.
+    """
+    found, coords = geocode_cache.get(full_address)
+    if found:
+        return coords if coords else (None, None)
+
+    try:
+        coords = geocode_lookup(full_address, retries=retries, delay=delay)
+    except MapsAPIError as e:
+        print(f"❌ Failed to geocode after {retries} attempts: {full_address} ({e})")
+        return None, None
+
+    lat, lon = coords if coords else (None, None)
+    geocode_cache.set(full_address, lat, lon)
+    return lat, lon
 
 def geocode_address(full_address: str, retries=3, delay=1.5):
     """
     Geocode full address using Google Maps API, or use fake randomized coords near city.
     """
     if not USE_FAKE_GEOCODING:
-        return real_geocode(full_address, retries=retries, delay=delay)
+        return cached_geocode(full_address, retries=retries, delay=delay)
 
     # FAKE fallback mode – approximate using city base + noise
+    city_key = _fake_city_key(full_address)
+    return _fake_coordinates(full_address, city_key, cached_geocode(city_key, retries=retries, delay=delay))
+
+async def async_cached_geocode(full_address: str, client: Optional[AsyncMapsClient] = None):
+    """
+    Async counterpart of cached_geocode using the pooled Maps client (or the given one).
+    Retries back off with asyncio.sleep, so no worker thread is held while waiting;
+    the SQLite cache is read and written in the threadpool.
+    """
+    found, coords = await run_in_threadpool(geocode_cache.get, full_address)
+    if found:
+        return coords if coords else (None, None)
+
+    try:
+        coords = await (client or maps_client).geocode_lookup(full_address)
+    except MapsAPIError as e:
+        print(f"❌ Failed to geocode {full_address}: {e}")
+        return None, None
+
+    if coords is None:
+        print(f"⚠️ No results for: {full_address}")
+    lat, lon = coords if coords else (None, None)
+    await run_in_threadpool(geocode_cache.set, full_address, lat, lon)
+    return lat, lon
+
+async def async_geocode_address(full_address: str, client: Optional[AsyncMapsClient] = None):
+    """
+    Async counterpart of geocode_address for async endpoints and bulk jobs.
+    """
+    if not USE_FAKE_GEOCODING:
+        return await async_cached_geocode(full_address, client)
+
+    city_key = _fake_city_key(full_address)
+    return _fake_coordinates(full_address, city_key, await async_cached_geocode(city_key, client))
+
+def _fake_city_key(full_address: str) -> str:
     city_parts = full_address.split(",")
-    city_key = ", ".join(part.strip() for part in city_parts[-2:])
+    return ", ".join(part.strip() for part in city_parts[-2:])
 
-    if city_key not in city_cache:
-        latlon = real_geocode(city_key, retries=retries, delay=delay)
-        if latlon == (None, None):
-            print(f"❌ Fallback failed for {city_key}. Using (0.0, 0.0)")
-            latlon = (0.0, 0.0)
-        city_cache[city_key] = latlon
+def _fake_coordinates(full_address: str, city_key: str, latlon):
+    if latlon == (None, None):
+        print(f"❌ Fallback failed for {city_key}. Using (0.0, 0.0)")
+        latlon = (0.0, 0.0)
 
-    base_lat, base_lon = city_cache[city_key]
+    base_lat, base_lon = latlon
     lat = base_lat + random.uniform(-0.03, 0.03)
     lon = base_lon + random.uniform(-0.03, 0.03)
 
@@ -49,12 +115,25 @@ def real_geocode(full_address: str, retries=3, delay=1.5):
     """
     Uses Google Maps Geocoding API to get latitude and longitude.
     """
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    try:
+        coords = geocode_lookup(full_address, retries=retries, delay=delay)
+    except MapsAPIError as e:
+        print(f"❌ Failed to geocode after {retries} attempts: {full_address} ({e})")
+        return None, None
+    return coords if coords else (None, None)
+
+def geocode_lookup(full_address: str, retries=3, delay=1.5):
+    """
+    (lat, lon) for an address, or None when Google has no result for it (ZERO_RESULTS).
+    Raises MapsAPIError when every attempt failed for another reason.
+    """
+    url = f"{settings.GOOGLE_MAPS_BASE_URL.rstrip('/')}/geocode/json"
     params = {
         "address": full_address,
         "key": GOOGLE_MAPS_API_KEY
     }
 
+    last_error = None
     for attempt in range(retries):
         try:
             print(f"🔍 Geocoding: {full_address} (Attempt {attempt + 1})")
@@ -62,37 +141,37 @@ def real_geocode(full_address: str, retries=3, delay=1.5):
 
             if response.status_code != 200:
                 print(f"❌ Error {response.status_code}: {response.text}")
-                time.sleep(delay)
-                continue
-
-            results = response.json().get("results")
-            if results:
-                location = results[0]["geometry"]["location"]
-                lat = float(location["lat"])
-                lon = float(location["lng"])
-                print(f"✅ Geocoded '{full_address}' → ({lat}, {lon})")
-                return lat, lon
-
-            print(f"⚠️ No results for: {full_address}")
+                last_error = f"HTTP {response.status_code}"
+            else:
+                data = response.json()
+                status = data.get("status")
+                results = data.get("results")
+                if status == "ZERO_RESULTS":
+                    print(f"⚠️ No results for: {full_address}")
+                    return None
+                if status == "OK" and results:
+                    location = results[0]["geometry"]["location"]
+                    lat = float(location["lat"])
+                    lon = float(location["lng"])
+                    print(f"✅ Geocoded '{full_address}' → ({lat}, {lon})")
+                    return lat, lon
+                print(f"⚠️ Geocoding returned {status} for: {full_address}")
+                last_error = status
         except Exception as e:
             print(f"⚠️ Exception: {e}")
+            last_error = str(e) or type(e).__name__
 
-        time.sleep(delay)
+        if attempt < retries - 1:
+            time.sleep(delay)
 
-    print(f"❌ Failed to geocode after {retries} attempts: {full_address}")
-    return None, None
+    raise MapsAPIError(f"/geocode/json failed after {retries} attempts: {last_error}")
 
 def calculate_distance_km(lat1, lon1, lat2, lon2):
     """
     Calculates great-circle distance (in kilometers) between two lat/lon coordinates.
     Uses the Haversine formula.
     """
-    R = 6371.0  # Radius of the Earth in kilometers
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return round(R * c, 2)
+    return round(haversine_distance(lat1, lon1, lat2, lon2), 2)
 
 def get_distance_duration(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving"):
     """
@@ -140,3 +219,40 @@ def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving"):
     }
     response = requests.get(url, params=params)
     return response.json()
+
+async def async_get_distance_duration(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving"):
+    """
+    Async counterpart of get_distance_duration using the pooled Maps client.
+    """
+    try:
+        data = await maps_client.distance_matrix(
+            f"{origin_lat},{origin_lng}", f"{dest_lat},{dest_lng}", mode=mode
+        )
+    except MapsAPIError as e:
+        data = {"status": str(e)}
+
+    if data.get("status") == "OK":
+        element = data["rows"][0]["elements"][0]
+        if element["status"] == "OK":
+            return {
+                "distance_text": element["distance"]["text"],
+                "distance_value": element["distance"]["value"],
+                "duration_text": element["duration"]["text"],
+                "duration_value": element["duration"]["value"]
+            }
+
+    print(f"❌ Distance/Duration API failed: {data}")
+    return {
+        "distance_text": "N/A",
+        "distance_value": 0,
+        "duration_text": "N/A",
+        "duration_value": 0
+    }
+
+async def async_get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving"):
+    """
+    Async counterpart of get_directions using the pooled Maps client.
+    """
+    return await maps_client.directions(
+        f"{origin_lat},{origin_lng}", f"{dest_lat},{dest_lng}", mode=mode
+    )
@@ -0,0 +1,160 @@
+"""
+Persistent geocoding cache backed by a local SQLite table.
+
+Addresses are normalized before lookup so trivial differences in case,
+spacing or punctuation share one entry. Successful lookups live for
+GEOCODE_CACHE_TTL_SECONDS; addresses Google has no result for are cached as
+negative entries for the shorter GEOCODE_CACHE_NEGATIVE_TTL_SECONDS so a bad
+address is not retried against Google on every search. Lookups that failed
+(network errors, 5xx, quota) are not cached, as they say nothing about the
+address. Once the table grows past GEOCODE_CACHE_MAX_ENTRIES the least
+recently used entries are evicted. A hit only writes its last use back
+when the stored one is older than GEOCODE_CACHE_TOUCH_INTERVAL_SECONDS, so
+most hits are plain reads.
+
+The cache uses blocking sqlite3 calls; async code calls it through a
+threadpool.
+"""
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from app.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_STRIP_CHARS = " .,;"
+
+
+def normalize_address(address: str) -> str:
+    """Lower-case, collapse whitespace and drop empty comma-separated parts"""
+    parts = [_WHITESPACE.sub(" ", part).strip(_STRIP_CHARS) for part in (address or "").lower().split(",")]
+    return ", ".join(part for part in parts if part)
+
+
+class GeocodeCache:
+    """SQLite-backed address -> (lat, lon) cache with TTL, LRU eviction and negative caching"""
+
+    def __init__(
+        self,
+        path: str = settings.GEOCODE_CACHE_PATH,
+        ttl_seconds: int = settings.GEOCODE_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = settings.GEOCODE_CACHE_NEGATIVE_TTL_SECONDS,
+        max_entries: int = settings.GEOCODE_CACHE_MAX_ENTRIES,
+        touch_interval_seconds: int = settings.GEOCODE_CACHE_TOUCH_INTERVAL_SECONDS
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                address_key TEXT PRIMARY KEY,
+                latitude REAL,
+                longitude REAL,
+                expires_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_geocode_cache_last_used_at ON geocode_cache (last_used_at)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+
+    def get(self, address: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Look up an address.
+
+        Returns (found, coords). A cached no-result address is (True, None); a miss or an
+        expired entry is (False, None).
+        """
+        key = normalize_address(address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, expires_at, last_used_at FROM geocode_cache WHERE address_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return False, None
+
+            # Eviction order only needs to be roughly right
+            if now - row[3] >= self.touch_interval_seconds:
+                self._conn.execute(
+                    "UPDATE geocode_cache SET last_used_at = ? WHERE address_key = ?", (now, key)
+                )
+                self._conn.commit()
+
+            if row[0] is None or row[1] is None:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+            return True, (row[0], row[1])
+
+    def set(self, address: str, lat: Optional[float], lon: Optional[float]):
+        """Store a lookup result; pass lat/lon of None to cache an address with no result"""
+        key = normalize_address(address)
+        now = time.time()
+        failed = lat is None or lon is None
+        ttl = self.negative_ttl_seconds if failed else self.ttl_seconds
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM geocode_cache WHERE address_key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO geocode_cache (address_key, latitude, longitude, expires_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, None if failed else lat, None if failed else lon, now + ttl, now)
+            )
+            if not existed:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones until under max_entries"""
+        expired = self._conn.execute(
+            "DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._size -= expired
+        self.evictions += expired
+
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM geocode_cache WHERE address_key IN (
+                    SELECT address_key FROM geocode_cache ORDER BY last_used_at ASC LIMIT ?
+                )
+                """,
+                (overflow,)
+            )
+            self._size -= overflow
+            self.evictions += overflow
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current table size"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": self._size,
+            "max_entries": self.max_entries
+        }
@@ -0,0 +1,21 @@
+"""
+Session listeners that keep derived tables current.
+
+booking_days, the seat ledger, dashboard counters, revenue rollups, the
+nearby-space index and employee_space_proximity each follow the rows they
+are derived from through SQLAlchemy Session events, registered when their
+module is imported. Every app calls register_listeners() once, so a write
+through any of them - including deletes that cascade from employers,
+employees or spaces to bookings - keeps all of them in step.
+"""
+
+
+def register_listeners():
+    """Register every derived-table listener; calling it again does nothing"""
+    from app.utils import booking_conflicts, counters, occupancy, proximity, revenue, spatial_index  # noqa: F401
+
+
+def shutdown_listeners():
+    """Apply the updates the listeners still have queued; call on application shutdown"""
+    from app.utils import proximity
+    proximity.shutdown()
@@ -0,0 +1,169 @@
+"""
+Async Google Maps HTTP client.
+
+One pooled httpx.AsyncClient is shared by every request in the process, so
+geocoding and distance lookups reuse keep-alive connections instead of
+opening a new TLS connection per call. Retries back off exponentially with
+full jitter using asyncio.sleep, which frees the event loop (and no
+threadpool worker is held) while waiting.
+"""
+import asyncio
+import random
+import time
+from typing import Optional, Tuple
+
+import httpx
+
+from app.config import settings
+
+# Google statuses worth retrying; everything else is a final answer
+RETRYABLE_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+
+class MapsAPIError(Exception):
+    """Raised when a Maps API call still fails after all retries"""
+
+
+class AsyncRateLimiter:
+    """Spaces out calls so no more than rate_per_second start in any second"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncMapsClient:
+    """Pooled async client for the Google Maps web service APIs"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = settings.GOOGLE_MAPS_BASE_URL,
+        timeout: float = settings.MAPS_HTTP_TIMEOUT_SECONDS,
+        max_connections: int = settings.MAPS_HTTP_MAX_CONNECTIONS,
+        retries: int = settings.MAPS_HTTP_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        rate_limiter: Optional[AsyncRateLimiter] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the server's running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30.0
+                )
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a zero-based attempt number"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get_json(self, path: str, params: dict, timeout: Optional[float] = None) -> dict:
+        """
+        GET a Maps endpoint and return its JSON body.
+
+        Transport errors, 429/5xx responses and retryable Google statuses are
+        retried; the last error is raised as MapsAPIError.
+        """
+        client = self._get_client()
+        params = {**params, "key": self.api_key}
+        last_error = None
+
+        for attempt in range(self.retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                response = await client.get(
+                    path, params=params, timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+                )
+                if response.status_code == 429 or response.status_code >= 500:
+                    last_error = f"HTTP {response.status_code}"
+                elif response.status_code != 200:
+                    raise MapsAPIError(f"HTTP {response.status_code}: {response.text}")
+                else:
+                    data = response.json()
+                    if data.get("status") not in RETRYABLE_STATUSES:
+                        return data
+                    last_error = data.get("status")
+            except httpx.HTTPError as e:
+                last_error = str(e) or type(e).__name__
+
+            if attempt < self.retries - 1:
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise MapsAPIError(f"{path} failed after {self.retries} attempts: {last_error}")
+
+    async def geocode_lookup(self, address: str, timeout: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """
+        Return (lat, lon) for an address, or None when Google has no result for it
+        (ZERO_RESULTS). Any other failure raises MapsAPIError, since it says
+        nothing about the address.
+        """
+        data = await self.get_json("/geocode/json", {"address": address}, timeout=timeout)
+        status = data.get("status")
+        if status == "ZERO_RESULTS":
+            return None
+        results = data.get("results")
+        if status != "OK" or not results:
+            raise MapsAPIError(f"/geocode/json returned {status}")
+
+        location = results[0]["geometry"]["location"]
+        return float(location["lat"]), float(location["lng"])
+
+    async def geocode(self, address: str, timeout: Optional[float] = None):
+        """Return (lat, lon) for an address, or (None, None) when it cannot be geocoded"""
+        try:
+            coords = await self.geocode_lookup(address, timeout=timeout)
+        except MapsAPIError as e:
+            print(f"❌ Failed to geocode {address}: {e}")
+            return None, None
+
+        if coords is None:
+            print(f"⚠️ No results for: {address}")
+            return None, None
+        return coords
+
+    async def distance_matrix(self, origins: str, destinations: str, mode: str = "driving", timeout: Optional[float] = None) -> dict:
+        return await self.get_json(
+            "/distancematrix/json",
+            {"origins": origins, "destinations": destinations, "mode": mode},
+            timeout=timeout
+        )
+
+    async def directions(self, origin: str, destination: str, mode: str = "driving", timeout: Optional[float] = None) -> dict:
+        return await self.get_json(
+            "/directions/json",
+            {"origin": origin, "destination": destination, "mode": mode},
+            timeout=timeout
+        )
+
+    async def aclose(self):
+        """Close pooled connections; call on application shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
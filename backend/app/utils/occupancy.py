@@ -0,0 +1,371 @@
+"""
+Per-day seat ledger for coworking spaces.
+
+space_occupancy holds one row per (space, package, day) with the number of
+seats booked. A package's capacity is the optional "capacity" field of its
+entry in the space's packages JSON; packages without one are unlimited.
+
+The ledger follows the bookings through a session before_flush listener,
+in the same transaction: created bookings take their seats, deleted ones
+(including those removed by cascade with their employer, employee or
+space) give them back and changed ones move them. Seats are taken with a
+conditional UPDATE that only succeeds while booked_seats stays within
+capacity, so two concurrent bookings cannot both take the last seat. A full
+day raises CapacityError out of the flush (or commit) before the booking is
+written; the caller rolls back, which also undoes any days already reserved.
+"""
+import json
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.utils.booking_conflicts import booking_dates
+from shared.models.booking import CoworkingBooking
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.space_occupancy import SpaceOccupancy
+
+SEATS_PER_BOOKING = 1
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+
+class CapacityError(Exception):
+    """A package has no free seat left on some of the requested days"""
+
+    def __init__(self, space_id: int, package_id: str, days: List[date]):
+        self.space_id = space_id
+        self.package_id = package_id
+        self.days = days
+        listed = ", ".join(day.isoformat() for day in days[:5]) + (" ..." if len(days) > 5 else "")
+        super().__init__(
+            f"Package {package_id or '(none)'} of space {space_id} is full"
+            + (f" on {listed}" if days else "")
+        )
+
+
+def _chunks(values: List):
+    for i in range(0, len(values), _CHUNK_SIZE):
+        yield values[i:i + _CHUNK_SIZE]
+
+
+def space_packages(space) -> List[dict]:
+    """The space's packages JSON as a list (empty when missing or unreadable)"""
+    if not space.packages:
+        return []
+    try:
+        packages = json.loads(space.packages) if isinstance(space.packages, str) else space.packages
+    except (TypeError, ValueError):
+        return []
+    return packages if isinstance(packages, list) else []
+
+
+def package_capacity(package: Optional[dict]) -> Optional[int]:
+    """Seats a package offers per day, or None when unlimited"""
+    if not package:
+        return None
+    try:
+        capacity = int(package.get("capacity"))
+    except (TypeError, ValueError):
+        return None
+    return capacity if capacity >= 0 else None
+
+
+def resolve_package(space, package_id: Optional[str]) -> tuple:
+    """
+    (ledger package id, package dict or None) for a booking.
+
+    Matches by id or name like the payment endpoints do. A booking without a
+    package_id is charged to the space's only package when it has exactly one.
+    """
+    packages = space_packages(space)
+    if package_id is None:
+        if len(packages) == 1:
+            return str(packages[0].get("id", "")), packages[0]
+        return "", None
+    for package in packages:
+        if str(package.get("id")) == str(package_id) or package.get("name") == package_id:
+            return str(package.get("id", "")), package
+    return str(package_id), None
+
+
+def reserve_seats(db: Session, space_id: int, package_id: str, days: Iterable[date],
+                  capacity: Optional[int], seats: int = SEATS_PER_BOOKING):
+    """Add seats to every day, raising CapacityError if any day would go over capacity"""
+    days = sorted(set(days))
+    table = SpaceOccupancy.__table__
+    for chunk in _chunks(days):
+        db.execute(
+            sqlite_insert(table).on_conflict_do_nothing(index_elements=["space_id", "package_id", "day"]),
+            [{"space_id": space_id, "package_id": package_id, "day": day, "booked_seats": 0} for day in chunk]
+        )
+        filters = (table.c.space_id == space_id, table.c.package_id == package_id, table.c.day.in_(chunk))
+        if capacity is not None:
+            full = [
+                row.day for row in db.execute(
+                    table.select().with_only_columns(table.c.day)
+                    .where(*filters, table.c.booked_seats + seats > capacity)
+                    .order_by(table.c.day)
+                )
+            ]
+            if full:
+                raise CapacityError(space_id, package_id, full)
+
+        statement = update(table).where(*filters).values(booked_seats=table.c.booked_seats + seats)
+        if capacity is not None:
+            # Guards against a seat taken between the check above and this update
+            statement = statement.where(table.c.booked_seats + seats <= capacity)
+        if db.execute(statement).rowcount < len(chunk):
+            raise CapacityError(space_id, package_id, [])
+
+
+def release_seats(db: Session, space_id: int, package_id: str, days: Iterable[date], seats: int = SEATS_PER_BOOKING):
+    """Give seats back on every day, dropping ledger rows that become empty"""
+    days = sorted(set(days))
+    table = SpaceOccupancy.__table__
+    for chunk in _chunks(days):
+        filters = (table.c.space_id == space_id, table.c.package_id == package_id, table.c.day.in_(chunk))
+        db.execute(update(table).where(*filters).values(booked_seats=table.c.booked_seats - seats))
+        db.execute(table.delete().where(*filters, table.c.booked_seats <= 0))
+
+
+def _booked_by_space(db: Session, space_ids: List[int], first_day: date, last_day: date) -> Dict[int, dict]:
+    """{space_id: {(package_id, day): booked_seats}} for a date range"""
+    booked = defaultdict(dict)
+    for chunk in _chunks(sorted(set(space_ids))):
+        rows = db.query(
+            SpaceOccupancy.space_id, SpaceOccupancy.package_id, SpaceOccupancy.day, SpaceOccupancy.booked_seats
+        ).filter(
+            SpaceOccupancy.space_id.in_(chunk),
+            SpaceOccupancy.day >= first_day,
+            SpaceOccupancy.day <= last_day
+        )
+        for space_id, package_id, day, booked_seats in rows:
+            booked[space_id][(package_id, day)] = booked_seats
+    return booked
+
+
+def availability_calendar(db: Session, space, days: List[date], package_id: Optional[str] = None) -> dict:
+    """Booked, capacity and free seats per package for each of the given days"""
+    packages = [
+        (str(package.get("id", "")), package.get("name"), package_capacity(package))
+        for package in space_packages(space)
+        if package_id is None or str(package.get("id")) == str(package_id) or package.get("name") == package_id
+    ]
+    booked = _booked_by_space(db, [space.id], days[0], days[-1])[space.id] if days else {}
+    capacities = [capacity for _, _, capacity in packages]
+    space_capacity = sum(capacities) if capacities and None not in capacities else None
+
+    calendar = []
+    for day in days:
+        day_packages = [
+            {
+                "package_id": pid,
+                "booked_seats": booked.get((pid, day), 0),
+                "capacity": capacity,
+                "available_seats": None if capacity is None else max(capacity - booked.get((pid, day), 0), 0)
+            }
+            for pid, _, capacity in packages
+        ]
+        booked_total = sum(entry["booked_seats"] for entry in day_packages)
+        if package_id is None:
+            # Bookings made without a package still occupy the space
+            booked_total += booked.get(("", day), 0)
+        calendar.append({
+            "date": day.isoformat(),
+            "booked_seats": booked_total,
+            "capacity": space_capacity,
+            "available_seats": None if space_capacity is None else max(space_capacity - booked_total, 0),
+            "packages": day_packages
+        })
+
+    return {
+        "space_id": space.id,
+        "packages": [
+            {"package_id": pid, "name": name, "capacity": capacity} for pid, name, capacity in packages
+        ],
+        "days": calendar
+    }
+
+
+def spaces_with_free_seats(db: Session, space_ids: List[int], days: List[date], seats: int) -> set:
+    """
+    Ids of the given spaces with a package that has at least `seats` free
+    seats on every one of the days. Spaces and packages without a capacity
+    are unlimited. Reads the ledger for the date range only, never bookings.
+    """
+    if not space_ids or not days:
+        return set(space_ids)
+
+    packages_by_space = {}
+    for chunk in _chunks(sorted(set(space_ids))):
+        for space in db.query(CoworkingSpaceListing.id, CoworkingSpaceListing.packages).filter(
+            CoworkingSpaceListing.id.in_(chunk)
+        ):
+            packages_by_space[space.id] = space_packages(space)
+    booked = _booked_by_space(db, list(packages_by_space), min(days), max(days))
+
+    available = set()
+    for space_id, packages in packages_by_space.items():
+        if not packages:
+            available.add(space_id)
+            continue
+        space_booked = booked.get(space_id, {})
+        for package in packages:
+            capacity = package_capacity(package)
+            package_id = str(package.get("id", ""))
+            if capacity is None or all(
+                capacity - space_booked.get((package_id, day), 0) >= seats for day in days
+            ):
+                available.add(space_id)
+                break
+    return available
+
+
+def capacity_shortfalls(db: Session, requests: List[tuple]) -> Dict[int, List[date]]:
+    """
+    Read-only capacity check for a batch of (space, package_id, days) requests,
+    taken in order as if each were booked: {request index: [full days]} for
+    those that would not fit. Requests that do not fit take no seats.
+    """
+    resolved = []
+    for space, package_id, days in requests:
+        ledger_package_id, package = resolve_package(space, package_id)
+        resolved.append((space.id, ledger_package_id, package_capacity(package), days))
+
+    all_days = [day for _, _, _, days in resolved for day in days]
+    if not all_days:
+        return {}
+    booked = _booked_by_space(db, [space_id for space_id, _, _, _ in resolved], min(all_days), max(all_days))
+
+    taken = defaultdict(int)
+    shortfalls = {}
+    for index, (space_id, package_id, capacity, days) in enumerate(resolved):
+        if capacity is None:
+            continue
+        full = [
+            day for day in days
+            if booked.get(space_id, {}).get((package_id, day), 0) + taken[(space_id, package_id, day)]
+            + SEATS_PER_BOOKING > capacity
+        ]
+        if full:
+            shortfalls[index] = full
+            continue
+        for day in days:
+            taken[(space_id, package_id, day)] += SEATS_PER_BOOKING
+    return shortfalls
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute the ledger from every booking; does not commit. Capacity is
+    not enforced, so overbooked days from before the ledger are kept as they are.
+    Returns the number of ledger rows written.
+    """
+    db.query(SpaceOccupancy).delete(synchronize_session=False)
+    seats = defaultdict(int)
+    for booking in db.query(CoworkingBooking).yield_per(_CHUNK_SIZE):
+        if booking.coworking_space_id is None:
+            continue
+        for day in booking_dates(booking.start_date, booking.end_date, booking.days_of_week):
+            seats[(booking.coworking_space_id, booking.package_id or "", day)] += SEATS_PER_BOOKING
+
+    rows = [
+        {"space_id": space_id, "package_id": package_id, "day": day, "booked_seats": booked_seats}
+        for (space_id, package_id, day), booked_seats in seats.items()
+    ]
+    for chunk in _chunks(rows):
+        db.execute(SpaceOccupancy.__table__.insert(), chunk)
+    return len(rows)
+
+
+# ===== LEDGER MAINTENANCE =====
+
+# Columns that decide which seats a booking holds
+_TRACKED_ATTRS = ("coworking_space_id", "package_id", "start_date", "end_date", "days_of_week")
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value before a tracked attribute is overwritten so its history is complete
+for _attr in _TRACKED_ATTRS:
+    event.listen(getattr(CoworkingBooking, _attr), "set", _keep_old_value, active_history=True, retval=True)
+
+
+def _previous_values(booking) -> dict:
+    """The tracked columns as last flushed"""
+    state = inspect(booking)
+    values = {}
+    for attr in _TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.added:
+            values[attr] = None
+        else:
+            values[attr] = getattr(booking, attr)
+    return values
+
+
+def _add_held_seats(values: dict, seats: dict):
+    """Count the seats a booking with these values holds into {(space, package, day): seats}"""
+    if values["coworking_space_id"] is None:
+        return
+    for day in booking_dates(values["start_date"], values["end_date"], values["days_of_week"]):
+        seats[(values["coworking_space_id"], values["package_id"] or "", day)] += SEATS_PER_BOOKING
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_ledger(session, flush_context, instances):
+    """Move the seats of bookings created, changed or deleted in this flush; raises CapacityError when one does not fit"""
+    released = defaultdict(int)
+    reserving = []
+    for obj in session.deleted:
+        if isinstance(obj, CoworkingBooking) and inspect(obj).has_identity:
+            _add_held_seats(_previous_values(obj), released)
+    for obj in session.dirty:
+        if isinstance(obj, CoworkingBooking) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in _TRACKED_ATTRS):
+                _add_held_seats(_previous_values(obj), released)
+                reserving.append(obj)
+    for obj in session.new:
+        if isinstance(obj, CoworkingBooking):
+            reserving.append(obj)
+
+    if not (released or reserving):
+        return
+
+    # Seats given back first, so a booking moved onto overlapping days can reuse its own seat
+    days_by_count = defaultdict(list)
+    for (space_id, package_id, day), count in released.items():
+        days_by_count[(space_id, package_id, count)].append(day)
+    for (space_id, package_id, count), days in sorted(days_by_count.items()):
+        release_seats(session, space_id, package_id, days, seats=count)
+
+    # Summed per (space, package, day), so a package costs one reserve_seats call per distinct seat count
+    seats = defaultdict(int)
+    capacities = {}
+    for booking in reserving:
+        if booking.coworking_space_id is None:
+            continue
+        space = session.get(CoworkingSpaceListing, booking.coworking_space_id)
+        if space is None:
+            continue
+        package_id, package = resolve_package(space, booking.package_id)
+        booking.package_id = package_id or None
+        capacities[(space.id, package_id)] = package_capacity(package)
+        for day in booking_dates(booking.start_date, booking.end_date, booking.days_of_week):
+            seats[(space.id, package_id, day)] += SEATS_PER_BOOKING
+
+    days_by_count = defaultdict(list)
+    for (space_id, package_id, day), count in seats.items():
+        days_by_count[(space_id, package_id, count)].append(day)
+    for (space_id, package_id, count), days in sorted(days_by_count.items()):
+        reserve_seats(session, space_id, package_id, days, capacities[(space_id, package_id)], seats=count)
@@ -0,0 +1,338 @@
+"""
+Materialized nearest-space table for employees.
+
+employee_space_proximity keeps the PROXIMITY_TOP_K nearest verified coworking
+spaces for every located employee, ranked by distance, so a per-employee
+"nearest spaces" lookup is one indexed read instead of a distance scan.
+
+Rows are kept current through SQLAlchemy session events, like the in-process
+spatial index. When an employee's coordinates change, that employee's rows
+are recomputed. When a space is created, moved, verified, unverified or
+deleted, only the employees it can affect are recomputed: those whose list
+already contains it, plus those it is now closer to than their current K-th
+space, which are looked for inside a bounding box around the space.
+
+The recompute is handed to a single background thread after the triggering
+commit and runs in its own session, so the request that committed does not
+wait for it; one worker applies the changes in commit order. Queued changes
+live in memory only: if a process dies with some still queued, run
+scripts/rebuild_space_proximity.py. The listeners are registered by
+app.utils.listeners.register_listeners().
+"""
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, event, func, inspect, not_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.distance import bounding_box, haversine_many
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.employee import Employee
+from shared.models.employee_space_proximity import EmployeeSpaceProximity
+
+TOP_K = settings.PROXIMITY_TOP_K
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+_PENDING_KEY = "proximity_pending"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_last_update: Optional[Future] = None
+
+
+def _located(model):
+    """SQL filter for rows with usable coordinates ((0, 0) means not geocoded yet)"""
+    return and_(
+        model.latitude.isnot(None),
+        model.longitude.isnot(None),
+        not_(and_(model.latitude == 0, model.longitude == 0))
+    )
+
+
+def _has_location(lat, lon) -> bool:
+    return lat is not None and lon is not None and not (lat == 0 and lon == 0)
+
+
+def _chunks(ids: List[int]):
+    for i in range(0, len(ids), _CHUNK_SIZE):
+        yield ids[i:i + _CHUNK_SIZE]
+
+
+def verified_space_arrays(db: Session) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ids, latitudes, longitudes) of every verified space with coordinates"""
+    rows = db.query(
+        CoworkingSpaceListing.id, CoworkingSpaceListing.latitude, CoworkingSpaceListing.longitude
+    ).filter(CoworkingSpaceListing.is_verified == True, _located(CoworkingSpaceListing)).all()
+    return (
+        np.array([row.id for row in rows], dtype=np.int64),
+        np.array([row.latitude for row in rows], dtype=np.float64),
+        np.array([row.longitude for row in rows], dtype=np.float64)
+    )
+
+
+def top_k_spaces(spaces, lat: float, lon: float, k: int = TOP_K) -> List[Tuple[int, float]]:
+    """The k nearest of the given space arrays as (space_id, distance_km), nearest first"""
+    ids, lats, lons = spaces
+    if not len(ids):
+        return []
+
+    distances = haversine_many(lat, lon, lats, lons)
+    if len(distances) > k:
+        candidates = np.argpartition(distances, k - 1)[:k]
+    else:
+        candidates = np.arange(len(distances))
+    order = candidates[np.lexsort((ids[candidates], distances[candidates]))]
+    return [(int(ids[i]), float(distances[i])) for i in order]
+
+
+def refresh_employees(db: Session, employee_ids: Iterable[int], spaces=None) -> int:
+    """
+    Recompute the proximity rows of the given employees.
+
+    Employees that were deleted or have no coordinates end up with no rows.
+    Does not commit. Returns the number of employees recomputed.
+    """
+    employee_ids = sorted(set(employee_ids))
+    if not employee_ids:
+        return 0
+    if spaces is None:
+        spaces = verified_space_arrays(db)
+
+    now = datetime.utcnow()
+    refreshed = 0
+    for chunk in _chunks(employee_ids):
+        db.query(EmployeeSpaceProximity).filter(
+            EmployeeSpaceProximity.employee_id.in_(chunk)
+        ).delete(synchronize_session=False)
+
+        employees = db.query(Employee.id, Employee.latitude, Employee.longitude).filter(
+            Employee.id.in_(chunk), _located(Employee)
+        ).all()
+
+        rows = [
+            {
+                "employee_id": employee.id,
+                "space_id": space_id,
+                "distance_km": distance_km,
+                "rank": rank,
+                "updated_at": now
+            }
+            for employee in employees
+            for rank, (space_id, distance_km) in enumerate(
+                top_k_spaces(spaces, employee.latitude, employee.longitude), start=1
+            )
+        ]
+        if rows:
+            db.bulk_insert_mappings(EmployeeSpaceProximity, rows)
+        refreshed += len(employees)
+
+    return refreshed
+
+
+def employees_affected_by_space(db: Session, space_id: int, coords: Optional[Tuple[float, float]]) -> set:
+    """
+    Employees whose top-K list can change because a space changed.
+
+    coords is the space's new location, or None when it is no longer a
+    verified, located space. Employees the space moved away from or left
+    already list it. At its new location it can only enter the lists of
+    employees closer to it than their K-th space, so only employees inside
+    the bounding box of the largest stored K-th distance are looked at.
+    """
+    affected = {
+        row.employee_id for row in db.query(EmployeeSpaceProximity.employee_id).filter(
+            EmployeeSpaceProximity.space_id == space_id
+        )
+    }
+    if coords is None:
+        return affected
+
+    space_count = db.query(func.count(CoworkingSpaceListing.id)).filter(
+        CoworkingSpaceListing.is_verified == True, _located(CoworkingSpaceListing)
+    ).scalar()
+    if space_count <= TOP_K:
+        # Lists are not full, so every located employee takes this space
+        return affected | {row.id for row in db.query(Employee.id).filter(_located(Employee))}
+
+    # With more than K spaces every list is full; no K-th space is farther than the largest stored distance
+    radius_km = db.query(func.max(EmployeeSpaceProximity.distance_km)).scalar()
+    if radius_km is None:
+        return affected
+    min_lat, max_lat, min_lon, max_lon = bounding_box(coords[0], coords[1], radius_km)
+    if min_lon < -180:
+        lon_filter = or_(Employee.longitude >= min_lon + 360, Employee.longitude <= max_lon)
+    elif max_lon > 180:
+        lon_filter = or_(Employee.longitude >= min_lon, Employee.longitude <= max_lon - 360)
+    else:
+        lon_filter = Employee.longitude.between(min_lon, max_lon)
+    employees = db.query(Employee.id, Employee.latitude, Employee.longitude).filter(
+        _located(Employee), Employee.latitude.between(min_lat, max_lat), lon_filter
+    ).all()
+    if not employees:
+        return affected
+
+    # Distance to the K-th space of the employees in the box; one without a full list takes any space
+    kth_distance = {}
+    for chunk in _chunks([employee.id for employee in employees]):
+        kth_distance.update(
+            db.query(EmployeeSpaceProximity.employee_id, func.max(EmployeeSpaceProximity.distance_km))
+            .filter(EmployeeSpaceProximity.employee_id.in_(chunk))
+            .group_by(EmployeeSpaceProximity.employee_id)
+            .having(func.count(EmployeeSpaceProximity.id) >= TOP_K)
+            .all()
+        )
+    distances = haversine_many(
+        coords[0], coords[1], [employee.latitude for employee in employees], [employee.longitude for employee in employees]
+    )
+    for employee, distance_km in zip(employees, distances):
+        if distance_km < kth_distance.get(employee.id, math.inf):
+            affected.add(employee.id)
+    return affected
+
+
+def apply_changes(db: Session, employee_ids: Iterable[int], space_changes: Dict[int, Optional[Tuple[float, float]]]) -> int:
+    """Recompute everything affected by changed employees and spaces; does not commit"""
+    affected = set(employee_ids)
+    for space_id, coords in space_changes.items():
+        affected |= employees_affected_by_space(db, space_id, coords)
+    return refresh_employees(db, affected)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute the whole table; does not commit. Returns the number of employees with rows."""
+    db.query(EmployeeSpaceProximity).delete(synchronize_session=False)
+    employee_ids = [row.id for row in db.query(Employee.id).filter(_located(Employee))]
+    return refresh_employees(db, employee_ids)
+
+
+def proximity_matches(db: Session, employee_id: int, radius_km: Optional[float] = None, nearest: Optional[int] = None):
+    """
+    (space_id, distance_km) pairs for an employee's nearby-space search, read from the table.
+
+    Returns None when the stored top-K cannot answer the query exactly: the
+    employee has no rows yet, more than K spaces are asked for, or every
+    stored space is inside the radius so more may lie beyond the K-th.
+    """
+    rows = db.query(EmployeeSpaceProximity.space_id, EmployeeSpaceProximity.distance_km).filter(
+        EmployeeSpaceProximity.employee_id == employee_id
+    ).order_by(EmployeeSpaceProximity.rank).all()
+    if not rows:
+        return None
+
+    matches = [(row.space_id, row.distance_km) for row in rows]
+    # Fewer than K rows means every verified space is already listed
+    complete = len(matches) < TOP_K
+
+    if nearest:
+        if nearest <= len(matches) or complete:
+            return matches[:nearest]
+        return None
+
+    within = [match for match in matches if match[1] <= radius_km]
+    if complete or len(within) < len(matches):
+        return within
+    return None
+
+
+# ===== TABLE MAINTENANCE =====
+
+def _location_changed(obj) -> bool:
+    state = inspect(obj)
+    return state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes()
+
+
+def _space_location(space) -> Optional[Tuple[float, float]]:
+    if space.is_verified and _has_location(space.latitude, space.longitude):
+        return (space.latitude, space.longitude)
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_proximity_changes(session, flush_context):
+    """Remember which employees and spaces changed in this flush so they can be applied on commit"""
+    pending = session.info.setdefault(_PENDING_KEY, {"employees": set(), "spaces": {}})
+
+    for obj in session.new:
+        if isinstance(obj, Employee) and obj.id is not None:
+            pending["employees"].add(obj.id)
+        elif isinstance(obj, CoworkingSpaceListing) and obj.id is not None:
+            pending["spaces"][obj.id] = _space_location(obj)
+
+    for obj in session.dirty:
+        if isinstance(obj, Employee) and obj.id is not None and _location_changed(obj):
+            pending["employees"].add(obj.id)
+        elif isinstance(obj, CoworkingSpaceListing) and obj.id is not None and (
+            _location_changed(obj) or inspect(obj).attrs.is_verified.history.has_changes()
+        ):
+            pending["spaces"][obj.id] = _space_location(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, Employee) and obj.id is not None:
+            pending["employees"].add(obj.id)
+        elif isinstance(obj, CoworkingSpaceListing) and obj.id is not None:
+            pending["spaces"][obj.id] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """The update thread, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proximity")
+        return _executor
+
+
+def _apply_pending(bind, employee_ids, space_changes):
+    db = Session(bind=bind)
+    try:
+        apply_changes(db, employee_ids, space_changes)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Failed to update employee_space_proximity: {e}")
+    finally:
+        db.close()
+
+
+def wait_for_updates(timeout: Optional[float] = None):
+    """Block until every change queued so far has been applied"""
+    with _executor_lock:
+        last_update = _last_update
+    if last_update is not None:
+        last_update.result(timeout=timeout)
+
+
+def shutdown():
+    """Apply what is still queued, then stop the update thread"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_proximity_changes(session):
+    global _last_update
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not (pending["employees"] or pending["spaces"]):
+        return
+
+    if not settings.PROXIMITY_BACKGROUND_UPDATES:
+        _apply_pending(session.get_bind(), pending["employees"], pending["spaces"])
+        return
+    future = _get_executor().submit(_apply_pending, session.get_bind(), pending["employees"], pending["spaces"])
+    with _executor_lock:
+        _last_update = future
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_proximity_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,231 @@
+"""
+Revenue rollups for coworking analytics.
+
+revenue_rollups holds the revenue and number of bookings per (space, package,
+granularity, period), for day, week (starting Monday) and month periods. A
+booking counts on the day it was created, like the dashboard's monthly
+revenue, and adds its total_cost to the day, week and month containing it.
+
+Rows are adjusted in the same transaction as the booking write through a
+session after_flush listener: created bookings add to their periods, deleted
+ones take their share back and updated ones move it. Charts read the
+coarsest rollup that fits: whole periods come straight from their rows and
+partial periods at the edges of a range are summed from day rows, so a
+multi-year chart is a couple of index range reads.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func, inspect, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from shared.models.booking import CoworkingBooking
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.revenue_rollup import RevenueRollup
+
+GRANULARITIES = ("day", "week", "month")
+
+# Columns that decide where a booking's revenue lands
+_TRACKED_ATTRS = ("coworking_space_id", "package_id", "created_at", "total_cost")
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+
+def _chunks(values: List):
+    for i in range(0, len(values), _CHUNK_SIZE):
+        yield values[i:i + _CHUNK_SIZE]
+
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the day / week / month containing day"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(start: date, granularity: str) -> date:
+    """Last day of the period starting on start"""
+    if granularity == "week":
+        return start + timedelta(days=6)
+    if granularity == "month":
+        return start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    return start
+
+
+def _contributions(values: dict):
+    """(space_id, package_id, granularity, period_start, revenue) entries for a booking with these values"""
+    if values["coworking_space_id"] is None or values["created_at"] is None:
+        return
+    day = values["created_at"].date() if isinstance(values["created_at"], datetime) else values["created_at"]
+    for granularity in GRANULARITIES:
+        yield (values["coworking_space_id"], values["package_id"] or "", granularity,
+               period_start(day, granularity), values["total_cost"] or 0)
+
+
+def apply_deltas(connection, deltas: Dict[tuple, list]):
+    """Add [revenue, bookings] to rollup rows, creating missing ones; runs on the given connection's transaction"""
+    rows = [
+        {"space_id": space_id, "package_id": package_id, "granularity": granularity, "period_start": start,
+         "revenue": revenue, "bookings": bookings, "updated_at": datetime.utcnow()}
+        for (space_id, package_id, granularity, start), (revenue, bookings) in deltas.items()
+        if revenue or bookings
+    ]
+    if not rows:
+        return
+    table = RevenueRollup.__table__
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["space_id", "granularity", "period_start", "package_id"],
+        set_={
+            "revenue": table.c.revenue + statement.excluded.revenue,
+            "bookings": table.c.bookings + statement.excluded.bookings,
+            "updated_at": statement.excluded.updated_at
+        }
+    )
+    for chunk in _chunks(rows):
+        connection.execute(statement, chunk)
+
+
+def _sum_by_period(db: Session, space_ids: List[int], granularity: str, ranges: List[tuple],
+                   package_id: Optional[str]) -> Dict[date, list]:
+    """{period_start: [revenue, bookings]} of the given granularity's rows inside any of the (first, last) ranges"""
+    totals = defaultdict(lambda: [0.0, 0])
+    if not ranges:
+        return totals
+    for chunk in _chunks(sorted(set(space_ids))):
+        query = db.query(
+            RevenueRollup.period_start, func.sum(RevenueRollup.revenue), func.sum(RevenueRollup.bookings)
+        ).filter(
+            RevenueRollup.space_id.in_(chunk),
+            RevenueRollup.granularity == granularity,
+            or_(*(RevenueRollup.period_start.between(first, last) for first, last in ranges))
+        )
+        if package_id is not None:
+            query = query.filter(RevenueRollup.package_id == package_id)
+        for start, revenue, bookings in query.group_by(RevenueRollup.period_start):
+            totals[start][0] += revenue or 0.0
+            totals[start][1] += bookings or 0
+    return totals
+
+
+def revenue_series(db: Session, space_ids: List[int], first_day: date, last_day: date,
+                   granularity: str = "day", package_id: Optional[str] = None) -> List[dict]:
+    """
+    Revenue and bookings per period between two days (inclusive), zero-filled.
+    Periods cut by the range only count the days inside it.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    periods = []
+    start = period_start(first_day, granularity)
+    while start <= last_day:
+        end = period_end(start, granularity)
+        periods.append((start, end, start >= first_day and end <= last_day))
+        start = end + timedelta(days=1)
+    if not space_ids or not periods:
+        return [
+            {"period_start": start.isoformat(), "period_end": end.isoformat(), "revenue": 0.0, "bookings": 0}
+            for start, end, _ in periods
+        ]
+
+    whole = [start for start, _, complete in periods if complete]
+    totals = _sum_by_period(db, space_ids, granularity, [(whole[0], whole[-1])] if whole else [], package_id)
+
+    # The cut periods at either edge are summed from day rows
+    edges = [(max(start, first_day), min(end, last_day)) for start, end, complete in periods if not complete]
+    if edges and granularity != "day":
+        for day, (revenue, bookings) in _sum_by_period(db, space_ids, "day", edges, package_id).items():
+            totals[period_start(day, granularity)][0] += revenue
+            totals[period_start(day, granularity)][1] += bookings
+
+    return [
+        {
+            "period_start": start.isoformat(),
+            "period_end": end.isoformat(),
+            "revenue": round(totals[start][0], 2) if start in totals else 0.0,
+            "bookings": int(totals[start][1]) if start in totals else 0
+        }
+        for start, end, _ in periods
+    ]
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every rollup from the bookings; does not commit. Returns the number of rows written."""
+    db.query(RevenueRollup).delete(synchronize_session=False)
+    deltas = defaultdict(lambda: [0.0, 0])
+    query = db.query(*(getattr(CoworkingBooking, attr) for attr in _TRACKED_ATTRS))
+    for row in query.yield_per(_CHUNK_SIZE):
+        for space_id, package_id, granularity, start, revenue in _contributions(dict(zip(_TRACKED_ATTRS, row))):
+            deltas[(space_id, package_id, granularity, start)][0] += revenue
+            deltas[(space_id, package_id, granularity, start)][1] += 1
+    apply_deltas(db.connection(), deltas)
+    return sum(1 for revenue, bookings in deltas.values() if revenue or bookings)
+
+
+# ===== TABLE MAINTENANCE =====
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value before a tracked attribute is overwritten so its history is complete
+for _attr in _TRACKED_ATTRS:
+    event.listen(getattr(CoworkingBooking, _attr), "set", _keep_old_value, active_history=True, retval=True)
+
+
+def _values(booking, previous: bool = False) -> dict:
+    state = inspect(booking)
+    values = {}
+    for attr in _TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        if previous and history.deleted:
+            values[attr] = history.deleted[0]
+        elif previous and history.added:
+            values[attr] = None
+        else:
+            values[attr] = getattr(booking, attr)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups(session, flush_context):
+    """Move the revenue of bookings created, changed or deleted in this flush, in the same transaction"""
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, CoworkingBooking):
+            changes.append((None, _values(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, CoworkingBooking):
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in _TRACKED_ATTRS):
+                changes.append((_values(obj, previous=True), _values(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, CoworkingBooking):
+            changes.append((_values(obj), None))
+    deleted_spaces = sorted(obj.id for obj in session.deleted if isinstance(obj, CoworkingSpaceListing))
+
+    if not (changes or deleted_spaces):
+        return
+
+    deltas = defaultdict(lambda: [0.0, 0])
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None:
+                continue
+            for space_id, package_id, granularity, start, revenue in _contributions(values):
+                deltas[(space_id, package_id, granularity, start)][0] += sign * revenue
+                deltas[(space_id, package_id, granularity, start)][1] += sign
+
+    connection = session.connection()
+    apply_deltas(connection, deltas)
+
+    # A deleted space takes its rollups with it
+    for chunk in _chunks(deleted_spaces):
+        connection.execute(RevenueRollup.__table__.delete().where(RevenueRollup.space_id.in_(chunk)))
@@ -0,0 +1,260 @@
+"""
+In-process spatial index over verified coworking spaces.
+
+Verified spaces are bucketed into a fixed lat/lon grid (a geohash-style cell
+table), so a radius search only visits the cells overlapping the search
+circle instead of every verified listing in the database.
+
+The index is filled lazily on first use and kept current through SQLAlchemy
+session events: whenever a CoworkingSpaceListing is created, moved, verified,
+unverified or deleted and the transaction commits, its cell entry is updated.
+Writes made by other servers (the coworking and admin apps run in separate
+processes) are picked up by a periodic resync.
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.distance import EARTH_RADIUS_KM, bounding_box, haversine_many
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+
+# Grid resolution in degrees (~11 km of latitude per cell)
+CELL_SIZE_DEG = 0.1
+
+# Half the Earth's circumference: a search this wide covers every point
+MAX_SEARCH_RADIUS_KM = math.pi * EARTH_RADIUS_KM
+
+_PENDING_KEY = "spatial_index_pending"
+
+
+class SpatialIndex:
+    """Grid-cell index mapping verified space ids to their coordinates"""
+
+    def __init__(self, cell_size_deg: float = CELL_SIZE_DEG, resync_interval: Optional[int] = None):
+        self.cell_size_deg = cell_size_deg
+        self.resync_interval = (
+            settings.SPATIAL_INDEX_RESYNC_SECONDS if resync_interval is None else resync_interval
+        )
+        self._columns = int(round(360 / cell_size_deg))
+        self._rows = int(round(180 / cell_size_deg))
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = {}
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _row(self, lat: float) -> int:
+        return min(max(int(math.floor((lat + 90) / self.cell_size_deg)), 0), self._rows - 1)
+
+    def _column(self, lon: float) -> int:
+        return int(math.floor((lon + 180) / self.cell_size_deg)) % self._columns
+
+    def _cell_key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return self._row(lat), self._column(lon)
+
+    def upsert(self, space_id: int, lat: float, lon: float):
+        """Insert a space or move it to new coordinates"""
+        with self._lock:
+            self.remove(space_id)
+            self._points[space_id] = (lat, lon)
+            self._cells.setdefault(self._cell_key(lat, lon), {})[space_id] = (lat, lon)
+
+    def remove(self, space_id: int):
+        """Drop a space from the index if present"""
+        with self._lock:
+            coords = self._points.pop(space_id, None)
+            if coords is None:
+                return
+            key = self._cell_key(*coords)
+            cell = self._cells.get(key)
+            if cell is not None:
+                cell.pop(space_id, None)
+                if not cell:
+                    del self._cells[key]
+
+    def rebuild(self, rows):
+        """Replace the index contents with (id, latitude, longitude) rows"""
+        with self._lock:
+            self._cells = {}
+            self._points = {}
+            for space_id, lat, lon in rows:
+                if lat is None or lon is None:
+                    continue
+                self.upsert(space_id, lat, lon)
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        """Load the index from the database on first use or once it is due a resync"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.resync_interval:
+            return
+        rows = db.query(
+            CoworkingSpaceListing.id,
+            CoworkingSpaceListing.latitude,
+            CoworkingSpaceListing.longitude
+        ).filter(CoworkingSpaceListing.is_verified == True).all()
+        self.rebuild(rows)
+
+    def _candidate_cells(self, lat: float, lon: float, radius_km: float):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        rows = range(self._row(min_lat), self._row(max_lat) + 1)
+
+        first = int(math.floor((min_lon + 180) / self.cell_size_deg))
+        last = int(math.floor((max_lon + 180) / self.cell_size_deg))
+        if last - first + 1 >= self._columns:
+            columns = range(self._columns)
+        else:
+            # Wrap around the antimeridian
+            columns = [c % self._columns for c in range(first, last + 1)]
+
+        if len(rows) * len(columns) > len(self._cells):
+            # Wide boxes (near a pole, or wrapping the globe) cover more grid cells than are occupied
+            column_set = set(columns)
+            for (row, column), cell in self._cells.items():
+                if row in rows and column in column_set:
+                    yield cell
+            return
+
+        for row in rows:
+            for column in columns:
+                cell = self._cells.get((row, column))
+                if cell:
+                    yield cell
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        """
+        Find indexed spaces within radius_km of (lat, lon).
+
+        Returns (space_id, distance_km) pairs sorted by distance.
+        """
+        ids, lats, lons = [], [], []
+        with self._lock:
+            for cell in self._candidate_cells(lat, lon, radius_km):
+                for space_id, (space_lat, space_lon) in cell.items():
+                    ids.append(space_id)
+                    lats.append(space_lat)
+                    lons.append(space_lon)
+        if not ids:
+            return []
+
+        distances = haversine_many(lat, lon, lats, lons)
+        matches = [
+            (space_id, float(distance_km))
+            for space_id, distance_km in zip(ids, distances)
+            if distance_km <= radius_km
+        ]
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def query_nearest(self, lat: float, lon: float, k: int) -> List[Tuple[int, float]]:
+        """
+        Find the k indexed spaces nearest to (lat, lon).
+
+        Runs radius queries with a doubling radius, starting at one cell, until
+        at least k spaces are found, every indexed space has been found or the
+        whole globe is covered.
+        """
+        return nearest_by_expanding_radius(
+            lambda radius_km: self.query_radius(lat, lon, radius_km),
+            k,
+            start_radius_km=self.cell_size_deg * 111.0,
+            total=len(self)
+        )
+
+
+def nearest_by_expanding_radius(
+    query_radius,
+    k: int,
+    start_radius_km: float,
+    total: Optional[int] = None,
+    keep: Optional[Callable[[list], list]] = None
+) -> List[Tuple[int, float]]:
+    """
+    k-nearest search on top of any radius query returning sorted (id, distance_km) pairs.
+
+    Every space within the final radius is returned by that query, so once it
+    yields k or more matches the first k are exactly the k nearest. keep
+    filters each query's matches (order preserved) before they are counted.
+    total is how many spaces the query can return at all: once a query has
+    returned that many, a wider radius cannot find more and the search stops.
+    """
+    if total == 0:
+        return []
+    radius_km = start_radius_km
+    while True:
+        matches = query_radius(radius_km)
+        everything_found = total is not None and len(matches) >= total
+        if keep is not None:
+            matches = keep(matches)
+        if len(matches) >= k or everything_found or radius_km >= MAX_SEARCH_RADIUS_KM:
+            return matches[:k]
+        radius_km = min(radius_km * 2, MAX_SEARCH_RADIUS_KM)
+
+
+def within_bounding_box(lat: float, lon: float, radius_km: float):
+    """
+    SQL filter selecting listings inside the bounding box of a search circle.
+
+    Served by the (is_verified, latitude, longitude) index on
+    coworkingspacelistings; callers still need an exact distance check.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    latitude = CoworkingSpaceListing.latitude
+    longitude = CoworkingSpaceListing.longitude
+
+    if min_lon < -180:
+        lon_filter = or_(longitude >= min_lon + 360, longitude <= max_lon)
+    elif max_lon > 180:
+        lon_filter = or_(longitude >= min_lon, longitude <= max_lon - 360)
+    else:
+        lon_filter = longitude.between(min_lon, max_lon)
+
+    return and_(latitude.between(min_lat, max_lat), lon_filter)
+
+
+# Shared index used by the nearby-space endpoints
+verified_space_index = SpatialIndex()
+
+
+# ===== INDEX MAINTENANCE =====
+
+@event.listens_for(Session, "after_flush")
+def _collect_space_changes(session, flush_context):
+    """Remember which listings changed in this flush so they can be applied on commit"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, CoworkingSpaceListing) and obj.id is not None:
+            if obj.is_verified and obj.latitude is not None and obj.longitude is not None:
+                pending[obj.id] = (obj.latitude, obj.longitude)
+            else:
+                pending[obj.id] = None
+    for obj in session.deleted:
+        if isinstance(obj, CoworkingSpaceListing) and obj.id is not None:
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_space_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not verified_space_index.is_loaded:
+        return
+    for space_id, coords in pending.items():
+        if coords is None:
+            verified_space_index.remove(space_id)
+        else:
+            verified_space_index.upsert(space_id, *coords)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_space_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,179 @@
+"""
+Batched travel-time lookups through the Google Distance Matrix API.
+
+One origin is sent with up to MAX_DESTINATIONS_PER_REQUEST destinations per
+call (the API's per-request limit), and at most max_concurrent_batches of
+them run at once on the pooled async Maps client. The real origin is what gets
+sent; results are cached per (origin cell, destination, mode), the cell being
+a small grid square around the origin, so nearby employees share cached
+results. Each cached element stays valid for TRAVEL_TIME_CACHE_TTL_SECONDS.
+A batch whose call fails is not cached, so its destinations are asked again
+on the next lookup instead of reading as unreachable for the whole TTL.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.maps_client import AsyncMapsClient, MapsAPIError
+
+# Distance Matrix accepts at most 25 destinations per request
+MAX_DESTINATIONS_PER_REQUEST = 25
+
+# Origins are snapped to this grid (~1 km) to key the cache
+ORIGIN_CELL_DEG = 0.01
+
+TRAVEL_MODES = {"driving", "walking", "bicycling", "transit"}
+
+
+def _origin_cell(lat: float, lon: float) -> Tuple[float, float]:
+    """Centre of the grid cell containing an origin"""
+    return (
+        round((math.floor(lat / ORIGIN_CELL_DEG) + 0.5) * ORIGIN_CELL_DEG, 5),
+        round((math.floor(lon / ORIGIN_CELL_DEG) + 0.5) * ORIGIN_CELL_DEG, 5)
+    )
+
+
+class TravelTimeService:
+    """Ranks destinations by travel time from one origin with batched, cached Distance Matrix calls"""
+
+    def __init__(
+        self,
+        client: AsyncMapsClient,
+        ttl_seconds: int = settings.TRAVEL_TIME_CACHE_TTL_SECONDS,
+        max_entries: int = settings.TRAVEL_TIME_CACHE_MAX_ENTRIES,
+        max_concurrent_batches: int = settings.TRAVEL_TIME_MAX_CONCURRENT_BATCHES
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_concurrent_batches = max_concurrent_batches
+        self.requests_sent = 0
+        self._cache: "OrderedDict[tuple, Tuple[float, Optional[dict]]]" = OrderedDict()
+
+    def _cache_get(self, key: tuple):
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, element = entry
+        if expires_at <= time.time():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, element
+
+    def _cache_set(self, key: tuple, element: Optional[dict]):
+        self._cache[key] = (time.time() + self.ttl_seconds, element)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _fetch_batch(self, origin: Tuple[float, float], destinations: List[Tuple[float, float]], mode: str) -> Optional[List[Optional[dict]]]:
+        """
+        One Distance Matrix call; returns one element (or None when unreachable) per
+        destination, or None when the call itself failed and nothing is known.
+        """
+        self.requests_sent += 1
+        try:
+            data = await self.client.distance_matrix(
+                f"{origin[0]},{origin[1]}",
+                "|".join(f"{lat},{lon}" for lat, lon in destinations),
+                mode=mode
+            )
+        except MapsAPIError as e:
+            print(f"❌ Distance Matrix batch failed: {e}")
+            return None
+
+        if data.get("status") != "OK":
+            print(f"❌ Distance Matrix API failed: {data.get('status')}")
+            return None
+
+        rows = data.get("rows") or [{}]
+        elements = rows[0].get("elements") or []
+        if len(elements) != len(destinations):
+            print(f"❌ Distance Matrix returned {len(elements)} elements for {len(destinations)} destinations")
+            return None
+        return [
+            {
+                "distance_text": element["distance"]["text"],
+                "distance_value": element["distance"]["value"],
+                "duration_text": element["duration"]["text"],
+                "duration_value": element["duration"]["value"]
+            } if element.get("status") == "OK" else None
+            for element in elements
+        ]
+
+    async def travel_times(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        destinations: List[Tuple[int, float, float]],
+        mode: str = "driving"
+    ) -> Dict[int, Optional[dict]]:
+        """
+        Travel distance/duration from one origin to many (id, lat, lon) destinations.
+
+        Returns {id: element}; element is None when no route was found, or
+        when its batch failed. Cached destinations are answered locally; the
+        rest are fetched from the exact origin in batches of
+        MAX_DESTINATIONS_PER_REQUEST, at most max_concurrent_batches at a time.
+        Only answers from successful calls are cached.
+        """
+        origin = (round(origin_lat, 5), round(origin_lon, 5))
+        cell = _origin_cell(origin_lat, origin_lon)
+        results: Dict[int, Optional[dict]] = {}
+        missing: List[Tuple[int, Tuple[float, float]]] = []
+
+        for dest_id, lat, lon in destinations:
+            point = (round(lat, 5), round(lon, 5))
+            found, element = self._cache_get((cell, point, mode))
+            if found:
+                results[dest_id] = element
+            else:
+                missing.append((dest_id, point))
+
+        batches = [
+            missing[i:i + MAX_DESTINATIONS_PER_REQUEST]
+            for i in range(0, len(missing), MAX_DESTINATIONS_PER_REQUEST)
+        ]
+        in_flight = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def fetch(batch):
+            async with in_flight:
+                return await self._fetch_batch(origin, [point for _, point in batch], mode)
+
+        fetched = await asyncio.gather(*[fetch(batch) for batch in batches])
+
+        for batch, elements in zip(batches, fetched):
+            if elements is None:
+                # The call failed, which says nothing about these routes: answer None but keep asking
+                for dest_id, _ in batch:
+                    results[dest_id] = None
+                continue
+            for (dest_id, point), element in zip(batch, elements):
+                self._cache_set((cell, point, mode), element)
+                results[dest_id] = element
+
+        return results
+
+    async def rank(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        destinations: List[Tuple[int, float, float]],
+        mode: str = "driving"
+    ) -> List[Tuple[int, float, Optional[dict]]]:
+        """
+        Destinations ordered by travel duration as (id, duration_seconds, element).
+
+        Unreachable destinations sort last with a duration of infinity.
+        """
+        times = await self.travel_times(origin_lat, origin_lon, destinations, mode)
+        ranked = [
+            (dest_id, float(element["duration_value"]) if element else math.inf, element)
+            for dest_id, element in times.items()
+        ]
+        ranked.sort(key=lambda item: (item[1], item[0]))
+        return ranked
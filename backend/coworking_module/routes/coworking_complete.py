@@ -5,12 +5,13 @@ All coworking-related endpoints in one place
 import json
 import os
 import uuid
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import text, func, extract
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from shared.database import get_db
 from shared.models.coworking_user import CoworkingUser
@@ -20,7 +21,15 @@ from shared.models.coworking_images import CoworkingImage
 from shared.models.amenity import Amenity
 from coworking_module.auth.coworking_auth import get_current_coworking_user as auth_get_current_coworking_user
 from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+from coworking_module.utils.thumbnail_jobs import THUMBNAIL_PENDING, enqueue_thumbnails
+from coworking_module.utils.image_upload import UploadRejected, stream_image_upload
+from coworking_module.utils.image_store import (
+    add_reference, apply_blob_thumbnails, blob_url, release_references, remove_files, retain_by_url
+)
+from app.config import settings
 from app.auth import hash_password, verify_password, create_access_token
+from app.utils.counters import read_counters
+from app.utils.revenue import GRANULARITIES as REVENUE_GRANULARITIES, revenue_series
 
 router = APIRouter(tags=["Coworking"])
 
@@ -186,6 +195,7 @@ def get_my_spaces(current_user=Depends(auth_get_current_coworking_user), db: Ses
                                     "thumbnail_url": img.thumbnail_url,
                                     "thumbnail_small_url": img.thumbnail_small_url,
                                     "thumbnail_medium_url": img.thumbnail_medium_url,
+                                    "thumbnail_status": img.thumbnail_status,
                                     "image_name": img.image_name,
                                     "image_description": img.image_description,
                                     "is_primary": img.is_primary
@@ -226,6 +236,7 @@ def get_my_spaces(current_user=Depends(auth_get_current_coworking_user), db: Ses
                     "thumbnail_url": img.thumbnail_url,
                     "thumbnail_small_url": img.thumbnail_small_url,
                     "thumbnail_medium_url": img.thumbnail_medium_url,
+                    "thumbnail_status": img.thumbnail_status,
                     "image_name": img.image_name,
                     "image_description": img.image_description,
                     "is_primary": img.is_primary
@@ -289,91 +300,75 @@ def get_coworking_stats(current=Depends(get_current_coworking_user), db: Session
     """Get dashboard statistics for coworking space owner"""
     user = current["user"]
     
-    # Get all spaces owned by this user
-    user_spaces = db.query(CoworkingSpaceListing).filter_by(coworking_user_id=user.id).all()
-    space_ids = [space.id for space in user_spaces]
-    
-    total_spaces = len(user_spaces)
-    
-    if not space_ids:
-        return CoworkingStats(
-            total_spaces=0,
-            total_bookings=0,
-            monthly_revenue=0.0,
-            active_bookings=0
-        )
-    
-    # Get booking statistics
-    total_bookings = db.query(CoworkingBooking).filter(
-        CoworkingBooking.coworking_space_id.in_(space_ids)
-    ).count()
-    
-    # Get current month revenue
-    current_month = datetime.now().replace(day=1)
-    monthly_revenue = db.query(func.sum(CoworkingBooking.total_cost)).filter(
-        CoworkingBooking.coworking_space_id.in_(space_ids),
-        CoworkingBooking.created_at >= current_month
-    ).scalar() or 0.0
-    
-    # Get active bookings (current and future)
-    today = datetime.now().date()
-    active_bookings = db.query(CoworkingBooking).filter(
-        CoworkingBooking.coworking_space_id.in_(space_ids),
-        CoworkingBooking.end_date >= today
-    ).count()
+    # Counters are kept current on write; one indexed read instead of a space scan and three aggregates
+    now = datetime.now()
+    counters = read_counters(db, "coworking_user", user.id, since={
+        "revenue_by_created_month": now.strftime("%Y-%m"),
+        "bookings_by_end_date": now.date().isoformat()
+    })
     
     return CoworkingStats(
-        total_spaces=total_spaces,
-        total_bookings=total_bookings,
-        monthly_revenue=float(monthly_revenue),
-        active_bookings=active_bookings
+        total_spaces=int(counters.get("spaces", 0)),
+        total_bookings=int(counters.get("bookings", 0)),
+        monthly_revenue=float(counters.get("revenue_by_created_month", 0.0)),
+        active_bookings=int(counters.get("bookings_by_end_date", 0))
     )
 
 # ===== REVENUE ANALYTICS ENDPOINTS =====
 
+MAX_REVENUE_RANGE_DAYS = 3660  # ten years of daily points
+
 @router.get("/analytics/revenue")
 def get_revenue_analytics(
-    days: int = Query(30, description="Number of days to analyze"),
+    days: int = Query(30, ge=1, description="Number of days to analyze when no start_date is given"),
+    start_date: Optional[date] = Query(None, description="First day of the range (defaults to today minus days)"),
+    end_date: Optional[date] = Query(None, description="Last day of the range (defaults to today)"),
+    granularity: str = Query("day", description="'day', 'week' (starting Monday) or 'month'"),
+    space_id: Optional[int] = Query(None, description="Only this space"),
+    package_id: Optional[str] = Query(None, description="Only this package"),
     current=Depends(get_current_coworking_user),
     db: Session = Depends(get_db)
 ):
-    """Get revenue analytics for the last N days"""
+    """Get revenue analytics per day, week or month for a date range"""
     user = current["user"]
     
-    # Get all spaces owned by this user
-    user_spaces = db.query(CoworkingSpaceListing).filter_by(coworking_user_id=user.id).all()
-    space_ids = [space.id for space in user_spaces]
-    
-    if not space_ids:
-        return {"daily_revenue": [], "total_revenue": 0.0}
-    
-    # Get revenue data for the last N days
-    start_date = datetime.now() - timedelta(days=days)
-    
-    bookings = db.query(CoworkingBooking).filter(
-        CoworkingBooking.coworking_space_id.in_(space_ids),
-        CoworkingBooking.created_at >= start_date
-    ).all()
-    
-    # Group by date
-    daily_revenue = {}
-    total_revenue = 0.0
-    
-    for booking in bookings:
-        date_key = booking.created_at.date().isoformat()
-        if date_key not in daily_revenue:
-            daily_revenue[date_key] = 0.0
-        daily_revenue[date_key] += float(booking.total_cost)
-        total_revenue += float(booking.total_cost)
-    
-    return {
-        "daily_revenue": [
-            {"date": date, "revenue": revenue}
-            for date, revenue in sorted(daily_revenue.items())
-        ],
+    if granularity not in REVENUE_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularity must be one of: " + ", ".join(REVENUE_GRANULARITIES))
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=days)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    if (end_date - start_date).days > MAX_REVENUE_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail="Date range is limited to ten years")
+    
+    # Spaces owned by this user (ids only)
+    space_query = db.query(CoworkingSpaceListing.id).filter(CoworkingSpaceListing.coworking_user_id == user.id)
+    if space_id is not None:
+        space_query = space_query.filter(CoworkingSpaceListing.id == space_id)
+    space_ids = [row.id for row in space_query]
+    if space_id is not None and not space_ids:
+        raise HTTPException(status_code=404, detail="Space not found")
+    
+    # Read from the rollups kept current on every booking write
+    series = revenue_series(db, space_ids, start_date, end_date, granularity, package_id)
+    total_revenue = round(sum(entry["revenue"] for entry in series), 2)
+    
+    result = {
+        "granularity": granularity,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "series": series,
         "total_revenue": total_revenue,
-        "period_days": days
+        "total_bookings": sum(entry["bookings"] for entry in series),
+        "period_days": (end_date - start_date).days
     }
+    if granularity == "day":
+        # Shape returned before the rollups existed: only days with bookings
+        result["daily_revenue"] = [
+            {"date": entry["period_start"], "revenue": entry["revenue"]}
+            for entry in series if entry["bookings"]
+        ]
+    return result
 
 # ===== PROFILE MANAGEMENT ENDPOINTS =====
 
@@ -449,6 +444,7 @@ class PackageUpdateData(BaseModel):
     price_per_week: Optional[float] = None
     price_per_month: Optional[float] = None
     amenities: Optional[str] = None  # JSON string of amenities
+    capacity: Optional[int] = Field(None, ge=0)  # Seats per day; employer bookings are refused once full
     images: Optional[List[Dict]] = None  # List of image data
 
 @router.put("/spaces/{space_id}/basic-info")
@@ -562,6 +558,8 @@ def update_single_package(
                 pkg['price_per_month'] = data.price_per_month
             if data.amenities is not None:
                 pkg['amenities'] = data.amenities
+            if data.capacity is not None:
+                pkg['capacity'] = data.capacity
             break
     
     if not package_found:
@@ -573,12 +571,14 @@ def update_single_package(
     # Handle package images if provided
     if data.images is not None:
         # Delete existing package images
-        db.query(CoworkingImage).filter(
+        package_images = db.query(CoworkingImage).filter(
             CoworkingImage.space_id == space_id,
             CoworkingImage.package_id == str(package_id)
-        ).delete()
+        )
+        released_blob_ids = [blob_id for (blob_id,) in package_images.with_entities(CoworkingImage.blob_id)]
+        package_images.delete()
         
-        # Add new package images
+        # Add new package images; images kept from the old list reference their stored file again
         for img_data in data.images:
             new_image = CoworkingImage(
                 space_id=space_id,
@@ -588,10 +588,16 @@ def update_single_package(
                 image_description=img_data.get('image_description', ''),
                 is_primary=img_data.get('is_primary', False)
             )
+            retain_by_url(db, new_image)
             db.add(new_image)
+        
+        released_files = release_references(db, released_blob_ids)
     
     space.updated_at = datetime.now()
     db.commit()
+    if data.images is not None:
+        # Files no longer used by any image are removed
+        remove_files(db, released_files)
     
     return {"message": "Package updated successfully"}
 
@@ -780,6 +786,7 @@ def get_space_details(
             "thumbnail_url": thumbnail_url,
             "thumbnail_small_url": thumbnail_small_url,
             "thumbnail_medium_url": thumbnail_medium_url,
+            "thumbnail_status": image.thumbnail_status,
             "image_name": image.image_name,
             "image_description": image.image_description,
             "is_primary": bool(image.is_primary)
@@ -948,68 +955,34 @@ def get_space_images(
 
 from fastapi import Form
 
-@router.post("/spaces/{space_id}/images")
-async def upload_space_image(
-    space_id: int,
-    file: UploadFile = File(...),
-    package_id: Optional[str] = Form(None),
-    is_primary: Optional[str] = Form("false"),
-    current_user=Depends(auth_get_current_coworking_user),
-    db: Session = Depends(get_db)
-):
-    """Upload a new image for a coworking space with package association"""
-    
-    print(f"🖼️ Image upload request:")
-    print(f"   Space ID: {space_id}")
-    print(f"   Package ID: {package_id}")
-    print(f"   Is Primary: {is_primary}")
-    print(f"   File: {file.filename}")
-    
-    # Verify space ownership
-    space = db.query(CoworkingSpaceListing).filter(
+# The upload body is parsed by stream_image_upload, so describe the form for the docs here
+IMAGE_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "package_id": {"type": "string"},
+                        "is_primary": {"type": "string", "default": "false"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+def _owned_space(db: Session, space_id: int, coworking_user_id: int) -> Optional[CoworkingSpaceListing]:
+    return db.query(CoworkingSpaceListing).filter(
         CoworkingSpaceListing.id == space_id,
-        CoworkingSpaceListing.coworking_user_id == current_user["user"].id
+        CoworkingSpaceListing.coworking_user_id == coworking_user_id
     ).first()
-    
-    if not space:
-        raise HTTPException(status_code=404, detail="Space not found or not owned by you")
-    
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="Only JPEG, PNG, and WebP images are allowed")
-    
-    # Create uploads directory if it doesn't exist
-    upload_dir = "uploads/coworking_images"
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save image: {str(e)}")
-    
-    # Generate thumbnails
-    thumbnail_urls = {}
-    try:
-        thumbnail_generator = ThumbnailGenerator(upload_dir)
-        base_filename = os.path.splitext(unique_filename)[0]  # Remove extension
-        thumbnail_urls = thumbnail_generator.generate_thumbnails(file_path, base_filename)
-        print(f"✅ Generated thumbnails: {thumbnail_urls}")
-    except Exception as e:
-        print(f"⚠️ Failed to generate thumbnails: {str(e)}")
-        # Continue without thumbnails - don't fail the upload
-        thumbnail_urls = {'small': None, 'medium': None, 'large': None}
-    
-    # Convert is_primary string to boolean
-    is_primary_bool = is_primary.lower() == "true" if is_primary else False
+
+def _save_space_image(db: Session, space_id: int, upload, upload_dir: str, package_id: Optional[str], is_primary: bool) -> dict:
+    """Store a streamed upload and record its image row; blocking, so run in a worker thread"""
     
     # Check if this is the first image for this package (make it primary)
     if package_id:
@@ -1017,30 +990,54 @@ async def upload_space_image(
             CoworkingImage.space_id == space_id,
             CoworkingImage.package_id == package_id
         ).count()
-        should_be_primary = is_primary_bool or (existing_package_images_count == 0)
+        should_be_primary = is_primary or (existing_package_images_count == 0)
     else:
         existing_images_count = db.query(CoworkingImage).filter(
             CoworkingImage.space_id == space_id,
             CoworkingImage.package_id.is_(None)
         ).count()
-        should_be_primary = is_primary_bool or (existing_images_count == 0)
+        should_be_primary = is_primary or (existing_images_count == 0)
     
-    # Save image record to database with thumbnail URLs
+    # Store the file once per content; an already stored photo only gains a reference
+    try:
+        blob, is_new_blob = add_reference(db, upload, upload_dir)
+    except Exception:
+        upload.discard()
+        raise
+    if not is_new_blob:
+        print(f"♻️ Same content as stored image {blob.filename} ({blob.ref_count} references)")
+    
+    # Save image record; it shares the blob's thumbnails, filled in when the worker pool is done for new content
     new_image = CoworkingImage(
         space_id=space_id,
         package_id=package_id,
-        image_url=f"/uploads/coworking_images/{unique_filename}",
-        image_name=file.filename,
+        image_url=blob_url(blob),
+        image_name=upload.filename,
         is_primary=1 if should_be_primary else 0,
-        thumbnail_url=thumbnail_urls.get('large'),  # Main thumbnail for display
-        thumbnail_small_url=thumbnail_urls.get('small'),  # Small thumbnail for lists
-        thumbnail_medium_url=thumbnail_urls.get('medium')  # Medium thumbnail for cards
+        content_sha256=upload.sha256,
+        blob_id=blob.id
     )
+    apply_blob_thumbnails(new_image, blob)
     
     db.add(new_image)
     db.commit()
     db.refresh(new_image)
     
+    if is_new_blob:
+        # Generate thumbnails off the event loop
+        try:
+            enqueue_thumbnails(blob.id, os.path.join(upload_dir, blob.filename), upload_dir)
+        except Exception as e:
+            print(f"⚠️ Failed to queue thumbnails: {str(e)}")
+            # Keep the upload; the blob is re-queued at the next start
+    elif new_image.thumbnail_status == THUMBNAIL_PENDING:
+        # The blob's job may have finished between reading the blob and committing this row
+        db.refresh(blob)
+        if blob.thumbnail_status != THUMBNAIL_PENDING:
+            apply_blob_thumbnails(new_image, blob)
+            db.commit()
+            db.refresh(new_image)
+    
     return {
         "message": "Image uploaded successfully",
         "image_id": new_image.id,
@@ -1048,9 +1045,82 @@ async def upload_space_image(
         "thumbnail_url": new_image.thumbnail_url,
         "thumbnail_small_url": new_image.thumbnail_small_url,
         "thumbnail_medium_url": new_image.thumbnail_medium_url,
+        "thumbnail_status": new_image.thumbnail_status,
+        "duplicate": not is_new_blob,
+        "status_url": f"/coworking/spaces/images/{new_image.id}/status",
         "is_primary": new_image.is_primary
     }
 
+@router.post("/spaces/{space_id}/images", openapi_extra=IMAGE_UPLOAD_OPENAPI)
+async def upload_space_image(
+    space_id: int,
+    request: Request,
+    current_user=Depends(auth_get_current_coworking_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a new image for a coworking space with package association.
+
+    Async only to stream the body; the database and file work runs in the threadpool.
+    """
+    
+    # Verify space ownership before reading the body
+    space = await run_in_threadpool(_owned_space, db, space_id, current_user["user"].id)
+    
+    if not space:
+        raise HTTPException(status_code=404, detail="Space not found or not owned by you")
+    
+    # Stream the file to disk, checking its type and size as it arrives
+    upload_dir = "uploads/coworking_images"
+    try:
+        upload = await stream_image_upload(request, upload_dir, settings.MAX_IMAGE_UPLOAD_BYTES)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    # Empty form values count as missing, as they did with Form(None)
+    package_id = upload.fields.get("package_id") or None
+    is_primary = upload.fields.get("is_primary") or "false"
+    
+    print(f"🖼️ Image upload request:")
+    print(f"   Space ID: {space_id}")
+    print(f"   Package ID: {package_id}")
+    print(f"   Is Primary: {is_primary}")
+    print(f"   File: {upload.filename} ({upload.content_type}, {upload.size} bytes)")
+    
+    # Convert is_primary string to boolean
+    is_primary_bool = is_primary.lower() == "true" if is_primary else False
+    
+    return await run_in_threadpool(_save_space_image, db, space_id, upload, upload_dir, package_id, is_primary_bool)
+
+@router.get("/spaces/images/{image_id}/status")
+def get_space_image_status(
+    image_id: int,
+    current_user=Depends(auth_get_current_coworking_user),
+    db: Session = Depends(get_db)
+):
+    """Thumbnail processing state of an uploaded image, for polling after an upload"""
+    
+    image = db.query(CoworkingImage).join(
+        CoworkingSpaceListing,
+        CoworkingImage.space_id == CoworkingSpaceListing.id
+    ).filter(
+        CoworkingImage.id == image_id,
+        CoworkingSpaceListing.coworking_user_id == current_user["user"].id
+    ).first()
+    
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found or not owned by you")
+    
+    return {
+        "image_id": image.id,
+        "thumbnail_status": image.thumbnail_status,
+        "thumbnail_error": image.thumbnail_error,
+        "image_url": image.image_url,
+        "thumbnail_url": image.thumbnail_url,
+        "thumbnail_small_url": image.thumbnail_small_url,
+        "thumbnail_medium_url": image.thumbnail_medium_url
+    }
+
 @router.delete("/spaces/images/{image_id}")
 def delete_space_image(
     image_id: int,
@@ -1071,6 +1141,18 @@ def delete_space_image(
     if not image:
         raise HTTPException(status_code=404, detail="Image not found or not owned by you")
     
+    if image.blob_id is not None:
+        # Shared file: only the last image using it deletes it
+        db.delete(image)
+        db.flush()
+        released_files = release_references(db, [image.blob_id])
+        db.commit()
+        remove_files(db, released_files)
+        return {
+            "message": "Image and thumbnails deleted successfully",
+            "image_id": image_id
+        }
+    
     # Delete physical files
     try:
         # Delete original image
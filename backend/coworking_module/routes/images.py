@@ -0,0 +1,92 @@
+"""
+Thumbnail serving with format negotiation.
+
+Thumbnail URLs point at the JPEG (.../thumbnails/<size>/<name>.jpg). This
+router is included ahead of the static /uploads mount and answers those
+requests with the AVIF or WebP copy instead when the request's Accept
+header names that type and the copy exists, falling back to the JPEG.
+Browsers list the image formats they decode in the Accept header of image
+requests, so stored URLs and the frontend stay as they are. Responses
+carry Vary: Accept so caches keep one copy per format.
+"""
+import os
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+
+router = APIRouter(tags=["Coworking Images"])
+
+THUMBNAILS_DIR = os.path.join("uploads", "coworking_images", "thumbnails")
+THUMBNAIL_SIZES = ("small", "medium", "large")
+
+# Thumbnails only change when they are regenerated from the same original
+THUMBNAIL_CACHE_CONTROL = "public, max-age=86400"
+
+
+def accepted_types(accept: str) -> Dict[str, float]:
+    """
+    {media type: q} of the types an Accept header names explicitly with q > 0.
+    Wildcards are ignored: image/* or */* says nothing about AVIF or WebP support.
+    """
+    types = {}
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type and "*" not in media_type and q > 0:
+            types[media_type.lower()] = q
+    return types
+
+
+@router.api_route("/uploads/coworking_images/thumbnails/{size}/{filename}", methods=["GET", "HEAD"], include_in_schema=False)
+def get_thumbnail(size: str, filename: str, request: Request):
+    """Serve a thumbnail, as AVIF or WebP when the client accepts it and the copy exists"""
+    if size not in THUMBNAIL_SIZES or filename != os.path.basename(filename):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+
+    directory = os.path.join(THUMBNAILS_DIR, size)
+    base_filename, extension = os.path.splitext(filename)
+    path = os.path.join(directory, filename)
+    media_type = "image/jpeg"
+    for variant_extension, _, variant_type, _ in ThumbnailGenerator.VARIANT_FORMATS:
+        if extension == f".{variant_extension}":
+            media_type = variant_type
+
+    if extension == ".jpg":
+        # Highest q first; on a tie the smaller format (VARIANT_FORMATS order)
+        accepted = accepted_types(request.headers.get("accept", ""))
+        candidates = sorted(
+            (
+                (-accepted[variant_type], rank, variant_extension, variant_type)
+                for rank, (variant_extension, _, variant_type, _) in enumerate(ThumbnailGenerator.VARIANT_FORMATS)
+                if variant_type in accepted
+            )
+        )
+        for _, _, variant_extension, variant_type in candidates:
+            variant_path = os.path.join(directory, f"{base_filename}.{variant_extension}")
+            if os.path.isfile(variant_path):
+                path, media_type = variant_path, variant_type
+                break
+
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+
+    response = FileResponse(
+        path,
+        media_type=media_type,
+        stat_result=os.stat(path),
+        headers={"Vary": "Accept", "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    )
+    if_none_match = request.headers.get("if-none-match", "")
+    if response.headers["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return NotModifiedResponse(response.headers)
+    return response
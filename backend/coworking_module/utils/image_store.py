@@ -0,0 +1,177 @@
+"""
+Content-addressed storage for coworking images.
+
+An uploaded file is stored once under uploads/coworking_images as
+<sha256>.<ext> and described by an image_blobs row; every coworking_images
+row with that content points at the blob, which counts its references.
+Uploading a photo that is already stored, for another package or space,
+adds a reference instead of a second copy and reuses the blob's thumbnails
+instead of generating them again. Deleting an image drops its reference;
+the file and its thumbnails go with the last one.
+
+Files are moved into place after the ref_count write, i.e. while the
+session holds SQLite's write lock, and before the commit. Files of blobs
+that lost their last reference are only removed after the commit, so a
+rolled-back delete never loses a file; the removal skips any file whose
+content was stored again in the meantime.
+
+Image URLs are matched on their path, so the absolute URLs the API hands
+out (http://localhost:8001/uploads/...) find their blob like relative ones.
+
+Images stored before deduplication have no blob (blob_id NULL) and keep
+their own files until scripts/backfill_image_blobs.py moves them over;
+their blobs keep the original <uuid>.<ext> name.
+"""
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from coworking_module.utils.image_upload import StreamedUpload
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+from shared.models.coworking_images import CoworkingImage
+from shared.models.image_blob import ImageBlob
+
+IMAGE_URL_PREFIX = "/uploads/coworking_images/"
+
+
+def blob_url(blob: ImageBlob) -> str:
+    return f"{IMAGE_URL_PREFIX}{blob.filename}"
+
+
+def apply_blob_thumbnails(image: CoworkingImage, blob: ImageBlob):
+    """Copy the blob's thumbnail URLs and state onto an image row"""
+    image.thumbnail_url = blob.thumbnail_url
+    image.thumbnail_small_url = blob.thumbnail_small_url
+    image.thumbnail_medium_url = blob.thumbnail_medium_url
+    image.thumbnail_status = blob.thumbnail_status
+    image.thumbnail_error = blob.thumbnail_error
+
+
+def add_reference(db: Session, upload: StreamedUpload, directory: str) -> Tuple[ImageBlob, bool]:
+    """
+    Count one more reference to the upload's content and move its file into
+    place, or drop the temporary file if the content is already stored.
+    Returns the blob and whether it is new, i.e. still needs thumbnails.
+    Does not commit.
+    """
+    filename = f"{upload.sha256}.{upload.extension}"
+    table = ImageBlob.__table__
+    statement = sqlite_insert(table).values(
+        sha256=upload.sha256,
+        filename=filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        ref_count=1,
+        thumbnail_status="pending",
+        created_at=datetime.utcnow()
+    )
+    # Concurrent uploads of the same new content: the second one just counts
+    statement = statement.on_conflict_do_update(
+        index_elements=["sha256"],
+        set_={"ref_count": table.c.ref_count + 1}
+    )
+    db.execute(statement)
+    blob = db.query(ImageBlob).populate_existing().filter(ImageBlob.sha256 == upload.sha256).one()
+
+    path = os.path.join(directory, blob.filename)
+    if os.path.exists(path):
+        upload.discard()
+    else:
+        # New content, or a stored file that went missing: this copy takes its place
+        os.replace(upload.path, path)
+    return blob, blob.ref_count == 1
+
+
+def stored_filename(url: Optional[str]) -> Optional[str]:
+    """Filename under the upload directory a relative or absolute image URL points at, or None"""
+    path = urlparse(url or "").path
+    if not path.startswith(IMAGE_URL_PREFIX):
+        return None
+    return path[len(IMAGE_URL_PREFIX):] or None
+
+
+def retain_by_url(db: Session, image: CoworkingImage) -> Optional[ImageBlob]:
+    """
+    Link an image row created from an existing URL (e.g. when a package is
+    saved with its current images) to the blob stored at that URL, counting
+    the reference. The URL may be absolute; it is stored relative. Returns
+    None for URLs that are not a stored blob. Does not commit.
+    """
+    filename = stored_filename(image.image_url)
+    if filename is None:
+        return None
+    blob = db.query(ImageBlob).filter(ImageBlob.filename == filename).first()
+    if blob is None:
+        return None
+    db.query(ImageBlob).filter(ImageBlob.id == blob.id).update(
+        {ImageBlob.ref_count: ImageBlob.ref_count + 1}, synchronize_session=False
+    )
+    image.image_url = blob_url(blob)
+    image.blob_id = blob.id
+    image.content_sha256 = blob.sha256
+    apply_blob_thumbnails(image, blob)
+    return blob
+
+
+def release_references(db: Session, blob_ids: Iterable[Optional[int]]) -> List[str]:
+    """
+    Drop one reference per entry of blob_ids (None entries are legacy images
+    and ignored). Blobs left without references are deleted. Call after the
+    image rows are deleted and flushed; does not commit. Returns the
+    filenames of the deleted blobs: pass them to remove_files once the
+    transaction has committed.
+    """
+    counts = Counter(blob_id for blob_id in blob_ids if blob_id is not None)
+    if not counts:
+        return []
+
+    for blob_id, count in counts.items():
+        db.query(ImageBlob).filter(ImageBlob.id == blob_id).update(
+            {ImageBlob.ref_count: ImageBlob.ref_count - count}, synchronize_session=False
+        )
+    unreferenced = db.query(ImageBlob).populate_existing().filter(
+        ImageBlob.id.in_(list(counts)),
+        ImageBlob.ref_count <= 0
+    ).all()
+
+    filenames = [blob.filename for blob in unreferenced]
+    for blob in unreferenced:
+        db.delete(blob)
+    db.flush()
+    return filenames
+
+
+def remove_files(db: Session, filenames: Iterable[str], directory: str = "uploads/coworking_images") -> int:
+    """
+    Delete the files and thumbnails of blobs released by a committed
+    transaction, skipping any stored again since. Returns the number removed.
+    """
+    filenames = list(filenames)
+    if not filenames:
+        return 0
+    stored_again = {
+        filename for (filename,) in db.query(ImageBlob.filename).filter(ImageBlob.filename.in_(filenames))
+    }
+
+    thumbnail_generator = ThumbnailGenerator(directory)
+    removed = 0
+    for filename in filenames:
+        if filename in stored_again:
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"🗑️ Deleted original image: {path}")
+            base_filename = ThumbnailGenerator.get_base_filename_from_path(filename)
+            thumbnail_generator.delete_thumbnails(base_filename)
+            print(f"🗑️ Deleted thumbnails for: {base_filename}")
+            removed += 1
+        except Exception as e:
+            print(f"⚠️ Error deleting physical files: {str(e)}")
+    return removed
@@ -0,0 +1,241 @@
+"""
+Streaming image uploads.
+
+The multipart body is parsed as it arrives instead of being collected by the
+framework first: file bytes go straight to a temporary file next to their
+final location, the SHA-256 of the content is computed on the way and the
+first bytes are checked against the JPEG / PNG / WebP signatures. A body
+that is not an image, or grows past the size limit, is rejected as soon as
+that is known, without reading the rest of it. Memory use per upload is one
+network chunk, whatever the file size, and each chunk is parsed and written
+in the threadpool so disk writes never block the event loop.
+
+The file is left under its temporary name: the caller moves it to its
+content-addressed place (see image_store) or discards it.
+"""
+import hashlib
+import os
+import uuid
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    # Older python-multipart releases use the "multipart" package name
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Leading bytes needed to recognise every supported format (WebP: "RIFF" <size> "WEBP")
+SNIFF_BYTES = 12
+
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+# Multipart boundaries, part headers and the small form fields around the file
+FORM_OVERHEAD_BYTES = 64 * 1024
+MAX_FIELD_BYTES = 4 * 1024
+
+
+class UploadRejected(Exception):
+    """The request body is not an acceptable image upload"""
+
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(detail)
+
+
+class StreamedUpload:
+    """An image written to a temporary file by stream_image_upload, plus the form's text fields"""
+
+    def __init__(self, path: str, filename: str, content_type: str, size: int, sha256: str,
+                 fields: Dict[str, str]):
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+        self.fields = fields
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_EXTENSIONS[self.content_type]
+
+    def discard(self):
+        """Remove the temporary file, if it was not moved into place"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Content type of an image from its first bytes, or None if it is not JPEG, PNG or WebP"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class _ImagePartWriter:
+    """Multipart callbacks that stream the single file part to disk and keep the text fields"""
+
+    def __init__(self, directory: str, max_bytes: int, file_field: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.temp_path: Optional[str] = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.finished = False
+        self._file = None
+        self._header = b""
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._part = None  # "file", a text field name, or None between parts
+        self._field_data = bytearray()
+
+    # ----- parser callbacks (synchronous, called from parser.write) -----
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._part = None
+        self._field_data = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in options:
+            if name != self.file_field or self.filename is not None:
+                raise UploadRejected(400, "Upload exactly one image in the file field")
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self._part = "file"
+        else:
+            self._part = name
+
+    def on_part_data(self, data, start, end):
+        chunk = data[start:end]
+        if self._part == "file":
+            self._write(chunk)
+        elif self._part is not None:
+            if len(self._field_data) + len(chunk) > MAX_FIELD_BYTES:
+                raise UploadRejected(400, f"Form field {self._part} is too long")
+            self._field_data.extend(chunk)
+
+    def on_part_end(self):
+        if self._part == "file":
+            if self._file is None:
+                # Shorter than the signature check needs
+                self._open_after_sniff()
+        elif self._part is not None:
+            self.fields[self._part] = self._field_data.decode("utf-8", "replace")
+        self._part = None
+
+    def on_end(self):
+        self.finished = True
+
+    # ----- file handling -----
+
+    def _write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected(413, f"Image is larger than {self.max_bytes // (1024 * 1024)} MB")
+        self.digest.update(chunk)
+        if self._file is None:
+            self._header += chunk
+            if len(self._header) >= SNIFF_BYTES:
+                self._open_after_sniff()
+        else:
+            self._file.write(chunk)
+
+    def _open_after_sniff(self):
+        self.content_type = sniff_image_type(self._header)
+        if self.content_type is None:
+            raise UploadRejected(400, "Only JPEG, PNG, and WebP images are allowed")
+        self.temp_path = os.path.join(self.directory, f".upload-{uuid.uuid4()}.part")
+        self._file = open(self.temp_path, "wb")
+        self._file.write(self._header)
+        self._header = b""
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        self.close()
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+async def stream_image_upload(request: Request, directory: str, max_bytes: int,
+                              file_field: str = "file") -> StreamedUpload:
+    """
+    Read a multipart/form-data request with one image in file_field into a
+    temporary file in directory; the format comes from the sniffed bytes
+    rather than the client's filename. Raises UploadRejected (400 or 413) as
+    soon as the body is found to be invalid or too large.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadRejected(400, "Expected a multipart/form-data upload")
+
+    # Refuse a declared oversized body before reading any of it
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise UploadRejected(413, f"Image is larger than {max_bytes // (1024 * 1024)} MB")
+
+    os.makedirs(directory, exist_ok=True)
+    writer = _ImagePartWriter(directory, max_bytes, file_field)
+    parser = MultipartParser(options[b"boundary"], {
+        "on_part_begin": writer.on_part_begin,
+        "on_part_data": writer.on_part_data,
+        "on_part_end": writer.on_part_end,
+        "on_header_field": writer.on_header_field,
+        "on_header_value": writer.on_header_value,
+        "on_header_end": writer.on_header_end,
+        "on_headers_finished": writer.on_headers_finished,
+        "on_end": writer.on_end,
+    })
+
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(parser.write, chunk)
+        writer.close()
+        if writer.filename is None:
+            raise UploadRejected(400, "No image file in the upload")
+        if not writer.finished:
+            raise UploadRejected(400, "Upload ended before the multipart body was complete")
+    except UploadRejected:
+        writer.discard()
+        raise
+    except Exception as e:
+        writer.discard()
+        raise UploadRejected(400, f"Malformed upload: {e}")
+
+    return StreamedUpload(
+        path=writer.temp_path,
+        filename=writer.filename,
+        content_type=writer.content_type,
+        size=writer.size,
+        sha256=writer.digest.hexdigest(),
+        fields=writer.fields
+    )
@@ -17,8 +17,23 @@ class ThumbnailGenerator:
     MEDIUM_SIZE = (300, 300)
     LARGE_SIZE = (600, 600)
     
-    def __init__(self, upload_dir: str = "uploads/coworking_images"):
+    # Cascade mode lets the JPEG decoder shrink the original to no less than
+    # this many times the large thumbnail before the single LANCZOS resample
+    DRAFT_OVERSAMPLE = 2
+    
+    # Smaller encodings written next to each JPEG thumbnail, most preferred first, for
+    # clients that accept them (see coworking_module/routes/images.py). AVIF needs a
+    # Pillow built with libavif; without it only WebP is written.
+    VARIANT_FORMATS = (
+        ("avif", "AVIF", "image/avif", {"quality": 60, "speed": 8}),
+        ("webp", "WEBP", "image/webp", {"quality": 80, "method": 4}),
+    )
+    
+    def __init__(self, upload_dir: str = "uploads/coworking_images", cascade: bool = True):
         self.upload_dir = upload_dir
+        # cascade: decode at reduced scale, resize once to large, derive medium and small from large.
+        # Otherwise every size is resampled from the full-resolution original.
+        self.cascade = cascade
         self.thumbnails_dir = os.path.join(upload_dir, "thumbnails")
         
         # Create thumbnails directory if it doesn't exist
@@ -41,6 +56,11 @@ class ThumbnailGenerator:
         try:
             # Open and process the original image
             with Image.open(original_image_path) as img:
+                if self.cascade:
+                    # Have the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding (no-op for other formats)
+                    img.draft('RGB', (self.LARGE_SIZE[0] * self.DRAFT_OVERSAMPLE,
+                                      self.LARGE_SIZE[1] * self.DRAFT_OVERSAMPLE))
+                
                 # Convert to RGB if necessary (handles RGBA, P mode images)
                 if img.mode in ('RGBA', 'LA', 'P'):
                     # Create a white background
@@ -52,25 +72,35 @@ class ThumbnailGenerator:
                 elif img.mode != 'RGB':
                     img = img.convert('RGB')
                 
-                # Generate thumbnails
+                # Large thumbnail (600x600) - for main display
+                large_thumb = self._create_thumbnail(img, self.LARGE_SIZE)
+                if self.cascade:
+                    # Same square crop, so the smaller sizes are plain downscales of the large one
+                    medium_thumb = self._create_thumbnail(large_thumb, self.MEDIUM_SIZE)
+                    small_thumb = self._create_thumbnail(large_thumb, self.SMALL_SIZE)
+                else:
+                    medium_thumb = self._create_thumbnail(img, self.MEDIUM_SIZE)
+                    small_thumb = self._create_thumbnail(img, self.SMALL_SIZE)
+                
+                # Save thumbnails
                 thumbnails = {}
                 
                 # Small thumbnail (150x150)
-                small_thumb = self._create_thumbnail(img, self.SMALL_SIZE)
                 small_path = os.path.join(self.thumbnails_dir, "small", f"{base_filename}.jpg")
                 small_thumb.save(small_path, "JPEG", quality=85, optimize=True)
+                self._save_variants(small_thumb, "small", base_filename)
                 thumbnails['small'] = f"/uploads/coworking_images/thumbnails/small/{base_filename}.jpg"
                 
                 # Medium thumbnail (300x300)
-                medium_thumb = self._create_thumbnail(img, self.MEDIUM_SIZE)
                 medium_path = os.path.join(self.thumbnails_dir, "medium", f"{base_filename}.jpg")
                 medium_thumb.save(medium_path, "JPEG", quality=90, optimize=True)
+                self._save_variants(medium_thumb, "medium", base_filename)
                 thumbnails['medium'] = f"/uploads/coworking_images/thumbnails/medium/{base_filename}.jpg"
                 
-                # Large thumbnail (600x600) - for main display
-                large_thumb = self._create_thumbnail(img, self.LARGE_SIZE)
+                # Large thumbnail (600x600)
                 large_path = os.path.join(self.thumbnails_dir, "large", f"{base_filename}.jpg")
                 large_thumb.save(large_path, "JPEG", quality=95, optimize=True)
+                self._save_variants(large_thumb, "large", base_filename)
                 thumbnails['large'] = f"/uploads/coworking_images/thumbnails/large/{base_filename}.jpg"
                 
                 logger.info(f"Generated thumbnails for {base_filename}")
@@ -80,6 +110,18 @@ class ThumbnailGenerator:
             logger.error(f"Error generating thumbnails for {original_image_path}: {str(e)}")
             raise Exception(f"Failed to generate thumbnails: {str(e)}")
     
+    @classmethod
+    def available_variants(cls):
+        """The VARIANT_FORMATS entries this Pillow build can encode"""
+        Image.init()
+        return [variant for variant in cls.VARIANT_FORMATS if variant[1] in Image.SAVE]
+    
+    def _save_variants(self, thumb: Image.Image, size_name: str, base_filename: str):
+        """Write the WebP / AVIF copies of one thumbnail; the URLs stay those of the JPEG"""
+        for extension, pillow_format, _, options in self.available_variants():
+            thumb.save(os.path.join(self.thumbnails_dir, size_name, f"{base_filename}.{extension}"),
+                       pillow_format, **options)
+    
     def _create_thumbnail(self, img: Image.Image, size: Tuple[int, int]) -> Image.Image:
         """
         Create a thumbnail with proper aspect ratio handling
@@ -105,11 +147,13 @@ class ThumbnailGenerator:
         """
         try:
             sizes = ['small', 'medium', 'large']
+            extensions = ['jpg'] + [variant[0] for variant in self.VARIANT_FORMATS]
             for size in sizes:
-                thumb_path = os.path.join(self.thumbnails_dir, size, f"{base_filename}.jpg")
-                if os.path.exists(thumb_path):
-                    os.remove(thumb_path)
-                    logger.info(f"Deleted {size} thumbnail: {thumb_path}")
+                for extension in extensions:
+                    thumb_path = os.path.join(self.thumbnails_dir, size, f"{base_filename}.{extension}")
+                    if os.path.exists(thumb_path):
+                        os.remove(thumb_path)
+                        logger.info(f"Deleted {size} thumbnail: {thumb_path}")
         except Exception as e:
             logger.error(f"Error deleting thumbnails for {base_filename}: {str(e)}")
     
@@ -118,3 +162,11 @@ class ThumbnailGenerator:
         """Extract base filename without extension from a file path"""
         filename = os.path.basename(file_path)
         return os.path.splitext(filename)[0]
+
+
+def generate_thumbnails_job(original_image_path: str, base_filename: str, upload_dir: str) -> Dict[str, str]:
+    """
+    Process-pool entry point: generate every thumbnail of one image.
+    Kept at module level so worker processes can import it.
+    """
+    return ThumbnailGenerator(upload_dir).generate_thumbnails(original_image_path, base_filename)
@@ -0,0 +1,146 @@
+"""
+Background thumbnail jobs for uploaded coworking images.
+
+Resizing and JPEG encoding are CPU-bound, so they run in a process pool
+instead of on the event loop (a thread would still hold the GIL through
+the resizes). Thumbnails belong to the stored file: an upload of new
+content leaves its blob and image rows with thumbnail_status "pending" and
+submits one job; when the job finishes the server process records the
+thumbnail URLs on the blob and on every image sharing it and marks them
+"ready", or "failed" with the error. Images stored before deduplication
+have no blob and get jobs of their own.
+
+Jobs are held in memory only: blobs and images still pending after a
+restart are submitted again at startup by requeue_pending.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.config import settings
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator, generate_thumbnails_job
+from shared.database import SessionLocal
+from shared.models.coworking_images import CoworkingImage
+from shared.models.image_blob import ImageBlob
+
+THUMBNAIL_PENDING = "pending"
+THUMBNAIL_READY = "ready"
+THUMBNAIL_FAILED = "failed"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(replace_broken: bool = False) -> ProcessPoolExecutor:
+    """The shared pool, started on first use (and restarted if a worker died)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None or replace_broken:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            # spawn: forking a server process that already runs threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _record_result(model, row_id: int, upload_dir: str, base_filename: str, future):
+    """Store a finished job's thumbnail URLs (or its error) on a blob and its images, or on a legacy image"""
+    if future.cancelled():
+        # Pool shut down first; the row stays pending until the next start
+        return
+    label = "blob" if model is ImageBlob else "image"
+    db = SessionLocal()
+    try:
+        row = db.query(model).filter(model.id == row_id).first()
+        if row is not None:
+            stored_as = ThumbnailGenerator.get_base_filename_from_path(row.filename if model is ImageBlob else row.image_url)
+            if stored_as != base_filename:
+                # SQLite reused the id of a deleted row for a newer upload
+                row = None
+        error = future.exception()
+        if row is None:
+            # Deleted while the job ran: drop what the job wrote, unless the same content was stored again since
+            stored_again = model is ImageBlob and db.query(ImageBlob.id).filter(
+                ImageBlob.filename.like(f"{base_filename}.%")
+            ).first()
+            if error is None and not stored_again:
+                ThumbnailGenerator(upload_dir).delete_thumbnails(base_filename)
+            return
+
+        targets = [row]
+        if model is ImageBlob:
+            targets += db.query(CoworkingImage).filter(CoworkingImage.blob_id == row_id).all()
+        if error is None:
+            thumbnail_urls = future.result()
+            for target in targets:
+                target.thumbnail_url = thumbnail_urls.get('large')
+                target.thumbnail_small_url = thumbnail_urls.get('small')
+                target.thumbnail_medium_url = thumbnail_urls.get('medium')
+                target.thumbnail_status = THUMBNAIL_READY
+                target.thumbnail_error = None
+            print(f"✅ Generated thumbnails for {label} {row_id}")
+        else:
+            for target in targets:
+                target.thumbnail_status = THUMBNAIL_FAILED
+                target.thumbnail_error = str(error)[:500]
+            print(f"⚠️ Failed to generate thumbnails for {label} {row_id}: {error}")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Failed to record thumbnails for {label} {row_id}: {e}")
+    finally:
+        db.close()
+
+
+def _submit(model, row_id: int, file_path: str, upload_dir: str):
+    base_filename = ThumbnailGenerator.get_base_filename_from_path(file_path)
+    try:
+        future = _get_executor().submit(generate_thumbnails_job, file_path, base_filename, upload_dir)
+    except (BrokenProcessPool, RuntimeError):
+        # A worker crashed (e.g. out of memory on a huge image) and took the pool down
+        future = _get_executor(replace_broken=True).submit(generate_thumbnails_job, file_path, base_filename, upload_dir)
+    future.add_done_callback(lambda done: _record_result(model, row_id, upload_dir, base_filename, done))
+    return future
+
+
+def enqueue_thumbnails(blob_id: int, file_path: str, upload_dir: str = "uploads/coworking_images"):
+    """Generate the thumbnails of a newly stored blob in the worker pool; returns immediately"""
+    return _submit(ImageBlob, blob_id, file_path, upload_dir)
+
+
+def requeue_pending(upload_dir: str = "uploads/coworking_images") -> int:
+    """Submit again every blob and legacy image left pending by a restart; returns how many were queued"""
+    db = SessionLocal()
+    try:
+        blobs = db.query(ImageBlob.id, ImageBlob.filename).filter(
+            ImageBlob.thumbnail_status == THUMBNAIL_PENDING
+        ).all()
+        images = db.query(CoworkingImage.id, CoworkingImage.image_url).filter(
+            CoworkingImage.blob_id.is_(None),
+            CoworkingImage.thumbnail_status == THUMBNAIL_PENDING
+        ).all()
+    finally:
+        db.close()
+
+    for blob_id, filename in blobs:
+        _submit(ImageBlob, blob_id, os.path.join(upload_dir, filename), upload_dir)
+    for image_id, image_url in images:
+        _submit(CoworkingImage, image_id, os.path.join(upload_dir, os.path.basename(image_url)), upload_dir)
+    if blobs or images:
+        print(f"🔄 Re-queued thumbnails for {len(blobs)} pending blobs and {len(images)} pending images")
+    return len(blobs) + len(images)
+
+
+def shutdown():
+    """Stop the pool without waiting; unfinished images stay pending and are re-queued at the next start"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
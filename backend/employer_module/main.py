@@ -6,6 +6,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from employer_module.routes.employer import router as employer_router
+from app.utils.geocode import maps_client
 
 app = FastAPI(
     title="Employer Module API",
@@ -28,6 +29,11 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 # Include routers
 app.include_router(employer_router, prefix="/employer")
 
+@app.on_event("shutdown")
+async def close_maps_client():
+    # Release pooled Google Maps connections
+    await maps_client.aclose()
+
 @app.get("/")
 def read_root():
     return {"message": "Employer Module API is running"}
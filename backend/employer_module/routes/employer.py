@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy import and_, case, func, not_, or_, tuple_
 from shared.database import get_db
 from app.schemas.employer import SubscriptionRequest
 from shared.models.employer import Employer
@@ -9,9 +10,8 @@ from shared.models.booking import CoworkingBooking
 from employer_module.auth.employer_auth import get_current_employer_user as get_current_user
 import stripe
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import calendar
-from haversine import haversine, Unit
 from typing import List, Optional
 from pydantic import BaseModel
 from app.schemas.employee import EmployeeSummary
@@ -22,17 +22,29 @@ from app.schemas.employer import EmployerUpdate, EmployerCreate
 from shared.models.booking import CoworkingBooking
 from shared.models.employee import Employee
 from shared.models.employer_employee import EmployerEmployee
+from shared.models.coworking_images import CoworkingImage
+from shared.models.employee_space_proximity import EmployeeSpaceProximity
 from app.schemas.coworking import CoworkingAddressSearch, NearbyCoworkingSpaceOut, CoworkingSpaceOut
 
 
 
 
+import json
 import secrets
 import stripe
 import os
 
 from app.utils.hashing import hash_password
-from app.utils.geocode import geocode_address as get_coordinates_from_address
+from app.utils.geocode import geocode_address as get_coordinates_from_address, async_geocode_address, travel_time_service
+from app.utils.travel_time import TRAVEL_MODES
+from app.utils.bulk_geocode import address_key, bulk_geocode_in_background
+from app.utils.proximity import proximity_matches
+from app.utils.counters import read_counters
+from app.utils.booking_conflicts import booking_dates, check_proposals, find_conflicts, first_come_overlaps
+from app.utils.occupancy import CapacityError, availability_calendar, capacity_shortfalls, spaces_with_free_seats
+from app.utils.distance import haversine_many
+from app.utils.spatial_index import verified_space_index, within_bounding_box, nearest_by_expanding_radius
+from app.config import settings
 from employer_module.auth.employer_auth import get_current_employer_user
 from app.auth import (
     hash_password,
@@ -133,7 +145,7 @@ def get_next_month_billing_amount(selected_weekdays: list, daily_rate: int, subs
 
 # ✅ Employer Registration
 @router.post("/register")
-def register_employer(data: employer_schema.EmployerCreate, db: Session = Depends(get_db)):
+def register_employer(data: employer_schema.EmployerCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     existing = db.query(employer_model.Employer).filter_by(email=data.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already exists")
@@ -146,13 +158,8 @@ def register_employer(data: employer_schema.EmployerCreate, db: Session = Depend
     first_name = company_parts[0] if company_parts else "Company"
     last_name = company_parts[1] if len(company_parts) > 1 else "Admin"
     
-    # Mock coordinates for now (you'd normally use geocoding)
-    mock_coordinates = {
-        'Lahore': (31.5204, 74.3587),
-        'Karachi': (24.8607, 67.0011),
-        'Islamabad': (33.6844, 73.0479),
-    }
-    lat, lng = mock_coordinates.get(data.city, (31.5204, 74.3587))
+    # Coordinates are filled in by a background geocode after the response is sent
+    lat, lng = 0.0, 0.0
 
     new_emp = employer_model.Employer(
         first_name=first_name,
@@ -177,9 +184,21 @@ def register_employer(data: employer_schema.EmployerCreate, db: Session = Depend
     db.commit()
     db.refresh(new_emp)
 
+    background_tasks.add_task(bulk_geocode_in_background, new_emp.id, ("employers",))
+
     return {"message": "Employer registered", "id": new_emp.id}
 
 
+# ✅ Backfill missing employer/employee coordinates
+@router.post("/geocode/backfill", status_code=202)
+def backfill_coordinates(background_tasks: BackgroundTasks, current=Depends(get_current_employer_user)):
+    if current["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    background_tasks.add_task(bulk_geocode_in_background, current["user"].id)
+    return {"message": "Geocoding scheduled for your company and its employees"}
+
+
 # ✅ Employer Login
 @router.post("/login")
 def login_employer(data: employer_schema.EmployerLogin, db: Session = Depends(get_db)):
@@ -285,6 +304,7 @@ def update_employer_profile(
                 if lat is not None and lon is not None:
                     user.latitude = lat
                     user.longitude = lon
+                    user.geocoded_address = address_key(user)
                     print(f"✅ Geocoded new address for employer {user.id}: {lat}, {lon}")
                 else:
                     print(f"⚠️ Could not geocode address for employer {user.id}: {full_address}")
@@ -586,14 +606,49 @@ def get_employees_task_performance(
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days)
     
-    # Get all employees for this employer
-    employees = db.query(employee_model.Employee).join(
-        EmployerEmployee
+    # One grouped aggregate: per-employee status counts for assignments in the range
+    Assignment = task_assignment_model.TaskAssignment
+    Task = task_model.Task
+    TaskStatus = task_model.TaskStatus
+    task_counts = db.query(
+        Assignment.employee_id.label("employee_id"),
+        func.count(Assignment.id).label("total_tasks"),
+        *[
+            func.sum(case((Task.status == task_status, 1), else_=0)).label(label)
+            for task_status, label in (
+                (TaskStatus.COMPLETED, "completed_tasks"),
+                (TaskStatus.IN_PROGRESS, "in_progress_tasks"),
+                (TaskStatus.PENDING, "pending_tasks"),
+                (TaskStatus.CANCELLED, "cancelled_tasks"),
+            )
+        ]
+    ).join(
+        Task, Task.id == Assignment.task_id
+    ).filter(
+        Assignment.employer_id == employer_id,
+        Assignment.assigned_at >= start_date,
+        Assignment.assigned_at <= end_date
+    ).group_by(Assignment.employee_id).subquery()
+
+    # Employees without assignments still get a row of zeros
+    rows = db.query(
+        employee_model.Employee.id,
+        employee_model.Employee.first_name,
+        employee_model.Employee.last_name,
+        task_counts.c.total_tasks,
+        task_counts.c.completed_tasks,
+        task_counts.c.in_progress_tasks,
+        task_counts.c.pending_tasks,
+        task_counts.c.cancelled_tasks
+    ).join(
+        EmployerEmployee, EmployerEmployee.employee_id == employee_model.Employee.id
+    ).outerjoin(
+        task_counts, task_counts.c.employee_id == employee_model.Employee.id
     ).filter(
         EmployerEmployee.employer_id == employer_id
     ).all()
     
-    if not employees:
+    if not rows:
         return {
             "employees": [],
             "date_range": {
@@ -605,27 +660,9 @@ def get_employees_task_performance(
     
     employee_stats = []
     
-    for employee in employees:
-        # Get task assignments for this employee in the date range
-        task_assignments = db.query(task_assignment_model.TaskAssignment).join(
-            task_model.Task
-        ).filter(
-            task_assignment_model.TaskAssignment.employee_id == employee.id,
-            task_assignment_model.TaskAssignment.employer_id == employer_id,
-            task_assignment_model.TaskAssignment.assigned_at >= start_date,
-            task_assignment_model.TaskAssignment.assigned_at <= end_date
-        ).all()
-        
-        # Count tasks by status
-        total_tasks = len(task_assignments)
-        completed_tasks = sum(1 for assignment in task_assignments 
-                            if assignment.task.status == TaskStatus.COMPLETED)
-        in_progress_tasks = sum(1 for assignment in task_assignments 
-                              if assignment.task.status == TaskStatus.IN_PROGRESS)
-        pending_tasks = sum(1 for assignment in task_assignments 
-                          if assignment.task.status == TaskStatus.PENDING)
-        cancelled_tasks = sum(1 for assignment in task_assignments 
-                            if assignment.task.status == TaskStatus.CANCELLED)
+    for row in rows:
+        total_tasks = row.total_tasks or 0
+        completed_tasks = row.completed_tasks or 0
         
         # Calculate completion rate
         if total_tasks > 0:
@@ -634,14 +671,14 @@ def get_employees_task_performance(
             completion_rate = 0
         
         employee_stats.append({
-            "employee_id": employee.id,
-            "employee_name": f"{employee.first_name} {employee.last_name}",
-            "first_name": employee.first_name,
-            "last_name": employee.last_name,
+            "employee_id": row.id,
+            "employee_name": f"{row.first_name} {row.last_name}",
+            "first_name": row.first_name,
+            "last_name": row.last_name,
             "completed_tasks": completed_tasks,
-            "in_progress_tasks": in_progress_tasks,
-            "pending_tasks": pending_tasks,
-            "cancelled_tasks": cancelled_tasks,
+            "in_progress_tasks": row.in_progress_tasks or 0,
+            "pending_tasks": row.pending_tasks or 0,
+            "cancelled_tasks": row.cancelled_tasks or 0,
             "total_tasks": total_tasks,
             "completion_rate": completion_rate
         })
@@ -672,14 +709,35 @@ def get_employees_attendance_stats(
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days)
     
-    # Get all employees for this employer
-    employees = db.query(employee_model.Employee).join(
-        EmployerEmployee
+    # Attendance counts grouped by employee and status over the window, served
+    # by the (employer_id, date, employee_id) index
+    Attendance = attendance_model.Attendance
+    status_counts = db.query(
+        Attendance.employee_id.label("employee_id"),
+        Attendance.status.label("status"),
+        func.count(Attendance.id).label("days")
+    ).filter(
+        Attendance.employer_id == employer_id,
+        Attendance.date >= start_date,
+        Attendance.date <= end_date
+    ).group_by(Attendance.employee_id, Attendance.status).subquery()
+
+    # One round-trip: each employee joined with its per-status counts (if any)
+    rows = db.query(
+        employee_model.Employee.id,
+        employee_model.Employee.first_name,
+        employee_model.Employee.last_name,
+        status_counts.c.status,
+        status_counts.c.days
+    ).join(
+        EmployerEmployee, EmployerEmployee.employee_id == employee_model.Employee.id
+    ).outerjoin(
+        status_counts, status_counts.c.employee_id == employee_model.Employee.id
     ).filter(
         EmployerEmployee.employer_id == employer_id
     ).all()
     
-    if not employees:
+    if not rows:
         return {
             "employees": [],
             "date_range": {
@@ -689,22 +747,23 @@ def get_employees_attendance_stats(
             }
         }
     
+    # Pivot status rows into per-employee counts, keeping employee order
+    counts_by_employee = {}
+    for row in rows:
+        entry = counts_by_employee.setdefault(row.id, {"employee": row, "counts": {}})
+        if row.status is not None:
+            entry["counts"][row.status] = row.days
+    
     employee_stats = []
     
-    for employee in employees:
-        # Get attendance records for this employee in the date range
-        attendance_records = db.query(attendance_model.Attendance).filter(
-            attendance_model.Attendance.employee_id == employee.id,
-            attendance_model.Attendance.date >= start_date,
-            attendance_model.Attendance.date <= end_date
-        ).all()
+    for entry in counts_by_employee.values():
+        employee = entry["employee"]
+        counts = entry["counts"]
+        present_days = counts.get(AttendanceStatus.ATTENDED, 0)
+        absent_days = counts.get(AttendanceStatus.ABSENT, 0)
+        partial_days = counts.get(AttendanceStatus.PARTIAL, 0)
         
-        # Count attendance by status - using correct enum values
-        present_days = sum(1 for record in attendance_records if record.status == AttendanceStatus.ATTENDED)
-        absent_days = sum(1 for record in attendance_records if record.status == AttendanceStatus.ABSENT)
-        partial_days = sum(1 for record in attendance_records if record.status == AttendanceStatus.PARTIAL)
-        
-        total_records = len(attendance_records)
+        total_records = sum(counts.values())
         
         # Calculate attendance rate
         if total_records > 0:
@@ -733,6 +792,88 @@ def get_employees_attendance_stats(
         }
     }
 
+# ✅ Nearest coworking spaces for every employee (dashboard)
+@router.get("/employees/nearest-spaces")
+def get_employees_nearest_spaces(
+    per_employee: int = Query(3, ge=1, le=settings.PROXIMITY_TOP_K),
+    current=Depends(get_current_employer_user),
+    db: Session = Depends(get_db)
+):
+    if current["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    # One indexed read of the precomputed top-K table for the whole team
+    rows = db.query(
+        EmployeeSpaceProximity.employee_id,
+        EmployeeSpaceProximity.rank,
+        EmployeeSpaceProximity.distance_km,
+        coworking_model.CoworkingSpaceListing.id,
+        coworking_model.CoworkingSpaceListing.title,
+        coworking_model.CoworkingSpaceListing.address,
+        coworking_model.CoworkingSpaceListing.city,
+        coworking_model.CoworkingSpaceListing.latitude,
+        coworking_model.CoworkingSpaceListing.longitude
+    ).join(
+        coworking_model.CoworkingSpaceListing,
+        coworking_model.CoworkingSpaceListing.id == EmployeeSpaceProximity.space_id
+    ).join(
+        EmployerEmployee,
+        EmployerEmployee.employee_id == EmployeeSpaceProximity.employee_id
+    ).filter(
+        EmployerEmployee.employer_id == current["user"].id,
+        EmployeeSpaceProximity.rank <= per_employee
+    ).order_by(EmployeeSpaceProximity.employee_id, EmployeeSpaceProximity.rank).all()
+
+    spaces_by_employee = {}
+    for row in rows:
+        spaces_by_employee.setdefault(row.employee_id, []).append({
+            "id": row.id,
+            "title": row.title,
+            "address": row.address,
+            "city": row.city,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "distance_km": round(row.distance_km, 2),
+            "rank": row.rank
+        })
+
+    return [
+        {"employee_id": employee_id, "spaces": spaces}
+        for employee_id, spaces in spaces_by_employee.items()
+    ]
+
+def next_upcoming_bookings(db: Session, employee_ids) -> dict:
+    """
+    Earliest booking starting today or later for each employee, as {employee_id: booking}.
+
+    employee_ids may be a list or a subquery of ids. One statement ranks the
+    bookings per employee with ROW_NUMBER() and loads the coworking space
+    alongside each winning booking.
+    """
+    Booking = booking_model.CoworkingBooking
+    Space = coworking_model.CoworkingSpaceListing
+
+    ranked = db.query(
+        Booking.id.label("booking_id"),
+        func.row_number().over(
+            partition_by=Booking.employee_id,
+            order_by=(Booking.start_date.asc(), Booking.id.asc())
+        ).label("position")
+    ).join(
+        Space, Space.id == Booking.coworking_space_id
+    ).filter(
+        Booking.employee_id.in_(employee_ids),
+        Booking.start_date >= func.current_date()
+    ).subquery()
+
+    bookings = db.query(Booking).join(
+        ranked, and_(ranked.c.booking_id == Booking.id, ranked.c.position == 1)
+    ).join(
+        Booking.coworking_space
+    ).options(contains_eager(Booking.coworking_space)).all()
+
+    return {booking.employee_id: booking for booking in bookings}
+
 # ✅ List  employees for employer by ID
 @router.get("/employees/{employee_id}")
 def get_employee_detail(
@@ -761,12 +902,7 @@ def get_employee_detail(
     ).first()
 
     # Get next upcoming coworking booking for this employee (same logic as employee list)
-    next_booking = db.query(booking_model.CoworkingBooking).join(
-        coworking_model.CoworkingSpaceListing
-    ).filter(
-        booking_model.CoworkingBooking.employee_id == employee_id,
-        booking_model.CoworkingBooking.start_date >= func.current_date()
-    ).order_by(booking_model.CoworkingBooking.start_date.asc()).first()
+    next_booking = next_upcoming_bookings(db, [employee_id]).get(employee_id)
 
     assigned_coworking_space = None
     if next_booking:
@@ -818,15 +954,15 @@ def list_employees(
         EmployerEmployee.employer_id == employer_id
     ).all()
 
+    # Next upcoming coworking booking (earliest start date) for every employee in one query
+    next_bookings = next_upcoming_bookings(
+        db,
+        db.query(EmployerEmployee.employee_id).filter(EmployerEmployee.employer_id == employer_id)
+    )
+
     result = []
     for emp, role_title, emp_status in employee_data:
-        # Get next upcoming coworking booking for this employee (earliest start date)
-        next_booking = db.query(booking_model.CoworkingBooking).join(
-            coworking_model.CoworkingSpaceListing
-        ).filter(
-            booking_model.CoworkingBooking.employee_id == emp.id,
-            booking_model.CoworkingBooking.start_date >= func.current_date()
-        ).order_by(booking_model.CoworkingBooking.start_date.asc()).first()
+        next_booking = next_bookings.get(emp.id)
         
         employee_info = {
             "id": emp.id,
@@ -860,24 +996,374 @@ def list_employees(
     
     return result
 
+def nearby_space_matches(db: Session, lat: float, lon: float, radius_km: float) -> list:
+    """
+    Return (space_id, distance_km) pairs for verified spaces within radius_km,
+    nearest first. Answered from the in-process spatial index; with the index
+    disabled, a bounding-box query narrows the rows before the exact distance check.
+    """
+    if settings.SPATIAL_INDEX_ENABLED:
+        verified_space_index.ensure_loaded(db)
+        return verified_space_index.query_radius(lat, lon, radius_km)
+
+    rows = db.query(
+        coworking_model.CoworkingSpaceListing.id,
+        coworking_model.CoworkingSpaceListing.latitude,
+        coworking_model.CoworkingSpaceListing.longitude
+    ).filter(
+        coworking_model.CoworkingSpaceListing.is_verified == True,
+        within_bounding_box(lat, lon, radius_km)
+    ).all()
+    if not rows:
+        return []
+
+    distances = haversine_many(lat, lon, [row.latitude for row in rows], [row.longitude for row in rows])
+    matches = [
+        (row.id, float(distance_km))
+        for row, distance_km in zip(rows, distances)
+        if distance_km <= radius_km
+    ]
+    return sorted(matches, key=lambda match: (match[1], match[0]))
+
+def nearest_space_matches(db: Session, lat: float, lon: float, k: int) -> list:
+    """Return (space_id, distance_km) pairs for the k nearest verified spaces"""
+    if settings.SPATIAL_INDEX_ENABLED:
+        verified_space_index.ensure_loaded(db)
+        return verified_space_index.query_nearest(lat, lon, k)
+
+    return nearest_by_expanding_radius(
+        lambda radius_km: nearby_space_matches(db, lat, lon, radius_km),
+        k,
+        start_radius_km=10.0
+    )
+
+def paginate_space_matches(matches: list, limit: Optional[int], cursor: Optional[str]) -> tuple:
+    """
+    Slice sorted (space_id, distance_km) matches into a page.
+
+    The cursor is "<distance_km>:<space_id>" of the last match on the previous
+    page. Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        try:
+            cursor_distance, cursor_id = cursor.split(":")
+            after = (float(cursor_distance), int(cursor_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        matches = [match for match in matches if (match[1], match[0]) > after]
+
+    if limit is None or len(matches) <= limit:
+        return matches, None
+
+    page = matches[:limit]
+    last_id, last_distance = page[-1]
+    return page, f"{last_distance!r}:{last_id}"
+
+def keep_available_spaces(db: Session, matches: list, availability: tuple) -> list:
+    """Keep (space_id, distance_km) matches with (seats, days) free seats on every day, read from the occupancy ledger"""
+    seats, days = availability
+    available = spaces_with_free_seats(db, [space_id for space_id, _ in matches], days, seats)
+    return [match for match in matches if match[0] in available]
+
+def rank_verified_spaces(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    nearest: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    availability: Optional[tuple] = None
+) -> list:
+    """
+    (space_id, distance_km) pairs for a radius search, or the k nearest spaces when nearest is set.
+    Searches around an employee are read from employee_space_proximity when it holds the full answer.
+    With availability = (seats, days), only spaces with that many free seats on every day are kept.
+    """
+    if availability is not None:
+        if nearest:
+            # Widen the radius until k spaces with free seats are found, or every indexed space was seen
+            total = None
+            if settings.SPATIAL_INDEX_ENABLED:
+                verified_space_index.ensure_loaded(db)
+                total = len(verified_space_index)
+            return nearest_by_expanding_radius(
+                lambda radius: nearby_space_matches(db, lat, lon, radius),
+                nearest,
+                start_radius_km=10.0,
+                total=total,
+                keep=lambda matches: keep_available_spaces(db, matches, availability)
+            )
+        return keep_available_spaces(
+            db, rank_verified_spaces(db, lat, lon, radius_km, employee_id=employee_id), availability
+        )
+
+    if employee_id is not None:
+        matches = proximity_matches(db, employee_id, radius_km, nearest)
+        if matches is not None:
+            return matches
+
+    if nearest:
+        return nearest_space_matches(db, lat, lon, nearest)
+    return nearby_space_matches(db, lat, lon, radius_km)
+
+def load_space_page(db: Session, page: list) -> list:
+    """Load listings for (space_id, distance_km) pairs, keeping their order"""
+    if not page:
+        return []
+
+    spaces = db.query(coworking_model.CoworkingSpaceListing).filter(
+        coworking_model.CoworkingSpaceListing.id.in_([space_id for space_id, _ in page]),
+        coworking_model.CoworkingSpaceListing.is_verified == True
+    ).all()
+    spaces_by_id = {space.id: space for space in spaces}
+
+    return [
+        (spaces_by_id[space_id], distance_km)
+        for space_id, distance_km in page
+        if space_id in spaces_by_id
+    ]
+
+def search_verified_spaces(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    nearest: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    availability: Optional[tuple] = None
+) -> list:
+    """
+    Return (space, distance_km) pairs for one page of a nearby-space search.
+
+    Ranking runs on ids and distances only; listings are loaded for the
+    returned page alone. The cursor for the following page is sent in the
+    X-Next-Cursor response header.
+    """
+    matches = rank_verified_spaces(db, lat, lon, radius_km, nearest, employee_id, availability)
+
+    page, next_cursor = paginate_space_matches(matches, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return load_space_page(db, page)
+
+def space_coordinates(db: Session, space_ids: list) -> dict:
+    """{space_id: (latitude, longitude)} for the given listings"""
+    if not space_ids:
+        return {}
+    rows = db.query(
+        coworking_model.CoworkingSpaceListing.id,
+        coworking_model.CoworkingSpaceListing.latitude,
+        coworking_model.CoworkingSpaceListing.longitude
+    ).filter(coworking_model.CoworkingSpaceListing.id.in_(space_ids)).all()
+    return {row.id: (row.latitude, row.longitude) for row in rows}
+
+async def search_verified_spaces_by_travel_time(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    response: Response,
+    mode: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    nearest: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    availability: Optional[tuple] = None
+) -> tuple:
+    """
+    Like search_verified_spaces, but orders the matched spaces by travel time.
+
+    All candidates are ranked with batched Distance Matrix calls; the cursor
+    is "<duration_seconds>:<space_id>". Returns ((space, distance_km) pairs,
+    {space_id: travel element}).
+    """
+    matches = await run_in_threadpool(
+        rank_verified_spaces, db, lat, lon, radius_km, nearest, employee_id, availability
+    )
+    distances = dict(matches)
+    coordinates = await run_in_threadpool(space_coordinates, db, list(distances))
+
+    ranked = await travel_time_service.rank(
+        lat, lon,
+        [(space_id, *coordinates[space_id]) for space_id in distances if space_id in coordinates],
+        mode
+    )
+
+    page, next_cursor = paginate_space_matches(
+        [(space_id, duration) for space_id, duration, _ in ranked], limit, cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    spaces = await run_in_threadpool(
+        load_space_page, db, [(space_id, distances[space_id]) for space_id, _ in page]
+    )
+    return spaces, {space_id: element for space_id, _, element in ranked}
+
+def fetch_package_images(db: Session, space_packages) -> dict:
+    """
+    Load images for many (space_id, package_id) pairs with a single IN (...)
+    query served by the (space_id, package_id) index.
+
+    Returns {(space_id, package_id): [image rows]} with each list ordered
+    primary first, then by upload order.
+    """
+    if not space_packages:
+        return {}
+
+    rows = db.query(
+        CoworkingImage.space_id,
+        CoworkingImage.package_id,
+        CoworkingImage.image_url,
+        CoworkingImage.image_name,
+        CoworkingImage.is_primary,
+        CoworkingImage.thumbnail_url,
+        CoworkingImage.thumbnail_medium_url,
+        CoworkingImage.thumbnail_small_url
+    ).filter(
+        # The plain space_id IN lets SQLite seek the index; the row-value IN alone would scan
+        CoworkingImage.space_id.in_({space_id for space_id, _ in space_packages}),
+        tuple_(CoworkingImage.space_id, CoworkingImage.package_id).in_(list(space_packages))
+    ).order_by(CoworkingImage.is_primary.desc(), CoworkingImage.id.asc()).all()
+
+    images_by_package = {}
+    for row in rows:
+        images_by_package.setdefault((row.space_id, row.package_id), []).append(row)
+    return images_by_package
+
+def package_image_payload(img) -> dict:
+    """Image entry for nearby-space packages, preferring the medium thumbnail"""
+    original_path = img.image_url  # /uploads/coworking_images/filename.jpg
+
+    # Use database thumbnail URL first, fallback to constructed URL
+    if img.thumbnail_medium_url and img.thumbnail_medium_url.strip():
+        final_url = f"http://localhost:8001{img.thumbnail_medium_url}"
+    else:
+        # Fallback: construct thumbnail URL from filename
+        filename = original_path.split('/')[-1]
+        final_url = f"http://localhost:8001/uploads/coworking_images/thumbnails/medium/{filename}"
+
+    return {
+        'url': final_url,  # FORCE thumbnail URL
+        'name': img.image_name,
+        'is_primary': bool(img.is_primary),
+        'image_url': f"http://localhost:8001{original_path}",  # Original for fallback
+        'thumbnail_url': f"http://localhost:8001{img.thumbnail_url}" if img.thumbnail_url else final_url,
+        'thumbnail_medium_url': final_url,
+        'thumbnail_small_url': f"http://localhost:8001{img.thumbnail_small_url}" if img.thumbnail_small_url else final_url
+    }
+
+def build_nearby_space_payloads(db: Session, matches: list, travel: Optional[dict] = None) -> list:
+    """
+    Response entries for (space, distance_km) pairs, with images attached to
+    each package. Travel elements from a duration search are included when given.
+    """
+    # Parse every package list up front so all their images come back in one query
+    packages_by_space = {}
+    for space, _ in matches:
+        if not space.packages:
+            continue
+        try:
+            packages_by_space[space.id] = json.loads(space.packages) if isinstance(space.packages, str) else space.packages
+        except Exception as e:
+            print(f"Error parsing packages for space {space.id}: {e}")
+
+    space_packages = {
+        (space_id, str(package.get('id', '')))
+        for space_id, packages in packages_by_space.items()
+        for package in packages
+    }
+    images_by_package = fetch_package_images(db, space_packages)
+
+    nearby_spaces = []
+    for space, distance_km in matches:
+        # Attach the pre-fetched images to each package
+        packages_with_images = []
+        for package in packages_by_space.get(space.id, []):
+            package_with_images = package.copy()
+            package_with_images['images'] = [
+                package_image_payload(img)
+                for img in images_by_package.get((space.id, str(package.get('id', ''))), [])
+            ]
+            packages_with_images.append(package_with_images)
+
+        space_info = {
+            "id": space.id,
+            "title": space.title,
+            "address": space.address,
+            "city": space.city,
+            "latitude": space.latitude,
+            "longitude": space.longitude,
+            "distance_km": round(distance_km, 2),
+            "packages": json.dumps(packages_with_images) if packages_with_images else space.packages,
+            "amenities": space.amenities,
+            "opening_hours": space.opening_hours,
+        }
+
+        if travel is not None:
+            element = travel.get(space.id)
+            space_info["travel_duration_seconds"] = element["duration_value"] if element else None
+            space_info["travel_duration_text"] = element["duration_text"] if element else None
+            space_info["travel_distance_meters"] = element["distance_value"] if element else None
+
+        nearby_spaces.append(space_info)
+
+    return nearby_spaces
+
+def availability_days(start_date: date, end_date: Optional[date], days_of_week: Optional[str]) -> list:
+    """Days to check seat availability on, capped at a year"""
+    end_date = end_date or start_date
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    if (end_date - start_date).days > 366:
+        raise HTTPException(status_code=400, detail="Date range is limited to one year")
+    return booking_dates(start_date, end_date, days_of_week)
+
+def find_employer_employee(db: Session, employee_id: int, employer_id: int):
+    """Employee record if they belong to the employer, else None"""
+    return db.query(employee_model.Employee).join(
+        EmployerEmployee,
+        employee_model.Employee.id == EmployerEmployee.employee_id
+    ).filter(
+        employee_model.Employee.id == employee_id,
+        EmployerEmployee.employer_id == employer_id
+    ).first()
+
 # ✅ Nearby coworking spaces for selected employee
 @router.get("/coworking-spaces")
-def list_verified_nearby_coworking_spaces(
+async def list_verified_nearby_coworking_spaces(
+    response: Response,
     employee_id: int = Query(...),
     max_distance_km: float = Query(10.0),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to return every match"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    nearest: Optional[int] = Query(None, ge=1, description="Return the k nearest spaces instead of a radius search"),
+    sort_by: str = Query("distance", description="'distance' (straight line) or 'duration' (travel time)"),
+    travel_mode: str = Query("driving", description="driving, walking, bicycling or transit; used when sort_by=duration"),
+    free_seats: Optional[int] = Query(None, ge=1, description="Only spaces with this many free seats on every requested day"),
+    available_from: Optional[date] = Query(None, description="First day free_seats must hold; required with free_seats"),
+    available_to: Optional[date] = Query(None, description="Last day free_seats must hold; defaults to available_from"),
+    available_days: Optional[str] = Query(None, description="Weekdays in the range to check, e.g. 'mon,wed'; default every day"),
     db: Session = Depends(get_db),
     current=Depends(get_current_employer_user)
 ):
     if current["role"] != "employer":
         raise HTTPException(status_code=403, detail="Unauthorized")
+    if sort_by not in ("distance", "duration"):
+        raise HTTPException(status_code=400, detail="sort_by must be 'distance' or 'duration'")
+    if travel_mode not in TRAVEL_MODES:
+        raise HTTPException(status_code=400, detail=f"travel_mode must be one of {sorted(TRAVEL_MODES)}")
 
-    employee = db.query(employee_model.Employee).join(
-        EmployerEmployee,
-        employee_model.Employee.id == EmployerEmployee.employee_id
-    ).filter(
-        employee_model.Employee.id == employee_id,
-        EmployerEmployee.employer_id == current["user"].id
-    ).first()
+    availability = None
+    if free_seats:
+        if not available_from:
+            raise HTTPException(status_code=400, detail="available_from is required with free_seats")
+        availability = (free_seats, availability_days(available_from, available_to, available_days))
+
+    employee = await run_in_threadpool(find_employer_employee, db, employee_id, current["user"].id)
 
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -885,85 +1371,46 @@ def list_verified_nearby_coworking_spaces(
         raise HTTPException(status_code=400, detail="Employee location not set")
 
     emp_coords = (employee.latitude, employee.longitude)
-    print(f"Employee coordinates: {emp_coords}, Max distance: {max_distance_km} km")
+    print(f"Employee coordinates: {emp_coords}, Max distance: {max_distance_km} km, Sort: {sort_by}")
 
-    all_spaces = db.query(coworking_model.CoworkingSpaceListing).filter_by(is_verified=True).all()
-    print(f"Total verified spaces in database: {len(all_spaces)}")
+    travel = None
+    if sort_by == "duration":
+        matches, travel = await search_verified_spaces_by_travel_time(
+            db, employee.latitude, employee.longitude, max_distance_km, response, travel_mode,
+            limit=limit, cursor=cursor, nearest=nearest, employee_id=employee.id, availability=availability
+        )
+    else:
+        matches = await run_in_threadpool(
+            search_verified_spaces, db, employee.latitude, employee.longitude, max_distance_km, response,
+            limit=limit, cursor=cursor, nearest=nearest, employee_id=employee.id, availability=availability
+        )
+    print(f"Verified spaces on this page: {len(matches)}")
 
-    nearby_spaces = []
-    for space in all_spaces:
-        if space.latitude is None or space.longitude is None:
-            continue
-        distance_km = haversine(emp_coords, (space.latitude, space.longitude), unit=Unit.KILOMETERS)
-        print(f"Space '{space.title}' distance: {distance_km:.2f} km (within {max_distance_km} km: {distance_km <= max_distance_km})")
-        if distance_km <= max_distance_km:
-            # Parse packages and add images for each package
-            packages_with_images = []
-            if space.packages:
-                try:
-                    import json
-                    packages = json.loads(space.packages) if isinstance(space.packages, str) else space.packages
-                    for package in packages:
-                        # Fetch images for this package with thumbnail URLs
-                        package_images = db.execute(
-                            text("SELECT image_url, image_name, is_primary, thumbnail_url, thumbnail_medium_url, thumbnail_small_url FROM coworking_images WHERE package_id = :package_id ORDER BY is_primary DESC, id ASC"),
-                            {"package_id": str(package.get('id', ''))}
-                        ).fetchall()
-                        
-                        # Add images to package
-                        package_with_images = package.copy()
-                        package_with_images['images'] = []
-                        for img in package_images:
-                            print(f"🖼️ RAW IMAGE DATA: {img}")
-                            
-                            # Force thumbnail URLs - completely override any original image paths
-                            original_path = img[0]  # /uploads/coworking_images/filename.jpg
-                            thumbnail_medium_path = img[4] if len(img) > 4 and img[4] else None
-                            
-                            print(f"📁 Original path: {original_path}")
-                            print(f"🎯 Thumbnail medium path: {thumbnail_medium_path}")
-                            
-                            # Use database thumbnail URL first, fallback to constructed URL
-                            if thumbnail_medium_path and thumbnail_medium_path.strip():
-                                final_url = f"http://localhost:8001{thumbnail_medium_path}"
-                                print(f"🎯 Using database thumbnail URL: {final_url}")
-                            else:
-                                # Fallback: construct thumbnail URL from filename
-                                filename = original_path.split('/')[-1]
-                                final_url = f"http://localhost:8001/uploads/coworking_images/thumbnails/medium/{filename}"
-                                print(f"🔄 Using constructed thumbnail URL: {final_url}")
-                            
-                            print(f"✅ FINAL URL BEING RETURNED: {final_url}")
-                            
-                            package_with_images['images'].append({
-                                'url': final_url,  # FORCE thumbnail URL
-                                'name': img[1],
-                                'is_primary': bool(img[2]),
-                                'image_url': f"http://localhost:8001{original_path}",  # Original for fallback
-                                'thumbnail_url': f"http://localhost:8001{img[3]}" if len(img) > 3 and img[3] else final_url,
-                                'thumbnail_medium_url': final_url,
-                                'thumbnail_small_url': f"http://localhost:8001{img[5]}" if len(img) > 5 and img[5] else final_url
-                            })
-                        packages_with_images.append(package_with_images)
-                except Exception as e:
-                    print(f"Error parsing packages for space {space.id}: {e}")
-                    packages_with_images = []
-            
-            nearby_spaces.append({
-                "id": space.id,
-                "title": space.title,
-                "address": space.address,
-                "city": space.city,
-                "latitude": space.latitude,
-                "longitude": space.longitude,
-                "distance_km": round(distance_km, 2),
-                "packages": json.dumps(packages_with_images) if packages_with_images else space.packages,
-                "amenities": space.amenities,
-                "opening_hours": space.opening_hours,
-            })
+    nearby_spaces = await run_in_threadpool(build_nearby_space_payloads, db, matches, travel)
+
+    print(f"Returning {len(nearby_spaces)} nearby spaces")
+    return nearby_spaces
+
+
+# ✅ Seat availability calendar for a coworking space
+@router.get("/coworking-spaces/{space_id}/availability")
+def get_coworking_space_availability(
+    space_id: int,
+    start_date: date = Query(...),
+    end_date: Optional[date] = Query(None, description="Defaults to start_date"),
+    package_id: Optional[str] = Query(None, description="Limit the calendar to one package"),
+    days_of_week: Optional[str] = Query(None, description="Only these weekdays, e.g. 'mon,wed'"),
+    db: Session = Depends(get_db),
+    current=Depends(get_current_employer_user)
+):
+    if current["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Unauthorized")
 
-    print(f"Returning {len(nearby_spaces)} spaces within {max_distance_km} km radius")
-    return sorted(nearby_spaces, key=lambda x: x["distance_km"])
+    space = db.query(coworking_model.CoworkingSpaceListing).filter_by(id=space_id, is_verified=True).first()
+    if not space:
+        raise HTTPException(status_code=404, detail="Coworking space not found or not verified")
+
+    return availability_calendar(db, space, availability_days(start_date, end_date, days_of_week), package_id)
 
 
 # Pydantic schema for payment intent request
@@ -1445,33 +1892,23 @@ def book_coworking_space(
     try:
         print(f"🔍 Checking overlaps - is_ongoing: {data.is_ongoing}")
         if not data.is_ongoing:
-            # Check for conflicts based on booking type
+            # Check for conflicts based on booking type: the same employee, or the
+            # employer's own self-bookings; only days on both bookings' days_of_week count
             if data.employee_id:
                 print(f"🔍 Checking employee booking conflicts for employee_id: {data.employee_id}")
-                # Employee booking - check for conflicts with same employee only
-                overlapping = db.query(booking_model.CoworkingBooking).filter(
-                    booking_model.CoworkingBooking.employee_id == data.employee_id,
-                    booking_model.CoworkingBooking.start_date <= data.end_date,
-                    booking_model.CoworkingBooking.end_date >= data.start_date
-                ).first()
-                if overlapping:
-                    print(f"❌ Employee booking conflict found: {overlapping.id}")
-                    raise HTTPException(status_code=400, detail="Employee already has a booking in that date range")
             else:
                 print(f"🔍 Checking employer self-booking conflicts for employer_id: {current_user['user'].id}")
-                # Employer self-booking - check for conflicts with other employer self-bookings only
-                # Note: employee_id.is_(None) ensures we only check employer personal bookings
-                overlapping = db.query(booking_model.CoworkingBooking).filter(
-                    booking_model.CoworkingBooking.employer_id == current_user["user"].id,
-                    booking_model.CoworkingBooking.employee_id.is_(None),  # Only employer self-bookings (no employee)
-                    booking_model.CoworkingBooking.start_date <= data.end_date,
-                    booking_model.CoworkingBooking.end_date >= data.start_date
-                ).first()
-                if overlapping:
-                    print(f"❌ Employer self-booking conflict found: {overlapping.id} ({overlapping.start_date} to {overlapping.end_date})")
-                    raise HTTPException(status_code=400, detail="You already have a personal booking in that date range")
-                else:
-                    print("✅ No booking conflicts found")
+            conflicts = find_conflicts(
+                db, current_user["user"].id, data.employee_id,
+                data.start_date, data.end_date, data.days_of_week
+            )
+            if conflicts:
+                booking_id, days = next(iter(conflicts.items()))
+                print(f"❌ Booking conflict found: {booking_id} (first shared day {days[0]})")
+                if data.employee_id:
+                    raise HTTPException(status_code=400, detail="Employee already has a booking in that date range")
+                raise HTTPException(status_code=400, detail="You already have a personal booking in that date range")
+            print("✅ No booking conflicts found")
     except HTTPException:
         raise
     except Exception as overlap_error:
@@ -1493,6 +1930,7 @@ def book_coworking_space(
             employer_id=current_user["user"].id,
             employee_id=data.employee_id,
             coworking_space_id=data.coworking_space_id,
+            package_id=data.package_id,
             booking_type=data.booking_type,
             start_date=data.start_date,
             end_date=data.end_date,
@@ -1509,12 +1947,17 @@ def book_coworking_space(
         
         print(f"✅ Booking object created successfully")
         
+        # The flush takes a seat in the occupancy ledger, or raises CapacityError
         db.add(booking)
         db.commit()
         db.refresh(booking)
         
         print(f"✅ Booking saved to database with ID: {booking.id}")
         
+    except CapacityError as capacity_error:
+        print(f"❌ {capacity_error}")
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(capacity_error))
     except Exception as booking_error:
         print(f"💥 Error creating booking: {str(booking_error)}")
         print(f"💥 Error type: {type(booking_error)}")
@@ -1530,6 +1973,7 @@ def book_coworking_space(
         "total_amount": booking.total_cost,
         "employee_id": booking.employee_id,
         "coworking_space_id": booking.coworking_space_id,
+        "package_id": booking.package_id,
         "booking_type": booking.booking_type,
         "notes": booking.notes,
         "payment_intent_id": booking.payment_intent_id,
@@ -1539,10 +1983,183 @@ def book_coworking_space(
 
 
 
+# ✅ Book coworking for many employees at once
+@router.post("/book-coworking/bulk")
+def book_coworking_space_bulk(
+    data: booking_schema.BulkCoworkingBookingCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Validate every row in one pass, create one Stripe payment intent for the
+    total and insert all bookings in a single transaction. Without partial,
+    any invalid row rejects the whole batch with the per-row results (409).
+    """
+    if current_user["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    employer_id = current_user["user"].id
+    rows = data.bookings
+    errors = {index: [] for index in range(len(rows))}
+    print(f"🔍 Bulk booking request: {len(rows)} rows")
+
+    # Spaces and employees for every row in two queries
+    space_ids = {row.coworking_space_id for row in rows}
+    spaces = {
+        space.id: space for space in db.query(coworking_model.CoworkingSpaceListing).filter(
+            coworking_model.CoworkingSpaceListing.id.in_(space_ids),
+            coworking_model.CoworkingSpaceListing.is_verified == True
+        )
+    }
+    employee_ids = {row.employee_id for row in rows if row.employee_id is not None}
+    own_employee_ids = {
+        link.employee_id for link in db.query(EmployerEmployee.employee_id).filter(
+            EmployerEmployee.employer_id == employer_id,
+            EmployerEmployee.employee_id.in_(employee_ids)
+        )
+    } if employee_ids else set()
+
+    for index, row in enumerate(rows):
+        if row.coworking_space_id not in spaces:
+            errors[index].append("Coworking space not found or not verified")
+        if row.employee_id is not None and row.employee_id not in own_employee_ids:
+            errors[index].append("Employee not found")
+        if row.end_date and row.end_date < row.start_date:
+            errors[index].append("end_date must not be before start_date")
+
+    # Date conflicts against stored bookings (one-time bookings only, as for single bookings)
+    proposals = [row.dict() for row in rows]
+    conflicts = check_proposals(db, employer_id, proposals)
+    for index, row in enumerate(rows):
+        if not row.is_ongoing and conflicts[index]["conflicts"]:
+            errors[index].append(
+                f"Conflicts with existing booking(s) {[conflict['booking_id'] for conflict in conflicts[index]['conflicts']]}"
+            )
+
+    # Between rows that are still valid: the first of two overlapping rows is kept
+    overlaps = first_come_overlaps(employer_id, proposals, [index for index in range(len(rows)) if not errors[index]])
+    for index, earlier in overlaps.items():
+        errors[index].append(f"Overlaps rows {earlier} of this request")
+
+    # Seats, counting earlier rows of the batch as taken
+    candidates = [index for index in range(len(rows)) if not errors[index]]
+    shortfalls = capacity_shortfalls(db, [
+        (spaces[rows[index].coworking_space_id], rows[index].package_id,
+         booking_dates(rows[index].start_date, rows[index].end_date, rows[index].days_of_week))
+        for index in candidates
+    ])
+    for position, full_days in shortfalls.items():
+        errors[candidates[position]].append(
+            f"No free seat on {', '.join(day.isoformat() for day in full_days[:5])}"
+            + (" ..." if len(full_days) > 5 else "")
+        )
+
+    valid = [index for index in range(len(rows)) if not errors[index]]
+    results = [
+        {"index": index, "employee_id": row.employee_id, "status": "failed" if errors[index] else "valid",
+         "booking_id": None, "errors": errors[index]}
+        for index, row in enumerate(rows)
+    ]
+    if len(valid) < len(rows) and not data.partial:
+        print(f"❌ Bulk booking rejected: {len(rows) - len(valid)} invalid rows")
+        raise HTTPException(status_code=409, detail={
+            "message": "Some bookings are invalid; nothing was booked",
+            "results": results
+        })
+    if not valid:
+        return {"message": "No bookings created", "created": 0, "failed": len(rows), "payment_intent": None, "results": results}
+
+    # One payment intent for every booking in the batch
+    amount = int(round(sum(rows[index].total_cost or 0 for index in valid) * 100))
+    intent = None
+    if amount > 0:
+        try:
+            intent = stripe.PaymentIntent.create(
+                amount=amount,
+                currency=data.currency,
+                automatic_payment_methods={'enabled': True},
+                metadata={
+                    'employer_id': str(employer_id),
+                    'booking_count': str(len(valid)),
+                    'booking_type': 'bulk',
+                    'coworking_space_ids': ",".join(
+                        str(space_id) for space_id in sorted({rows[index].coworking_space_id for index in valid})
+                    )[:500],
+                }
+            )
+            print(f"✅ Bulk payment intent created: {intent.id} for {amount} {data.currency}")
+        except stripe.error.StripeError as e:
+            print(f"❌ Stripe API Error: {e}")
+            raise HTTPException(status_code=400, detail=f"Payment error: {str(e)}")
+
+    # All bookings and their seats in one transaction
+    bookings = []
+    try:
+        for index in valid:
+            row = rows[index]
+            bookings.append(booking_model.CoworkingBooking(
+                employer_id=employer_id,
+                employee_id=row.employee_id,
+                coworking_space_id=row.coworking_space_id,
+                package_id=row.package_id,
+                booking_type=row.booking_type,
+                start_date=row.start_date,
+                end_date=row.end_date,
+                subscription_mode=row.subscription_mode,
+                is_ongoing=row.is_ongoing,
+                days_of_week=row.days_of_week,
+                duration_per_day=row.duration_per_day,
+                total_cost=row.total_cost,
+                notes=row.notes,
+                payment_intent_id=intent.id if intent else row.payment_intent_id,
+                payment_status="pending" if intent else (row.payment_status or "pending")
+            ))
+        # The flush takes the seats in the occupancy ledger, or raises CapacityError
+        db.add_all(bookings)
+        db.flush()
+        # Read ids before commit expires the rows
+        booking_ids = [booking.id for booking in bookings]
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if intent:
+            try:
+                stripe.PaymentIntent.cancel(intent.id)
+            except stripe.error.StripeError as cancel_error:
+                print(f"⚠️ Could not cancel payment intent {intent.id}: {cancel_error}")
+        if isinstance(e, CapacityError):
+            raise HTTPException(status_code=409, detail=str(e))
+        print(f"💥 Error creating bulk bookings: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating bookings: {str(e)}")
+
+    for index, booking_id in zip(valid, booking_ids):
+        results[index]["status"] = "booked"
+        results[index]["booking_id"] = booking_id
+
+    print(f"✅ Bulk booking saved: {len(booking_ids)} bookings")
+    return {
+        "message": "Bookings confirmed",
+        "created": len(booking_ids),
+        "failed": len(rows) - len(booking_ids),
+        "payment_intent": {
+            "client_secret": intent.client_secret,
+            "payment_intent_id": intent.id,
+            "amount": amount,
+            "currency": data.currency,
+            "status": intent.status
+        } if intent else None,
+        "results": results
+    }
+
+
 # ✅ Nearby coworking spaces from employer's profile
 @router.post("/employer-profile-coworking-spaces", response_model=List[NearbyCoworkingSpaceOut])
 def find_coworking_by_address(
     data: coworking_schema.CoworkingAddressSearch,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to return every match"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    nearest: Optional[int] = Query(None, ge=1, description="Return the k nearest spaces instead of a radius search"),
     db: Session = Depends(get_db)
 ):
     import json
@@ -1552,29 +2169,29 @@ def find_coworking_by_address(
     if not lat or not lon:
         raise HTTPException(status_code=400, detail="Latitude/longitude required")
 
-    all_spaces = db.query(coworking_model.CoworkingSpaceListing).filter_by(is_verified=True).all()
     results = []
-    for space in all_spaces:
-        if space.latitude and space.longitude:
-            distance = haversine((lat, lon), (space.latitude, space.longitude), unit=Unit.KILOMETERS)
-            if distance <= data.radius_km:
-                results.append({
-                    "id": space.id,
-                    "title": space.title,
-                    "latitude": space.latitude,
-                    "longitude": space.longitude,
-                    "full_address": f"{space.address}, {space.city}, {space.country}",
-                    "distance_km": round(distance, 2),
-                    "price_per_hour": space.price_per_hour,
-                    "price_per_day": space.price_per_day,
-                    "price_per_week": space.price_per_week,
-                    "price_per_month": space.price_per_month,
-                    "description": space.description,
-                    "opening_hours": space.opening_hours,
-                    "amenities": space.amenities,
-                    "packages": space.packages,  # Keep as JSON string for schema compatibility
-                })
-    return sorted(results, key=lambda x: x["distance_km"])
+    matches = search_verified_spaces(
+        db, lat, lon, data.radius_km, response,
+        limit=limit, cursor=cursor, nearest=nearest
+    )
+    for space, distance in matches:
+        results.append({
+            "id": space.id,
+            "title": space.title,
+            "latitude": space.latitude,
+            "longitude": space.longitude,
+            "full_address": f"{space.address}, {space.city}, {space.country}",
+            "distance_km": round(distance, 2),
+            "price_per_hour": space.price_per_hour,
+            "price_per_day": space.price_per_day,
+            "price_per_week": space.price_per_week,
+            "price_per_month": space.price_per_month,
+            "description": space.description,
+            "opening_hours": space.opening_hours,
+            "amenities": space.amenities,
+            "packages": space.packages,  # Keep as JSON string for schema compatibility
+        })
+    return results
 
 
 @router.get("/coworking-space/{space_id}/images")
@@ -1679,29 +2296,35 @@ class FindCoworkingRequest(BaseModel):
     radius_km: float = 10.0
 
 @router.post("/find-coworking-by-address", response_model=List[CoworkingSpaceOut])
-def find_coworking_by_custom_address(
+async def find_coworking_by_custom_address(
     data: FindCoworkingRequest,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to return every match"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    nearest: Optional[int] = Query(None, ge=1, description="Return the k nearest spaces instead of a radius search"),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_employer_user)
 ):
     full_address = ", ".join(filter(None, [data.address, data.city, data.state, data.zip_code, data.country]))
-    lat, lon = get_coordinates_from_address(full_address)
+    # Geocode on the event loop via the pooled async client; retries don't hold a worker thread
+    lat, lon = await async_geocode_address(full_address)
     if not lat or not lon:
         raise HTTPException(status_code=400, detail="Failed to geocode custom address")
 
-    all_spaces = db.query(coworking_model.CoworkingSpaceListing).filter_by(is_verified=True).all()
+    # Database work stays synchronous, so run it in the threadpool
     results = []
-    for space in all_spaces:
-        if space.latitude and space.longitude:
-            distance = haversine((lat, lon), (space.latitude, space.longitude), unit=Unit.KILOMETERS)
-            if distance <= data.radius_km:
-                results.append({
-                    "id": space.id,
-                    "title": space.title,
-                    "full_address": f"{space.address}, {space.city}, {space.country}",
-                    "distance_km": round(distance, 2)
-                })
-    return sorted(results, key=lambda x: x["distance_km"])
+    matches = await run_in_threadpool(
+        search_verified_spaces, db, lat, lon, data.radius_km, response,
+        limit=limit, cursor=cursor, nearest=nearest
+    )
+    for space, distance in matches:
+        results.append({
+            "id": space.id,
+            "title": space.title,
+            "full_address": f"{space.address}, {space.city}, {space.country}",
+            "distance_km": round(distance, 2)
+        })
+    return results
 
 # ✅ List all bookings for employees of this employer
 @router.get("/bookings", response_model=List[BookingListItem])
@@ -1844,6 +2467,7 @@ def delete_booking(
     if booking.employer_id != current_user["user"].id:
         raise HTTPException(status_code=403, detail="You do not have permission to delete this booking")
 
+    # The flush gives the booking's seats back to the occupancy ledger
     db.delete(booking)
     db.commit()
 
@@ -1870,12 +2494,11 @@ def update_coworking_booking(
         raise HTTPException(status_code=404, detail="Booking not found")
 
     # ✅ Check for overlapping bookings (based on employee_id already in booking)
-    overlapping = db.query(booking_model.CoworkingBooking).filter(
-        booking_model.CoworkingBooking.employee_id == booking.employee_id,
-        booking_model.CoworkingBooking.id != booking_id,
-        booking_model.CoworkingBooking.start_date <= data.end_date,
-        booking_model.CoworkingBooking.end_date >= data.start_date
-    ).first()
+    overlapping = find_conflicts(
+        db, booking.employer_id, booking.employee_id,
+        data.start_date, data.end_date, data.days_of_week,
+        exclude_booking_id=booking_id
+    )
 
     if overlapping:
         raise HTTPException(status_code=400, detail="Another booking exists in the selected date range")
@@ -1891,55 +2514,135 @@ def update_coworking_booking(
     booking.total_cost = data.total_cost
     booking.notes = data.notes
 
-    db.commit()
+    # ✅ The flush moves the booking's seats from its old days to the new ones
+    try:
+        db.commit()
+    except CapacityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
     db.refresh(booking)
 
     return {"message": "Booking updated successfully", "booking_id": booking.id}
 
 
+# ✅ Check proposed bookings for conflicts (team-wide scheduling, nothing is saved)
+@router.post("/bookings/check-conflicts")
+def check_booking_conflicts(
+    data: booking_schema.BookingConflictCheck,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    if current_user["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    employer_id = current_user["user"].id
+    proposals = [proposal.dict() for proposal in data.bookings]
+
+    for proposal in proposals:
+        if proposal["end_date"] and proposal["end_date"] < proposal["start_date"]:
+            raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+    # Only this employer's employees can be checked
+    employee_ids = {proposal["employee_id"] for proposal in proposals if proposal["employee_id"] is not None}
+    if employee_ids:
+        own_ids = {
+            row.employee_id for row in db.query(EmployerEmployee.employee_id).filter(
+                EmployerEmployee.employer_id == employer_id,
+                EmployerEmployee.employee_id.in_(employee_ids)
+            )
+        }
+        unknown = sorted(employee_ids - own_ids)
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Employees not found: {unknown}")
+
+    results = check_proposals(db, employer_id, proposals)
+    return {
+        "total": len(results),
+        "conflicting": sum(1 for result in results if result["has_conflict"]),
+        "results": results
+    }
+
+
 # ✅ Dashboard Stats
 # ✅ Task Management Endpoints
 
+def parse_task_filter(enum_class, value: Optional[str], name: str):
+    """Resolve a status/priority query value (e.g. "in_progress") to its enum member"""
+    if not value:
+        return None
+    member = getattr(enum_class, value.upper(), None)
+    if member is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+    return member
+
 # Get all tasks for employer
 @router.get("/tasks")
 def get_tasks(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by task status"),
+    priority: Optional[str] = Query(None, description="Filter by task priority"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to return every task"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
     db: Session = Depends(get_db),
     current=Depends(get_current_employer_user)
 ):
-    """Get all tasks for the employer with optional status filtering"""
+    """
+    Get all tasks for the employer with optional status/priority filtering.
+    Assignments and assigned employees are loaded in bulk, so the query count
+    does not grow with the number of tasks. Pages are keyed on (created_at, id);
+    the cursor for the next page is sent in the X-Next-Cursor header.
+    """
     if current["role"] != "employer":
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     employer_id = current["user"].id
+    Task = task_model.Task
     
-    query = db.query(task_model.Task).filter(
-        task_model.Task.employer_id == employer_id
+    query = db.query(Task).filter(
+        Task.employer_id == employer_id
+    ).options(
+        selectinload(Task.task_assignments).selectinload(task_assignment_model.TaskAssignment.employee)
     )
     
-    if status:
-        query = query.filter(task_model.Task.status == status)
+    status_filter = parse_task_filter(task_model.TaskStatus, status, "status")
+    if status_filter:
+        query = query.filter(Task.status == status_filter)
+    priority_filter = parse_task_filter(task_model.TaskPriority, priority, "priority")
+    if priority_filter:
+        query = query.filter(Task.priority == priority_filter)
     
-    tasks = query.order_by(task_model.Task.created_at.desc()).all()
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = cursor.rsplit(":", 1)
+            after_created_at, after_id = datetime.fromisoformat(cursor_created_at), int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(
+            Task.created_at < after_created_at,
+            and_(Task.created_at == after_created_at, Task.id < after_id)
+        ))
+    
+    query = query.order_by(Task.created_at.desc(), Task.id.desc())
+    if limit is not None:
+        # One extra row tells whether another page follows
+        tasks = query.limit(limit + 1).all()
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            response.headers["X-Next-Cursor"] = f"{tasks[-1].created_at.isoformat()}:{tasks[-1].id}"
+    else:
+        tasks = query.all()
     
     result = []
     for task in tasks:
-        # Get task assignments
-        assignments = db.query(task_assignment_model.TaskAssignment).filter(
-            task_assignment_model.TaskAssignment.task_id == task.id
-        ).all()
-        
-        assigned_employees = []
-        for assignment in assignments:
-            employee = db.query(employee_model.Employee).filter(
-                employee_model.Employee.id == assignment.employee_id
-            ).first()
-            if employee:
-                assigned_employees.append({
-                    "id": employee.id,
-                    "name": f"{employee.first_name} {employee.last_name}",
-                    "email": employee.email
-                })
+        assigned_employees = [
+            {
+                "id": assignment.employee.id,
+                "name": f"{assignment.employee.first_name} {assignment.employee.last_name}",
+                "email": assignment.employee.email
+            }
+            for assignment in task.task_assignments
+            if assignment.employee
+        ]
         
         result.append({
             "id": task.id,
@@ -2062,16 +2765,14 @@ def get_task_details(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Get task assignments
+    # Get task assignments with their employees in one batched load
     assignments = db.query(task_assignment_model.TaskAssignment).filter(
         task_assignment_model.TaskAssignment.task_id == task_id
-    ).all()
+    ).options(selectinload(task_assignment_model.TaskAssignment.employee)).all()
     
     assigned_employees = []
     for assignment in assignments:
-        employee = db.query(employee_model.Employee).filter(
-            employee_model.Employee.id == assignment.employee_id
-        ).first()
+        employee = assignment.employee
         if employee:
             assigned_employees.append({
                 "id": employee.id,
@@ -2087,13 +2788,13 @@ def get_task_details(
     # Get task comments
     comments = db.query(task_comment_model.TaskComment).filter(
         task_comment_model.TaskComment.task_id == task_id
+    ).options(
+        selectinload(task_comment_model.TaskComment.author)
     ).order_by(task_comment_model.TaskComment.created_at.asc()).all()
     
     task_comments = []
     for comment in comments:
-        author = db.query(employer_model.Employer).filter(
-            employer_model.Employer.id == comment.author_id
-        ).first()
+        author = comment.author
         task_comments.append({
             "id": comment.id,
             "content": comment.content,
@@ -2320,13 +3021,13 @@ def get_task_comments(
     # Get comments
     comments = db.query(task_comment_model.TaskComment).filter(
         task_comment_model.TaskComment.task_id == task_id
+    ).options(
+        selectinload(task_comment_model.TaskComment.author)
     ).order_by(task_comment_model.TaskComment.created_at.asc()).all()
     
     task_comments = []
     for comment in comments:
-        author = db.query(employer_model.Employer).filter(
-            employer_model.Employer.id == comment.author_id
-        ).first()
+        author = comment.author
         task_comments.append({
             "id": comment.id,
             "content": comment.content,
@@ -2618,43 +3319,17 @@ def get_dashboard_stats(
     if current["role"] != "employer":
         raise HTTPException(status_code=403, detail="Unauthorized")
     
-    employer_id = current["user"].id
-    
-    # Import notification model
-    from shared.models.notification import Notification
-    
-    # Count employees
-    employee_count = db.query(employee_model.Employee).join(
-        EmployerEmployee
-    ).filter(
-        EmployerEmployee.employer_id == employer_id,
-        EmployerEmployee.status == "active"
-    ).count()
-    
-    # Count active tasks
-    active_tasks = db.query(task_model.Task).filter(
-        task_model.Task.employer_id == employer_id,
-        task_model.Task.status.in_([TaskStatus.PENDING, TaskStatus.IN_PROGRESS])
-    ).count()
-    
-    # Count monthly bookings (current month)
-    current_month = datetime.now().replace(day=1)
-    monthly_bookings = db.query(booking_model.CoworkingBooking).filter(
-        booking_model.CoworkingBooking.employer_id == employer_id,
-        booking_model.CoworkingBooking.start_date >= current_month
-    ).count()
-    
-    # Count unread notifications
-    unread_notifications = db.query(Notification).filter(
-        Notification.employer_id == employer_id,
-        Notification.is_read == False
-    ).count()
+    # Counters are kept current on write; one indexed read instead of four COUNT(*)s
+    counters = read_counters(
+        db, "employer", current["user"].id,
+        since={"bookings_by_start_month": datetime.now().strftime("%Y-%m")}
+    )
     
     return {
-        "employees": employee_count,
-        "active_tasks": active_tasks,
-        "monthly_bookings": monthly_bookings,
-        "unread_notifications": unread_notifications
+        "employees": int(counters.get("employees", 0)),
+        "active_tasks": int(counters.get("active_tasks", 0)),
+        "monthly_bookings": int(counters.get("bookings_by_start_month", 0)),
+        "unread_notifications": int(counters.get("unread_notifications", 0))
     }
 
 
@@ -2760,72 +3435,80 @@ def get_employee_task_performance(
     
     employer_id = current["user"].id
     
-    # Get all employees for this employer
-    employees = db.query(employee_model.Employee).join(
-        EmployerEmployee
+    Assignment = task_assignment_model.TaskAssignment
+    Task = task_model.Task
+    TaskStatus = task_model.TaskStatus
+
+    completed = and_(Task.status == TaskStatus.COMPLETED, Assignment.completed_at.isnot(None))
+    completed_with_due_date = and_(completed, Task.due_date.isnot(None))
+    # Tasks counted as currently overdue: past due and not completed
+    open_past_due = and_(
+        not_(completed),
+        Task.due_date.isnot(None),
+        Task.due_date < datetime.now(),
+        Task.status != TaskStatus.COMPLETED
+    )
+
+    # One grouped aggregate with conditional sums instead of a query per employee and per task
+    task_stats = db.query(
+        Assignment.employee_id.label("employee_id"),
+        func.count(Assignment.id).label("total_tasks"),
+        func.sum(case((completed, 1), else_=0)).label("completed_tasks"),
+        func.sum(case((and_(completed_with_due_date, Assignment.completed_at <= Task.due_date), 1), else_=0)).label("on_time_completions"),
+        func.sum(case(
+            (and_(completed_with_due_date, Assignment.completed_at > Task.due_date), 1),
+            (open_past_due, 1),
+            else_=0
+        )).label("overdue_tasks"),
+        func.avg(case((
+            completed_with_due_date,
+            func.julianday(func.date(Assignment.completed_at)) - func.julianday(func.date(Assignment.assigned_at))
+        ))).label("avg_completion_days")
+    ).join(
+        Task, Task.id == Assignment.task_id
+    ).filter(
+        Task.employer_id == employer_id
+    ).group_by(Assignment.employee_id).subquery()
+
+    rows = db.query(
+        employee_model.Employee.id,
+        employee_model.Employee.first_name,
+        employee_model.Employee.last_name,
+        employee_model.Employee.email,
+        task_stats.c.total_tasks,
+        task_stats.c.completed_tasks,
+        task_stats.c.on_time_completions,
+        task_stats.c.overdue_tasks,
+        task_stats.c.avg_completion_days
+    ).join(
+        EmployerEmployee, EmployerEmployee.employee_id == employee_model.Employee.id
+    ).outerjoin(
+        task_stats, task_stats.c.employee_id == employee_model.Employee.id
     ).filter(
         EmployerEmployee.employer_id == employer_id
     ).all()
     
     performance_data = []
     
-    for employee in employees:
-        # Get task assignments for this employee
-        task_assignments = db.query(task_assignment_model.TaskAssignment).join(
-            task_model.Task
-        ).filter(
-            task_assignment_model.TaskAssignment.employee_id == employee.id,
-            task_model.Task.employer_id == employer_id
-        ).all()
-        
-        total_tasks = len(task_assignments)
-        completed_tasks = 0
-        on_time_completions = 0
-        overdue_tasks = 0
-        avg_completion_days = 0
-        
-        if total_tasks > 0:
-            completion_days = []
-            
-            for assignment in task_assignments:
-                task = assignment.task
-                
-                # Count completed tasks
-                if task.status == task_model.TaskStatus.COMPLETED and assignment.completed_at:
-                    completed_tasks += 1
-                    
-                    # Calculate completion time
-                    if task.due_date:
-                        completion_days_count = (assignment.completed_at.date() - assignment.assigned_at.date()).days
-                        completion_days.append(completion_days_count)
-                        
-                        # Check if completed on time
-                        if assignment.completed_at <= task.due_date:
-                            on_time_completions += 1
-                        else:
-                            overdue_tasks += 1
-                
-                # Count currently overdue tasks
-                elif task.due_date and task.due_date < datetime.now() and task.status != task_model.TaskStatus.COMPLETED:
-                    overdue_tasks += 1
-            
-            # Calculate average completion time
-            if completion_days:
-                avg_completion_days = sum(completion_days) / len(completion_days)
+    for row in rows:
+        total_tasks = row.total_tasks or 0
+        completed_tasks = row.completed_tasks or 0
+        on_time_completions = row.on_time_completions or 0
+        avg_completion_days = row.avg_completion_days or 0
         
         completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         on_time_rate = (on_time_completions / completed_tasks * 100) if completed_tasks > 0 else 0
         
         performance_data.append({
-            "employee_id": employee.id,
-            "employee_name": f"{employee.first_name} {employee.last_name}",
-            "email": employee.email,
+            "employee_id": row.id,
+            "employee_name": f"{row.first_name} {row.last_name}",
+            "email": row.email,
             "total_tasks": total_tasks,
             "completed_tasks": completed_tasks,
             "completion_rate": round(completion_rate, 1),
             "on_time_completions": on_time_completions,
             "on_time_rate": round(on_time_rate, 1),
-            "overdue_tasks": overdue_tasks,
+            "overdue_tasks": row.overdue_tasks or 0,
             "avg_completion_days": round(avg_completion_days, 1),
             "efficiency_score": round((completion_rate * 0.6 + on_time_rate * 0.4), 1)
         })
@@ -2976,6 +3659,7 @@ def process_booking_payment(
             employer_id=employer_id,
             employee_id=booking_data.get("employee_id"),
             coworking_space_id=booking_data.get("coworking_space_id"),
+            package_id=booking_data.get("package_id"),
             booking_type=booking_data.get("booking_type"),
             subscription_mode=booking_data.get("subscription_mode"),
             is_ongoing=booking_data.get("is_ongoing", False),
@@ -2987,6 +3671,13 @@ def process_booking_payment(
             notes=booking_data.get("notes")
         )
         
+        coworking = db.query(coworking_model.CoworkingSpaceListing).filter_by(
+            id=new_booking.coworking_space_id
+        ).first()
+        if not coworking:
+            raise HTTPException(status_code=404, detail="Coworking space not found")
+        
+        # The flush takes a seat in the occupancy ledger, or raises CapacityError
         db.add(new_booking)
         db.commit()
         db.refresh(new_booking)
@@ -3002,6 +3693,12 @@ def process_booking_payment(
             "transaction_id": f"mock_txn_{new_booking.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         }
         
+    except HTTPException:
+        db.rollback()
+        raise
+    except CapacityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Booking failed: {str(e)}")
@@ -0,0 +1,101 @@
+"""
+Database migration script to add the (employer_id, date, employee_id) index to attendances table
+Run this script so employer attendance statistics read a date window from the index
+"""
+import sqlite3
+import os
+
+INDEX_NAME = "ix_attendances_employer_date_employee"
+
+def migrate_database():
+    """Add (employer_id, date, employee_id) index to attendances table"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if table exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name='attendances'
+        """)
+
+        if not cursor.fetchone():
+            print("❌ attendances table does not exist yet.")
+            conn.close()
+            return False
+
+        # Check if the index already exists
+        cursor.execute("PRAGMA index_list(attendances)")
+        indexes = [index[1] for index in cursor.fetchall()]
+
+        if INDEX_NAME in indexes:
+            print(f"✅ Attendance index already exists: {INDEX_NAME}")
+            conn.close()
+            return True
+
+        # Add attendance index
+        print("🔄 Adding attendance index to attendances table...")
+
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS {INDEX_NAME}
+            ON attendances (employer_id, date, employee_id)
+        """)
+
+        # Refresh planner statistics so SQLite picks the new index
+        cursor.execute("ANALYZE attendances")
+
+        # Commit changes
+        conn.commit()
+        print("✅ Successfully added attendance index!")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_info({INDEX_NAME})")
+        columns = cursor.fetchall()
+        print(f"\n📋 Index {INDEX_NAME} columns:")
+        for column in columns:
+            print(f"   - {column[2]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting attendances index migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Restart your employer server")
+        print("   2. Attendance statistics will now use the attendance index")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
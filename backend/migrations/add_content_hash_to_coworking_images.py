@@ -0,0 +1,89 @@
+"""
+Database migration script to add the content hash column to the coworking_images table
+Uploads are hashed with SHA-256 while they stream to disk; the hash is kept for deduplication
+"""
+import sqlite3
+import os
+
+def migrate_database():
+    """Add content_sha256 (indexed) to coworking_images"""
+    
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db", 
+        "app.db"
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+    
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+    
+    print(f"📁 Using database: {db_path}")
+    
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        # Check if table exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='coworking_images'
+        """)
+        
+        if not cursor.fetchone():
+            print("❌ coworking_images table does not exist yet.")
+            conn.close()
+            return False
+        
+        cursor.execute("PRAGMA table_info(coworking_images)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if "content_sha256" in columns:
+            print("✅ coworking_images.content_sha256 already exists")
+        else:
+            print("🔄 Adding content_sha256 to coworking_images...")
+            cursor.execute("""
+                ALTER TABLE coworking_images 
+                ADD COLUMN content_sha256 VARCHAR
+            """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_coworking_images_content_sha256 
+            ON coworking_images (content_sha256)
+        """)
+        
+        # Commit changes
+        conn.commit()
+        print("✅ Successfully added the content hash column!")
+        
+        conn.close()
+        return True
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting coworking_images content hash migration...")
+    success = migrate_database()
+    
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Restart your coworking server")
+        print("   2. Images uploaded from now on record their SHA-256; older rows keep NULL")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
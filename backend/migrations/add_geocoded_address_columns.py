@@ -0,0 +1,112 @@
+"""
+Database migration script to add geocoded_address to the employees and employers tables
+Bulk geocoding stores the address key it geocoded from; rows whose address no longer matches are geocoded again
+"""
+import sqlite3
+import os
+
+# Coordinates register_employer used to store instead of geocoding (see app/utils/bulk_geocode.py)
+LEGACY_EMPLOYER_COORDINATES = [
+    (31.5204, 74.3587),
+    (24.8607, 67.0011),
+    (33.6844, 73.0479),
+]
+
+# Same key as app.utils.bulk_geocode.address_key; employees have no state
+ADDRESS_KEYS = {
+    "employers": "coalesce(address, '') || '|' || coalesce(city, '') || '|' || coalesce(state, '') || '|' || coalesce(zip_code, '') || '|' || coalesce(country, '')",
+    "employees": "coalesce(address, '') || '|' || coalesce(city, '') || '|' || '' || '|' || coalesce(zip_code, '') || '|' || coalesce(country, '')",
+}
+
+def migrate_database():
+    """Add geocoded_address to employees and employers and record it for rows that already have coordinates"""
+    
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db", 
+        "app.db"
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+    
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+    
+    print(f"📁 Using database: {db_path}")
+    
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        for table, address_key in ADDRESS_KEYS.items():
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name=?
+            """, (table,))
+            
+            if not cursor.fetchone():
+                print(f"❌ {table} table does not exist yet.")
+                conn.close()
+                return False
+            
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [column[1] for column in cursor.fetchall()]
+            
+            if "geocoded_address" in columns:
+                print(f"✅ {table}.geocoded_address already exists")
+                continue
+            
+            print(f"🔄 Adding geocoded_address to {table}...")
+            cursor.execute(f"""
+                ALTER TABLE {table} 
+                ADD COLUMN geocoded_address TEXT
+            """)
+            
+            # Existing coordinates are taken to belong to the current address; placeholders stay pending
+            placeholders = ""
+            if table == "employers":
+                placeholders = "".join(
+                    f" AND NOT (latitude = {lat} AND longitude = {lon})" for lat, lon in LEGACY_EMPLOYER_COORDINATES
+                )
+            cursor.execute(f"""
+                UPDATE {table} 
+                SET geocoded_address = {address_key} 
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL 
+                AND NOT (latitude = 0 AND longitude = 0){placeholders}
+            """)
+            print(f"   📍 {cursor.rowcount} {table} marked as geocoded from their current address")
+        
+        # Commit changes
+        conn.commit()
+        print("✅ Successfully added geocoded_address columns!")
+        
+        conn.close()
+        return True
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting geocoded_address migration...")
+    success = migrate_database()
+    
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Restart your servers")
+        print("   2. Run python scripts/bulk_geocode.py --dry-run to see how many rows need geocoding")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
@@ -0,0 +1,99 @@
+"""
+Database migration script to add the composite indexes declared on the shared models
+Run this script on existing databases; it is safe to run repeatedly and skips
+indexes (or tables) that are already in place
+"""
+import sqlite3
+import os
+
+# (index name, table, columns) - keep in sync with __table_args__ in shared/models
+INDEXES = [
+    ("ix_coworking_bookings_employee_start", "coworking_bookings", ("employee_id", "start_date")),
+    ("ix_coworking_bookings_employer_start", "coworking_bookings", ("employer_id", "start_date")),
+    ("ix_coworking_bookings_space_created", "coworking_bookings", ("coworking_space_id", "created_at")),
+    ("ix_attendances_employee_date", "attendances", ("employee_id", "date")),
+    ("ix_attendances_employer_date_employee", "attendances", ("employer_id", "date", "employee_id")),
+    ("ix_notifications_employer_read_created", "notifications", ("employer_id", "is_read", "created_at")),
+    ("ix_coworking_images_space_package", "coworking_images", ("space_id", "package_id")),
+    ("ix_task_assignments_employee_assigned", "task_assignments", ("employee_id", "assigned_at")),
+    ("ix_tasks_employer_status_priority_due", "tasks", ("employer_id", "status", "priority", "due_date")),
+    ("ix_coworkingspacelistings_verified_lat_lon", "coworkingspacelistings", ("is_verified", "latitude", "longitude")),
+]
+
+def migrate_database():
+    """Create any missing composite indexes and refresh planner statistics"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        created = 0
+        touched_tables = set()
+        for index_name, table, columns in INDEXES:
+            if table not in tables:
+                print(f"⚠️ Skipping {index_name}: table {table} does not exist yet")
+                continue
+
+            cursor.execute(f"PRAGMA index_list({table})")
+            if index_name in [index[1] for index in cursor.fetchall()]:
+                print(f"✅ Index already exists: {index_name}")
+                continue
+
+            print(f"🔄 Adding {index_name} on {table} ({', '.join(columns)})...")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})")
+            touched_tables.add(table)
+            created += 1
+
+        # Refresh planner statistics so SQLite picks the new indexes
+        for table in sorted(touched_tables):
+            cursor.execute(f"ANALYZE {table}")
+
+        # Commit changes
+        conn.commit()
+        conn.close()
+        print(f"\n✅ Added {created} index(es)")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting composite index migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Run scripts/check_query_plans.py --database <db file> to confirm the hot queries use them")
+        print("   2. Restart the employer, coworking and admin servers")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
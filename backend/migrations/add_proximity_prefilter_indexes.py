@@ -0,0 +1,93 @@
+"""
+Database migration script to add the indexes employee_space_proximity updates filter on
+Run this script so a space change only looks at the employees around it:
+employees get a (latitude, longitude) index and employee_space_proximity a distance_km index
+"""
+import sqlite3
+import os
+
+INDEXES = [
+    ("employees", "ix_employees_lat_lon", "latitude, longitude"),
+    ("employee_space_proximity", "ix_employee_space_proximity_distance", "distance_km"),
+]
+
+def migrate_database():
+    """Add the bounding-box and K-th distance indexes used by proximity updates"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        for table, index_name, columns in INDEXES:
+            # Check if table exists
+            cursor.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type='table' AND name=?
+            """, (table,))
+
+            if not cursor.fetchone():
+                print(f"❌ {table} table does not exist yet.")
+                conn.close()
+                return False
+
+            # Check if the index already exists
+            cursor.execute(f"PRAGMA index_list({table})")
+            indexes = [index[1] for index in cursor.fetchall()]
+
+            if index_name in indexes:
+                print(f"✅ Index already exists: {index_name}")
+                continue
+
+            print(f"🔄 Adding {index_name} to {table} table...")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})")
+
+            # Refresh planner statistics so SQLite picks the new index
+            cursor.execute(f"ANALYZE {table}")
+
+        # Commit changes
+        conn.commit()
+        print("✅ Successfully added proximity indexes!")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting proximity index migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Restart your coworking and admin servers")
+        print("   2. Space changes will now only recompute the employees around them")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
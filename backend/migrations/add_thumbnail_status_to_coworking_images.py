@@ -0,0 +1,101 @@
+"""
+Database migration script to add thumbnail processing state to the coworking_images table
+Thumbnails are generated by a worker pool after upload; thumbnail_status tracks the job
+"""
+import sqlite3
+import os
+
+def migrate_database():
+    """Add thumbnail_status and thumbnail_error columns to coworking_images"""
+    
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db", 
+        "app.db"
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+    
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+    
+    print(f"📁 Using database: {db_path}")
+    
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        # Check if table exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='coworking_images'
+        """)
+        
+        if not cursor.fetchone():
+            print("❌ coworking_images table does not exist yet.")
+            conn.close()
+            return False
+        
+        cursor.execute("PRAGMA table_info(coworking_images)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if "thumbnail_status" in columns:
+            print("✅ coworking_images.thumbnail_status already exists")
+        else:
+            print("🔄 Adding thumbnail_status to coworking_images...")
+            cursor.execute("""
+                ALTER TABLE coworking_images 
+                ADD COLUMN thumbnail_status VARCHAR NOT NULL DEFAULT 'ready'
+            """)
+            
+            # Images uploaded without thumbnails are generated at the next coworking server start
+            cursor.execute("""
+                UPDATE coworking_images 
+                SET thumbnail_status = 'pending' 
+                WHERE (thumbnail_url IS NULL OR thumbnail_url = '') AND image_url LIKE '/uploads/coworking_images/%'
+            """)
+            print(f"   🕒 {cursor.rowcount} images without thumbnails marked pending")
+        
+        if "thumbnail_error" in columns:
+            print("✅ coworking_images.thumbnail_error already exists")
+        else:
+            print("🔄 Adding thumbnail_error to coworking_images...")
+            cursor.execute("""
+                ALTER TABLE coworking_images 
+                ADD COLUMN thumbnail_error VARCHAR
+            """)
+        
+        # Commit changes
+        conn.commit()
+        print("✅ Successfully added thumbnail status columns!")
+        
+        conn.close()
+        return True
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting coworking_images thumbnail status migration...")
+    success = migrate_database()
+    
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Restart your coworking server (pending images are picked up at startup)")
+        print("   2. Poll GET /coworking/spaces/images/{image_id}/status after an upload")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
@@ -0,0 +1,126 @@
+"""
+Database migration script to create the dashboard_counters table
+Run this script from the backend directory; it fills the counters from existing data
+"""
+import sqlite3
+import os
+import sys
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TABLE_NAME = "dashboard_counters"
+
+def seed_counters(db_path: str) -> dict:
+    """Compute every counter from the source tables of the database at db_path"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    import shared.models
+    from app.utils.counters import reconcile
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = Session(bind=engine)
+    try:
+        summary = reconcile(db)
+        db.commit()
+        return summary
+    finally:
+        db.close()
+        engine.dispose()
+
+def migrate_database():
+    """Create dashboard_counters with its (scope, scope_id, name, period) index"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if table already exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (TABLE_NAME,))
+
+        if cursor.fetchone():
+            print(f"✅ Table already exists: {TABLE_NAME}")
+        else:
+            print(f"🔄 Creating {TABLE_NAME} table...")
+            cursor.execute(f"""
+                CREATE TABLE {TABLE_NAME} (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    scope VARCHAR NOT NULL,
+                    scope_id INTEGER NOT NULL,
+                    name VARCHAR NOT NULL,
+                    period VARCHAR NOT NULL,
+                    value FLOAT NOT NULL,
+                    updated_at DATETIME NOT NULL
+                )
+            """)
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_id ON {TABLE_NAME} (id)")
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE_NAME}_scope_name_period
+            ON {TABLE_NAME} (scope, scope_id, name, period)
+        """)
+
+        # Commit changes
+        conn.commit()
+        print(f"✅ {TABLE_NAME} is ready!")
+
+        # Dashboards read these counters directly, so an empty table would show zeros
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}")
+        if cursor.fetchone()[0] == 0:
+            print(f"🔄 Filling {TABLE_NAME} from existing data...")
+            summary = seed_counters(db_path)
+            print(f"✅ Seeded {summary['counters']} counters")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_list({TABLE_NAME})")
+        print(f"\n📋 Indexes on {TABLE_NAME}:")
+        for index in cursor.fetchall():
+            print(f"   - {index[1]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting dashboard_counters migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Schedule scripts/reconcile_dashboard_counters.py nightly (e.g. cron: 30 3 * * * cd backend && python scripts/reconcile_dashboard_counters.py)")
+        print("   2. Restart the employer, employee, coworking and admin servers")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
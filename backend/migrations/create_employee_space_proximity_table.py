@@ -0,0 +1,97 @@
+"""
+Database migration script to create the employee_space_proximity table
+Run this script, then scripts/rebuild_space_proximity.py to fill it for existing employees
+"""
+import sqlite3
+import os
+
+TABLE_NAME = "employee_space_proximity"
+
+def migrate_database():
+    """Create employee_space_proximity with its rank and space indexes"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if table already exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (TABLE_NAME,))
+
+        if cursor.fetchone():
+            print(f"✅ Table already exists: {TABLE_NAME}")
+        else:
+            print(f"🔄 Creating {TABLE_NAME} table...")
+            cursor.execute(f"""
+                CREATE TABLE {TABLE_NAME} (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    employee_id INTEGER NOT NULL REFERENCES employees (id),
+                    space_id INTEGER NOT NULL REFERENCES coworkingspacelistings (id),
+                    distance_km FLOAT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    updated_at DATETIME NOT NULL
+                )
+            """)
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_id ON {TABLE_NAME} (id)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_space_id ON {TABLE_NAME} (space_id)")
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE_NAME}_employee_rank
+            ON {TABLE_NAME} (employee_id, rank)
+        """)
+
+        # Commit changes
+        conn.commit()
+        print(f"✅ {TABLE_NAME} is ready!")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_list({TABLE_NAME})")
+        print(f"\n📋 Indexes on {TABLE_NAME}:")
+        for index in cursor.fetchall():
+            print(f"   - {index[1]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting employee_space_proximity migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Run scripts/rebuild_space_proximity.py to fill the table")
+        print("   2. Restart the employer, coworking and admin servers")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
@@ -0,0 +1,128 @@
+"""
+Database migration script for content-addressed coworking image storage
+Creates the image_blobs table and adds coworking_images.blob_id
+Run this script, then scripts/backfill_image_blobs.py to move existing images onto blobs
+"""
+import sqlite3
+import os
+
+TABLE_NAME = "image_blobs"
+
+def migrate_database():
+    """Create image_blobs (unique sha256) and add the indexed blob_id column to coworking_images"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if coworking_images exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name='coworking_images'
+        """)
+
+        if not cursor.fetchone():
+            print("❌ coworking_images table does not exist yet.")
+            conn.close()
+            return False
+
+        # Check if table already exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (TABLE_NAME,))
+
+        if cursor.fetchone():
+            print(f"✅ Table already exists: {TABLE_NAME}")
+        else:
+            print(f"🔄 Creating {TABLE_NAME} table...")
+            cursor.execute(f"""
+                CREATE TABLE {TABLE_NAME} (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    sha256 VARCHAR NOT NULL,
+                    filename VARCHAR NOT NULL,
+                    content_type VARCHAR NOT NULL,
+                    size INTEGER NOT NULL,
+                    ref_count INTEGER NOT NULL,
+                    thumbnail_url VARCHAR,
+                    thumbnail_small_url VARCHAR,
+                    thumbnail_medium_url VARCHAR,
+                    thumbnail_status VARCHAR NOT NULL,
+                    thumbnail_error VARCHAR,
+                    created_at DATETIME
+                )
+            """)
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_id ON {TABLE_NAME} (id)")
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE_NAME}_sha256 ON {TABLE_NAME} (sha256)")
+
+        cursor.execute("PRAGMA table_info(coworking_images)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if "blob_id" in columns:
+            print("✅ coworking_images.blob_id already exists")
+        else:
+            print("🔄 Adding blob_id to coworking_images...")
+            cursor.execute(f"""
+                ALTER TABLE coworking_images
+                ADD COLUMN blob_id INTEGER REFERENCES {TABLE_NAME} (id)
+            """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_coworking_images_blob_id
+            ON coworking_images (blob_id)
+        """)
+
+        # Commit changes
+        conn.commit()
+        print(f"✅ {TABLE_NAME} is ready!")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_list({TABLE_NAME})")
+        print(f"\n📋 Indexes on {TABLE_NAME}:")
+        for index in cursor.fetchall():
+            print(f"   - {index[1]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting image_blobs migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Run scripts/backfill_image_blobs.py to move existing images onto shared blobs")
+        print("   2. Restart your coworking server")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
@@ -0,0 +1,98 @@
+"""
+Database migration script to create the revenue_rollups table
+Run this script, then scripts/rebuild_revenue_rollups.py to fill it from existing bookings
+"""
+import sqlite3
+import os
+
+TABLE_NAME = "revenue_rollups"
+
+def migrate_database():
+    """Create revenue_rollups with its (space_id, granularity, period_start, package_id) index"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if table already exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (TABLE_NAME,))
+
+        if cursor.fetchone():
+            print(f"✅ Table already exists: {TABLE_NAME}")
+        else:
+            print(f"🔄 Creating {TABLE_NAME} table...")
+            cursor.execute(f"""
+                CREATE TABLE {TABLE_NAME} (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    space_id INTEGER NOT NULL REFERENCES coworkingspacelistings (id),
+                    package_id VARCHAR NOT NULL,
+                    granularity VARCHAR NOT NULL,
+                    period_start DATE NOT NULL,
+                    revenue FLOAT NOT NULL,
+                    bookings INTEGER NOT NULL,
+                    updated_at DATETIME NOT NULL
+                )
+            """)
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_id ON {TABLE_NAME} (id)")
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE_NAME}_space_granularity_period
+            ON {TABLE_NAME} (space_id, granularity, period_start, package_id)
+        """)
+
+        # Commit changes
+        conn.commit()
+        print(f"✅ {TABLE_NAME} is ready!")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_list({TABLE_NAME})")
+        print(f"\n📋 Indexes on {TABLE_NAME}:")
+        for index in cursor.fetchall():
+            print(f"   - {index[1]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting revenue_rollups migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Run scripts/rebuild_revenue_rollups.py to fill the rollups")
+        print("   2. Restart the employer, employee and coworking servers")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
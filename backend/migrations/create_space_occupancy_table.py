@@ -0,0 +1,103 @@
+"""
+Database migration script to create the space_occupancy seat ledger and add package_id to coworking_bookings
+Run this script, then scripts/rebuild_space_occupancy.py to fill the ledger for existing bookings
+"""
+import sqlite3
+import os
+
+TABLE_NAME = "space_occupancy"
+
+def migrate_database():
+    """Create space_occupancy with its (space, package, day) index and add coworking_bookings.package_id"""
+
+    # Find the database file
+    db_path = None
+    possible_paths = [
+        "secondhire.db",
+        "second_hire.db",
+        "coworking.db",
+        "database.db",
+        "app.db"
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            db_path = path
+            break
+
+    if not db_path:
+        print("❌ Database file not found. Please specify the correct path.")
+        return False
+
+    print(f"📁 Using database: {db_path}")
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check if table already exists
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (TABLE_NAME,))
+
+        if cursor.fetchone():
+            print(f"✅ Table already exists: {TABLE_NAME}")
+        else:
+            print(f"🔄 Creating {TABLE_NAME} table...")
+            cursor.execute(f"""
+                CREATE TABLE {TABLE_NAME} (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    space_id INTEGER NOT NULL REFERENCES coworkingspacelistings (id),
+                    package_id VARCHAR NOT NULL,
+                    day DATE NOT NULL,
+                    booked_seats INTEGER NOT NULL
+                )
+            """)
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_id ON {TABLE_NAME} (id)")
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE_NAME}_space_package_day
+            ON {TABLE_NAME} (space_id, package_id, day)
+        """)
+
+        # Bookings remember which package holds their seats
+        cursor.execute("PRAGMA table_info(coworking_bookings)")
+        if "package_id" in [column[1] for column in cursor.fetchall()]:
+            print("✅ coworking_bookings.package_id already exists")
+        else:
+            print("🔄 Adding package_id to coworking_bookings...")
+            cursor.execute("ALTER TABLE coworking_bookings ADD COLUMN package_id VARCHAR")
+
+        # Commit changes
+        conn.commit()
+        print(f"✅ {TABLE_NAME} is ready!")
+
+        # Verify the changes
+        cursor.execute(f"PRAGMA index_list({TABLE_NAME})")
+        print(f"\n📋 Indexes on {TABLE_NAME}:")
+        for index in cursor.fetchall():
+            print(f"   - {index[1]}")
+
+        conn.close()
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting space_occupancy migration...")
+    success = migrate_database()
+
+    if success:
+        print("\n✅ Migration completed successfully!")
+        print("📝 Next steps:")
+        print("   1. Run scripts/rebuild_space_occupancy.py to fill the ledger")
+        print("   2. Restart the employer server")
+    else:
+        print("\n❌ Migration failed. Please check the errors above.")
@@ -0,0 +1,154 @@
+"""
+Script to move coworking images stored before deduplication onto shared image blobs
+Run after the create_image_blobs_table migration, from the backend directory,
+with the coworking server stopped.
+
+Every image without a blob is hashed; images with the same content share one
+blob, which keeps the first image's file (under its original name) and
+thumbnails. The other copies and their thumbnails are deleted and their rows
+point at the kept file. Blobs whose thumbnails were never generated are left
+pending, so the coworking server generates them once at its next start.
+Finally every blob's ref_count is recounted from coworking_images.
+
+    python scripts/backfill_image_blobs.py
+    python scripts/backfill_image_blobs.py --dry-run
+"""
+import argparse
+import hashlib
+import os
+import sys
+from collections import Counter
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared.models
+from coworking_module.utils.image_store import apply_blob_thumbnails, blob_url, stored_filename
+from coworking_module.utils.image_upload import SNIFF_BYTES, sniff_image_type
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+from coworking_module.utils.thumbnail_jobs import THUMBNAIL_PENDING, THUMBNAIL_READY
+from shared.database import SessionLocal
+from shared.models.coworking_images import CoworkingImage
+from shared.models.image_blob import ImageBlob
+
+UPLOAD_DIR = "uploads/coworking_images"
+
+
+def hash_file(path: str):
+    """(sha256, sniffed content type) of a stored file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        header = f.read(SNIFF_BYTES)
+        digest.update(header)
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), sniff_image_type(header)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move legacy coworking images onto shared image blobs")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    if not os.path.isdir(UPLOAD_DIR):
+        print(f"❌ {UPLOAD_DIR} not found. Run this from the backend directory.")
+        sys.exit(1)
+
+    db = SessionLocal()
+    duplicate_files = []
+    try:
+        images = db.query(CoworkingImage).filter(CoworkingImage.blob_id.is_(None)).order_by(CoworkingImage.id).all()
+        print(f"🔍 {len(images)} images without a blob")
+
+        linked = skipped = 0
+        for image in images:
+            filename = stored_filename(image.image_url)
+            if filename is None:
+                skipped += 1
+                continue
+            path = os.path.join(UPLOAD_DIR, filename)
+            if not os.path.exists(path):
+                print(f"⚠️ Image {image.id}: file not found: {path}")
+                skipped += 1
+                continue
+            sha256, content_type = hash_file(path)
+            if content_type is None:
+                print(f"⚠️ Image {image.id}: not a JPEG, PNG or WebP file: {path}")
+                skipped += 1
+                continue
+
+            blob = db.query(ImageBlob).filter(ImageBlob.sha256 == sha256).first()
+            if blob is None:
+                # The first copy of this content becomes the stored file, thumbnails included
+                has_thumbnails = image.thumbnail_status == THUMBNAIL_READY and image.thumbnail_url
+                blob = ImageBlob(
+                    sha256=sha256,
+                    filename=filename,
+                    content_type=content_type,
+                    size=os.path.getsize(path),
+                    ref_count=0,
+                    thumbnail_url=image.thumbnail_url if has_thumbnails else None,
+                    thumbnail_small_url=image.thumbnail_small_url if has_thumbnails else None,
+                    thumbnail_medium_url=image.thumbnail_medium_url if has_thumbnails else None,
+                    thumbnail_status=image.thumbnail_status if has_thumbnails else THUMBNAIL_PENDING,
+                    thumbnail_error=image.thumbnail_error if has_thumbnails else None
+                )
+                db.add(blob)
+                db.flush()
+            elif blob.filename != filename:
+                duplicate_files.append(filename)
+                print(f"♻️ Image {image.id}: same content as {blob.filename}")
+
+            image.image_url = blob_url(blob)
+            image.blob_id = blob.id
+            image.content_sha256 = sha256
+            apply_blob_thumbnails(image, blob)
+            blob.ref_count += 1
+            linked += 1
+        db.flush()
+
+        # Recount references, which also repairs drift from deletes that bypassed release_references
+        counts = Counter(blob_id for (blob_id,) in db.query(CoworkingImage.blob_id).filter(CoworkingImage.blob_id.isnot(None)))
+        recounted = 0
+        unreferenced = []
+        for blob in db.query(ImageBlob).all():
+            if blob.ref_count != counts.get(blob.id, 0):
+                recounted += 1
+                blob.ref_count = counts.get(blob.id, 0)
+            if blob.ref_count == 0:
+                unreferenced.append(blob.filename)
+                db.delete(blob)
+
+        print(f"\n📊 Summary:")
+        print(f"   🔗 Linked to blobs: {linked} images")
+        print(f"   ♻️ Duplicate files to delete: {len(duplicate_files)}")
+        print(f"   ⏭️ Skipped: {skipped} images (external URL, missing or unrecognised file)")
+        print(f"   🔢 Recounted: {recounted} blobs, {len(unreferenced)} without references")
+
+        if args.dry_run:
+            db.rollback()
+            print("\n🧪 Dry run: nothing was written")
+            return
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    # Only after the rows point at the kept files
+    thumbnail_generator = ThumbnailGenerator(UPLOAD_DIR)
+    for filename in duplicate_files + unreferenced:
+        path = os.path.join(UPLOAD_DIR, filename)
+        if os.path.exists(path):
+            os.remove(path)
+        thumbnail_generator.delete_thumbnails(ThumbnailGenerator.get_base_filename_from_path(filename))
+    print(f"🗑️ Deleted {len(duplicate_files) + len(unreferenced)} files and their thumbnails")
+    print("\n✅ Backfill completed!")
+    print("📝 Next steps:")
+    print("   1. Restart your coworking server; it generates the thumbnails of pending blobs")
+
+
+if __name__ == "__main__":
+    main()
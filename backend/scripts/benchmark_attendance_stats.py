@@ -0,0 +1,160 @@
+"""
+Benchmark for /employer/employees/attendance-stats
+Seeds a throwaway SQLite database with one employer, N employees and D days of
+attendance each, then times the per-employee query loop the endpoint used to run
+against the current grouped-aggregate handler.
+
+    python scripts/benchmark_attendance_stats.py
+    python scripts/benchmark_attendance_stats.py --employees 200 --days 90 --window 30
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a scratch database before anything opens the real one
+BENCHMARK_DB = os.path.join(tempfile.mkdtemp(prefix="attendance_bench_"), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCHMARK_DB}"
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "benchmark")
+
+from shared.database import Base, SessionLocal, engine
+import shared.models
+from shared.models.attendance import Attendance, AttendanceStatus
+from shared.models.employee import Employee
+from shared.models.employer import Employer
+from shared.models.employer_employee import EmployerEmployee
+from employer_module.routes.employer import get_employees_attendance_stats
+
+
+def seed(employee_count: int, day_count: int):
+    """Insert one employer, its employees and a row per employee per day with Core bulk inserts"""
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    today = date.today()
+    statuses = [AttendanceStatus.ATTENDED, AttendanceStatus.PARTIAL, AttendanceStatus.ABSENT]
+
+    with engine.begin() as conn:
+        employer_id = conn.execute(Employer.__table__.insert().values(
+            first_name="Bench", last_name="Mark", email="bench@example.com", password_hash="x",
+            address="1 Main St", city="Lahore", country="Pakistan", state="Punjab",
+            latitude=31.5204, longitude=74.3587, timezone="Asia/Karachi", phone_number="N/A",
+            company_name="Benchmark Co", created_at=now, updated_at=now
+        )).inserted_primary_key[0]
+
+        conn.execute(Employee.__table__.insert(), [
+            {
+                "first_name": f"Employee{i}", "last_name": "Bench", "email": f"employee{i}@example.com",
+                "password_hash": "x", "address": "1 Main St", "city": "Lahore", "zip_code": "54000",
+                "country": "Pakistan", "latitude": 31.5204, "longitude": 74.3587,
+                "timezone": "Asia/Karachi", "phone_number": "N/A", "profile_picture_url": "",
+                "created_at": now, "updated_at": now, "status": "active", "invite_token_used": ""
+            }
+            for i in range(employee_count)
+        ])
+        employee_ids = [row[0] for row in conn.execute(Employee.__table__.select().with_only_columns(Employee.id))]
+
+        conn.execute(EmployerEmployee.__table__.insert(), [
+            {"employer_id": employer_id, "employee_id": employee_id, "assigned_at": now,
+             "status": "active", "role_title": "Engineer"}
+            for employee_id in employee_ids
+        ])
+
+        rng = random.Random(42)
+        for offset in range(day_count):
+            day = today - timedelta(days=offset)
+            conn.execute(Attendance.__table__.insert(), [
+                {"employee_id": employee_id, "employer_id": employer_id, "date": day,
+                 "total_hours": 0.0, "status": rng.choice(statuses).name}
+                for employee_id in employee_ids
+            ])
+
+    return employer_id
+
+
+def legacy_attendance_stats(db, employer_id: int, days: int):
+    """The previous implementation: one Attendance query per employee, counted in Python"""
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days)
+    employees = db.query(Employee).join(EmployerEmployee).filter(
+        EmployerEmployee.employer_id == employer_id
+    ).all()
+
+    employee_stats = []
+    for employee in employees:
+        records = db.query(Attendance).filter(
+            Attendance.employee_id == employee.id,
+            Attendance.date >= start_date,
+            Attendance.date <= end_date
+        ).all()
+        present_days = sum(1 for record in records if record.status == AttendanceStatus.ATTENDED)
+        absent_days = sum(1 for record in records if record.status == AttendanceStatus.ABSENT)
+        partial_days = sum(1 for record in records if record.status == AttendanceStatus.PARTIAL)
+        total_records = len(records)
+        attendance_rate = round((present_days + partial_days * 0.5) / total_records * 100, 1) if total_records else 0
+        employee_stats.append({
+            "employee_id": employee.id,
+            "employee_name": f"{employee.first_name} {employee.last_name}",
+            "first_name": employee.first_name,
+            "last_name": employee.last_name,
+            "present_days": present_days,
+            "absent_days": absent_days,
+            "partial_days": partial_days,
+            "total_records": total_records,
+            "attendance_rate": attendance_rate
+        })
+    return employee_stats
+
+
+def timed(fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark employer attendance statistics")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="Days of attendance seeded per employee")
+    parser.add_argument("--window", type=int, default=30, help="days query parameter of the endpoint")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"🌱 Seeding {args.employees} employees x {args.days} days into {BENCHMARK_DB}...")
+    started = time.perf_counter()
+    employer_id = seed(args.employees, args.days)
+    print(f"   done in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        employer = db.get(Employer, employer_id)
+        current = {"role": "employer", "user": employer}
+
+        legacy_time, legacy = timed(lambda: legacy_attendance_stats(db, employer_id, args.window), args.repeat)
+        grouped_time, grouped = timed(
+            lambda: get_employees_attendance_stats(days=args.window, db=db, current=current)["employees"], args.repeat
+        )
+    finally:
+        db.close()
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(BENCHMARK_DB), ignore_errors=True)
+
+    print(f"\n📊 Best of {args.repeat}, window of {args.window} days:")
+    print(f"   per-employee queries: {legacy_time * 1000:9.1f} ms")
+    print(f"   grouped aggregate:    {grouped_time * 1000:9.1f} ms  ({legacy_time / grouped_time:.1f}x faster)")
+    print(f"   results match: {'✅' if legacy == grouped else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark for ThumbnailGenerator
+Generates the small/medium/large thumbnails of a corpus of large JPEGs with the
+direct path (three LANCZOS fits on the full-resolution original) and with the
+cascade path (draft decode, one fit to large, medium and small derived from it).
+Each mode runs in a fresh process so its peak RSS is measured on its own; the
+timings include the WebP / AVIF copies, whose sizes are reported against the JPEGs.
+Without --images a synthetic corpus of 12 and 24 megapixel photos is generated.
+
+    python scripts/benchmark_thumbnails.py
+    python scripts/benchmark_thumbnails.py --images ~/Pictures/samples --repeat 3
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageStat
+
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+
+MODES = (("direct", False), ("cascade", True))
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    # VmHWM starts over at exec; ru_maxrss would carry the parent's peak into a spawned child
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_corpus(directory: str, sizes: list, per_size: int) -> list:
+    """Write photo-like JPEGs (smooth gradients plus sensor-style noise) of the given sizes"""
+    paths = []
+    for width, height in sizes:
+        for i in range(per_size):
+            gradient = Image.linear_gradient("L").resize((width, height))
+            channels = [
+                gradient,
+                gradient.rotate(90 + 45 * i, expand=False).resize((width, height)),
+                Image.radial_gradient("L").resize((width, height)),
+            ]
+            noise = Image.effect_noise((width, height), 25 + 5 * i)
+            image = Image.merge("RGB", [Image.blend(channel, noise, 0.3) for channel in channels])
+            path = os.path.join(directory, f"sample_{width}x{height}_{i}.jpg")
+            image.save(path, "JPEG", quality=92)
+            paths.append(path)
+    return paths
+
+
+def run_mode(cascade: bool, paths: list, output_dir: str, repeat: int, results):
+    """Child process: time every image with one mode and report wall time and peak RSS"""
+    baseline = peak_rss_mb()
+    generator = ThumbnailGenerator(output_dir, cascade=cascade)
+    timings = []
+    for path in paths:
+        base_filename = os.path.splitext(os.path.basename(path))[0]
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            generator.generate_thumbnails(path, base_filename)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+    results.put({"timings": timings, "baseline_mb": baseline, "peak_mb": peak_rss_mb()})
+
+
+def mean_difference(first: str, second: str) -> float:
+    """Mean absolute per-channel difference between two images (0-255)"""
+    with Image.open(first) as a, Image.open(second) as b:
+        return sum(ImageStat.Stat(ImageChops.difference(a.convert("RGB"), b.convert("RGB"))).mean) / 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark direct vs cascade thumbnail generation")
+    parser.add_argument("--images", help="Directory of JPEGs to use; default generates a synthetic corpus")
+    parser.add_argument("--sizes", default="4000x3000,6000x4000", help="Synthetic image sizes, WxH comma separated")
+    parser.add_argument("--per-size", type=int, default=3, help="Synthetic images per size")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image; the best is kept")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="thumbnail_bench_")
+    try:
+        if args.images:
+            paths = sorted(
+                os.path.join(args.images, name) for name in os.listdir(args.images)
+                if name.lower().endswith((".jpg", ".jpeg"))
+            )
+            if not paths:
+                print(f"❌ No JPEG files in {args.images}")
+                sys.exit(1)
+        else:
+            sizes = [tuple(int(part) for part in size.split("x")) for size in args.sizes.split(",")]
+            print(f"🌱 Generating {len(sizes) * args.per_size} synthetic JPEGs in {workdir}...")
+            # In a child process too, so this process never holds a full-size image
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                paths = pool.apply(make_corpus, (workdir, sizes, args.per_size))
+
+        pixels = 0
+        for path in paths:
+            with Image.open(path) as image:
+                pixels += image.size[0] * image.size[1]
+        print(f"🖼️ {len(paths)} images, {pixels / len(paths) / 1e6:.1f} MP on average")
+
+        # spawn: each mode starts from a clean interpreter, so peak RSS is its own
+        context = multiprocessing.get_context("spawn")
+        reports = {}
+        for name, cascade in MODES:
+            results = context.Queue()
+            process = context.Process(
+                target=run_mode, args=(cascade, paths, os.path.join(workdir, name), args.repeat, results)
+            )
+            process.start()
+            reports[name] = results.get()
+            process.join()
+
+        # Bytes of every size of every image, per format, as written by the cascade run
+        format_bytes = {}
+        for path in glob.glob(os.path.join(workdir, "cascade", "thumbnails", "*", "*")):
+            extension = os.path.splitext(path)[1].lstrip(".")
+            format_bytes[extension] = format_bytes.get(extension, 0) + os.path.getsize(path)
+        
+        differences = [
+            mean_difference(
+                os.path.join(workdir, "direct", "thumbnails", size, os.path.splitext(os.path.basename(path))[0] + ".jpg"),
+                os.path.join(workdir, "cascade", "thumbnails", size, os.path.splitext(os.path.basename(path))[0] + ".jpg")
+            )
+            for path in paths for size in ("small", "medium", "large")
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    direct, cascade = reports["direct"], reports["cascade"]
+    direct_total, cascade_total = sum(direct["timings"]), sum(cascade["timings"])
+    print(f"\n📊 Best of {args.repeat} per image:")
+    print(f"   {'mode':<8} {'total':>10} {'per image':>10} {'peak RSS':>10} {'over baseline':>14}")
+    for name, report in (("direct", direct), ("cascade", cascade)):
+        total = sum(report["timings"])
+        print(f"   {name:<8} {total * 1000:8.0f} ms {total / len(paths) * 1000:7.0f} ms "
+              f"{report['peak_mb']:7.0f} MB {report['peak_mb'] - report['baseline_mb']:11.0f} MB")
+    print(f"   cascade is {direct_total / cascade_total:.1f}x faster")
+    print(f"   mean pixel difference vs direct: {sum(differences) / len(differences):.2f} / 255 "
+          f"(worst {max(differences):.2f})")
+    print(f"\n📦 Thumbnail bytes per image (small + medium + large):")
+    for extension, total in sorted(format_bytes.items(), key=lambda item: -item[1]):
+        print(f"   {extension:<5} {total / len(paths) / 1024:8.1f} KB  {total / format_bytes['jpg'] * 100:5.1f}% of JPEG")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Script to geocode employees and employers with missing or placeholder coordinates
+Run from the backend directory; rerun with the same --checkpoint to resume an interrupted run
+
+    python scripts/bulk_geocode.py
+    python scripts/bulk_geocode.py --employer-id 12 --rate 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.utils.bulk_geocode import TARGETS, pending_query, run_bulk_geocode
+from shared.database import SessionLocal
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill employee/employer coordinates")
+    parser.add_argument("--target", choices=TARGETS, action="append",
+                        help="Only geocode this table (repeatable); default is both")
+    parser.add_argument("--employer-id", type=int, help="Limit to one employer and its employees")
+    parser.add_argument("--batch-size", type=int, default=settings.GEOCODE_BULK_BATCH_SIZE)
+    parser.add_argument("--rate", type=float, default=settings.GEOCODE_BULK_RATE_PER_SECOND,
+                        help="Maximum Maps requests per second")
+    parser.add_argument("--concurrency", type=int, default=settings.GEOCODE_BULK_CONCURRENCY)
+    parser.add_argument("--checkpoint", default="bulk_geocode.checkpoint.json",
+                        help="Progress file; removed after a complete run")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows that need geocoding")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    targets = args.target or list(TARGETS)
+    db = SessionLocal()
+
+    try:
+        if args.dry_run:
+            for target in targets:
+                print(f"📋 {target}: {pending_query(db, target, args.employer_id).count()} rows need geocoding")
+            return
+
+        print(f"🚀 Geocoding {', '.join(targets)} at up to {args.rate:g} requests/second...")
+        started = time.time()
+        summary = asyncio.run(run_bulk_geocode(
+            db,
+            targets=targets,
+            employer_id=args.employer_id,
+            batch_size=args.batch_size,
+            rate_per_second=args.rate,
+            concurrency=args.concurrency,
+            checkpoint_path=args.checkpoint
+        ))
+
+        print(f"\n📊 Summary ({time.time() - started:.1f}s):")
+        for target, stats in summary.items():
+            print(f"   {target}: ✅ {stats['geocoded']} geocoded, ❌ {stats['failed']} failed, "
+                  f"🔍 {stats['lookups']} unique addresses")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Query-plan check for the hot filter queries
+Runs EXPLAIN QUERY PLAN for each known hot query and exits non-zero if SQLite
+would answer any of them with a full table scan. By default the schema is
+built fresh from the models (checks the index declarations); pass --database
+to check the tables and indexes of an existing database file (checks that
+migrations were applied). Only the schema is copied, so the verdict does not
+depend on how many rows a development database happens to hold.
+
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --database second_hire.db
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, select, tuple_
+from sqlalchemy.exc import OperationalError
+
+from shared.database import Base
+import shared.models
+from shared.models.attendance import Attendance
+from shared.models.booking import CoworkingBooking
+from shared.models.booking_day import BookingDay
+from shared.models.coworking_images import CoworkingImage
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.employee_space_proximity import EmployeeSpaceProximity
+from shared.models.notification import Notification
+from shared.models.revenue_rollup import RevenueRollup
+from shared.models.space_occupancy import SpaceOccupancy
+from shared.models.task import Task, TaskPriority, TaskStatus
+from shared.models.task_assignment import TaskAssignment
+
+
+def hot_queries():
+    """(name, statement) for every query that must be answered from an index"""
+    today = date.today()
+    now = datetime.utcnow()
+    return [
+        ("upcoming bookings for an employee", select(CoworkingBooking).where(
+            CoworkingBooking.employee_id == 1, CoworkingBooking.start_date >= today
+        ).order_by(CoworkingBooking.start_date)),
+        ("bookings for an employer by start date", select(CoworkingBooking).where(
+            CoworkingBooking.employer_id == 1, CoworkingBooking.start_date >= today - timedelta(days=30)
+        )),
+        ("recent bookings for a space", select(CoworkingBooking).where(
+            CoworkingBooking.coworking_space_id == 1, CoworkingBooking.created_at >= now - timedelta(days=30)
+        ).order_by(CoworkingBooking.created_at.desc())),
+        ("booking conflicts for employees", select(BookingDay.employee_id, BookingDay.day, BookingDay.booking_id).where(
+            BookingDay.employee_id.in_([1, 2]), BookingDay.day.between(today, today + timedelta(days=30))
+        )),
+        ("booking conflicts for an employer's own bookings", select(BookingDay.employer_id, BookingDay.day, BookingDay.booking_id).where(
+            BookingDay.employer_id.in_([1]), BookingDay.employee_id.is_(None),
+            BookingDay.day.between(today, today + timedelta(days=30))
+        )),
+        ("seat ledger for nearby spaces", select(
+            SpaceOccupancy.space_id, SpaceOccupancy.package_id, SpaceOccupancy.day, SpaceOccupancy.booked_seats
+        ).where(
+            SpaceOccupancy.space_id.in_([1, 2]), SpaceOccupancy.day.between(today, today + timedelta(days=30))
+        )),
+        ("revenue chart for an owner's spaces", select(
+            RevenueRollup.period_start, func.sum(RevenueRollup.revenue), func.sum(RevenueRollup.bookings)
+        ).where(
+            RevenueRollup.space_id.in_([1, 2]), RevenueRollup.granularity == "month",
+            RevenueRollup.period_start.between(today - timedelta(days=730), today)
+        ).group_by(RevenueRollup.period_start)),
+        ("attendance history for an employee", select(Attendance).where(
+            Attendance.employee_id == 1, Attendance.date.between(today - timedelta(days=30), today)
+        )),
+        ("attendance stats for an employer", select(
+            Attendance.employee_id, Attendance.status, func.count(Attendance.id)
+        ).where(
+            Attendance.employer_id == 1, Attendance.date.between(today - timedelta(days=30), today)
+        ).group_by(Attendance.employee_id, Attendance.status)),
+        ("notification feed for an employer", select(Notification).where(
+            Notification.employer_id == 1
+        ).order_by(Notification.created_at.desc())),
+        ("unread notification count", select(func.count(Notification.id)).where(
+            Notification.employer_id == 1, Notification.is_read == False
+        )),
+        ("images for space packages", select(CoworkingImage).where(
+            CoworkingImage.space_id.in_([1, 2]),
+            tuple_(CoworkingImage.space_id, CoworkingImage.package_id).in_([(1, "1"), (2, "basic")])
+        )),
+        ("task assignments for an employee", select(TaskAssignment).where(
+            TaskAssignment.employee_id == 1, TaskAssignment.assigned_at >= now - timedelta(days=30)
+        )),
+        ("task board filtered by status and priority", select(Task).where(
+            Task.employer_id == 1, Task.status == TaskStatus.PENDING, Task.priority == TaskPriority.HIGH
+        ).order_by(Task.due_date)),
+        ("verified spaces in a bounding box", select(
+            CoworkingSpaceListing.id, CoworkingSpaceListing.latitude, CoworkingSpaceListing.longitude
+        ).where(
+            CoworkingSpaceListing.is_verified == True,
+            CoworkingSpaceListing.latitude.between(31.4, 31.6),
+            CoworkingSpaceListing.longitude.between(74.2, 74.4)
+        )),
+        ("nearest spaces for an employee", select(
+            EmployeeSpaceProximity.space_id, EmployeeSpaceProximity.distance_km
+        ).where(EmployeeSpaceProximity.employee_id == 1).order_by(EmployeeSpaceProximity.rank)),
+    ]
+
+
+def explain(engine, statement) -> list:
+    """EXPLAIN QUERY PLAN detail lines for a statement, with its parameters bound as usual"""
+    def prefix_explain(conn, cursor, sql, parameters, context, executemany):
+        return f"EXPLAIN QUERY PLAN {sql}", parameters
+
+    event.listen(engine, "before_cursor_execute", prefix_explain, retval=True)
+    try:
+        with engine.connect() as conn:
+            # Read the raw cursor: the statement's column types do not apply to plan rows
+            return [row[3] for row in conn.execute(statement).cursor.fetchall()]
+    finally:
+        event.remove(engine, "before_cursor_execute", prefix_explain)
+
+
+def full_scans(plan: list) -> list:
+    """Plan lines that walk a whole table (with or without an index)"""
+    tables = set(Base.metadata.tables)
+    return [
+        line for line in plan
+        if line.startswith("SCAN ") and line.split()[1] in tables
+    ]
+
+
+def copy_schema(path: str, engine):
+    """Recreate the tables and indexes of a database file (no rows, no statistics) in engine"""
+    source = sqlite3.connect(path)
+    try:
+        statements = [
+            row[0] for row in source.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND type IN ('table', 'index') "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY type = 'index'"
+            )
+        ]
+    finally:
+        source.close()
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a full table scan")
+    parser.add_argument("--database", help="SQLite file to check; default builds the schema from the models in memory")
+    args = parser.parse_args()
+
+    if args.database:
+        if not os.path.exists(args.database):
+            print(f"❌ Database file not found: {args.database}")
+            sys.exit(1)
+        engine = create_engine("sqlite://")
+        copy_schema(args.database, engine)
+        print(f"📁 Checking the schema of {args.database}")
+    else:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        print("📁 Checking a fresh schema built from the models")
+
+    failures = 0
+    for name, statement in hot_queries():
+        try:
+            plan = explain(engine, statement)
+        except OperationalError as e:
+            failures += 1
+            print(f"❌ {name}: {e.orig}")
+            continue
+        scans = full_scans(plan)
+        if scans:
+            failures += 1
+            print(f"❌ {name}")
+        else:
+            print(f"✅ {name}")
+        for line in plan:
+            print(f"      {line}")
+
+    if failures:
+        print(f"\n❌ {failures} hot quer{'y' if failures == 1 else 'ies'} fall back to a full scan")
+        sys.exit(1)
+    print("\n✅ Every hot query is served by an index")
+
+
+if __name__ == "__main__":
+    main()
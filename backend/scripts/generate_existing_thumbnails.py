@@ -65,6 +65,11 @@ def generate_thumbnails_for_existing_images():
         # Initialize thumbnail generator
         thumbnail_generator = ThumbnailGenerator()
         
+        # Images sharing a stored file (image blob) get its thumbnails generated once
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='image_blobs'")
+        has_blobs = cursor.fetchone() is not None
+        generated = {}
+        
         success_count = 0
         error_count = 0
         
@@ -87,14 +92,18 @@ def generate_thumbnails_for_existing_images():
                 filename = os.path.basename(image_url)
                 base_filename = os.path.splitext(filename)[0]
                 
-                thumbnail_urls = thumbnail_generator.generate_thumbnails(file_path, base_filename)
+                if base_filename not in generated:
+                    generated[base_filename] = thumbnail_generator.generate_thumbnails(file_path, base_filename)
+                thumbnail_urls = generated[base_filename]
                 
                 # Update database with thumbnail URLs
                 cursor.execute("""
                     UPDATE coworking_images 
                     SET thumbnail_url = ?, 
                         thumbnail_small_url = ?, 
-                        thumbnail_medium_url = ?
+                        thumbnail_medium_url = ?,
+                        thumbnail_status = 'ready',
+                        thumbnail_error = NULL
                     WHERE id = ?
                 """, (
                     thumbnail_urls.get('large'),
@@ -102,6 +111,21 @@ def generate_thumbnails_for_existing_images():
                     thumbnail_urls.get('medium'),
                     image_id
                 ))
+                if has_blobs:
+                    cursor.execute("""
+                        UPDATE image_blobs 
+                        SET thumbnail_url = ?, 
+                            thumbnail_small_url = ?, 
+                            thumbnail_medium_url = ?,
+                            thumbnail_status = 'ready',
+                            thumbnail_error = NULL
+                        WHERE filename = ?
+                    """, (
+                        thumbnail_urls.get('large'),
+                        thumbnail_urls.get('small'),
+                        thumbnail_urls.get('medium'),
+                        filename
+                    ))
                 
                 print(f"✅ Generated thumbnails for {image_name}")
                 success_count += 1
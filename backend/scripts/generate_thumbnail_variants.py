@@ -0,0 +1,63 @@
+"""
+Script to add WebP (and AVIF, when Pillow supports it) copies to existing coworking thumbnails
+Thumbnails generated before the format variants only have JPEGs; the thumbnail route
+serves those until this has run. Run from the backend directory.
+
+    python scripts/generate_thumbnail_variants.py
+"""
+import glob
+import os
+import sys
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+
+UPLOAD_DIR = "uploads/coworking_images"
+SIZES = ("small", "medium", "large")
+
+
+def main():
+    generator = ThumbnailGenerator(UPLOAD_DIR)
+    variants = generator.available_variants()
+    print(f"🚀 Adding {', '.join(variant[1] for variant in variants)} thumbnails...")
+
+    base_filenames = sorted(
+        ThumbnailGenerator.get_base_filename_from_path(path)
+        for path in glob.glob(os.path.join(generator.thumbnails_dir, "large", "*.jpg"))
+    )
+    done = skipped = errors = 0
+    for base_filename in base_filenames:
+        missing = [
+            size for size in SIZES
+            for extension, _, _, _ in variants
+            if not os.path.exists(os.path.join(generator.thumbnails_dir, size, f"{base_filename}.{extension}"))
+        ]
+        if not missing:
+            skipped += 1
+            continue
+        try:
+            originals = glob.glob(os.path.join(UPLOAD_DIR, f"{base_filename}.*"))
+            if originals:
+                # From the original, so the copies are as sharp as new uploads' ones
+                generator.generate_thumbnails(originals[0], base_filename)
+            else:
+                for size in SIZES:
+                    with Image.open(os.path.join(generator.thumbnails_dir, size, f"{base_filename}.jpg")) as thumb:
+                        generator._save_variants(thumb.convert("RGB"), size, base_filename)
+            done += 1
+        except Exception as e:
+            print(f"❌ Error processing {base_filename}: {str(e)}")
+            errors += 1
+
+    print(f"\n📊 Summary:")
+    print(f"   ✅ Added variants: {done} images")
+    print(f"   ⏭️ Already complete: {skipped} images")
+    print(f"   ❌ Errors: {errors} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Script to rebuild the booking_days table from scratch
+Run after the create_booking_days_table migration, and once after upgrading so open-ended bookings lose their day rows
+"""
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.booking_conflicts import rebuild
+import shared.models
+from shared.database import SessionLocal
+
+
+def main():
+    print("🚀 Rebuilding booking_days from coworking_bookings...")
+    started = time.time()
+    db = SessionLocal()
+    try:
+        days = rebuild(db)
+        db.commit()
+        print(f"✅ Wrote {days} booked days in {time.time() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
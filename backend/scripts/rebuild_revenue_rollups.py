@@ -0,0 +1,34 @@
+"""
+Script to rebuild the revenue_rollups table of day, week and month revenue from the bookings
+Run after the create_revenue_rollups_table migration, or after bulk edits to bookings that bypassed the ORM
+"""
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.revenue import rebuild
+import shared.models
+from shared.database import SessionLocal
+
+
+def main():
+    print("🚀 Rebuilding revenue_rollups from coworking_bookings...")
+    started = time.time()
+    db = SessionLocal()
+    try:
+        rows = rebuild(db)
+        db.commit()
+        print(f"✅ Wrote {rows} rollup rows in {time.time() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
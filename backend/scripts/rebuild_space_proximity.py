@@ -0,0 +1,33 @@
+"""
+Script to rebuild the employee_space_proximity table from scratch
+Run after the create_employee_space_proximity_table migration, or after changing PROXIMITY_TOP_K
+"""
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.proximity import TOP_K, rebuild
+from shared.database import SessionLocal
+
+
+def main():
+    print(f"🚀 Rebuilding employee_space_proximity (top {TOP_K} spaces per employee)...")
+    started = time.time()
+    db = SessionLocal()
+    try:
+        employees = rebuild(db)
+        db.commit()
+        print(f"✅ Rebuilt proximity rows for {employees} employees in {time.time() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Nightly reconciliation of the dashboard counters
+Recomputes every counter from the source tables, repairs drift left by bulk
+updates or failed writes and drops periods that can no longer be read.
+Schedule it once a day, e.g. with cron:
+
+    30 3 * * * cd /path/to/backend && python scripts/reconcile_dashboard_counters.py
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.counters import reconcile
+import shared.models
+from shared.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute dashboard counters and repair drift")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+
+    print("🚀 Reconciling dashboard counters...")
+    started = time.time()
+    db = SessionLocal()
+    try:
+        summary = reconcile(db)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        print(f"📊 {summary['counters']} counters: 🔧 {summary['fixed']} wrong, ➕ {summary['missing']} missing, "
+              f"🗑️ {summary['removed']} stale ({time.time() - started:.1f}s)")
+        if args.dry_run:
+            print("ℹ️ Dry run, nothing was written")
+        else:
+            print("✅ Dashboard counters reconciled")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Reconciliation failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
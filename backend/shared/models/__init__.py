@@ -19,7 +19,13 @@ try:
     from . import task_assignment
     from . import task_comment
     from . import notification
+    from . import image_blob
     from . import coworking_images
+    from . import employee_space_proximity
+    from . import booking_day
+    from . import space_occupancy
+    from . import dashboard_counter
+    from . import revenue_rollup
 except ImportError:
     # Models don't exist yet
     pass
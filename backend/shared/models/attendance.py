@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Date, Time, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Date, Time, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from shared.database import Base
 import enum
@@ -10,6 +10,12 @@ class AttendanceStatus(enum.Enum):
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        # Employer dashboards aggregate a date window per employee
+        Index("ix_attendances_employer_date_employee", "employer_id", "date", "employee_id"),
+        # Attendance history of one employee
+        Index("ix_attendances_employee_date", "employee_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -1,15 +1,22 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from shared.database import Base
 
 class CoworkingBooking(Base):
     __tablename__ = "coworking_bookings"
+    __table_args__ = (
+        # Upcoming bookings per employee / employer, recent bookings per space
+        Index("ix_coworking_bookings_employee_start", "employee_id", "start_date"),
+        Index("ix_coworking_bookings_employer_start", "employer_id", "start_date"),
+        Index("ix_coworking_bookings_space_created", "coworking_space_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     employer_id = Column(Integer, ForeignKey("employers.id"))
     employee_id = Column(Integer, ForeignKey("employees.id"))
     coworking_space_id = Column(Integer, ForeignKey("coworkingspacelistings.id"))
+    package_id = Column(String, nullable=True)  # id of the booked package in the space's packages JSON
 
     booking_type = Column(String)  # daily, weekly, monthly
     subscription_mode = Column(String, nullable=True)  # full_time, half_day, one_day_per_month, etc.
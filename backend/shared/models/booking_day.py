@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
+from shared.database import Base
+
+
+class BookingDay(Base):
+    """One row per calendar day a coworking booking actually occupies (its days_of_week only)"""
+    __tablename__ = "booking_days"
+    __table_args__ = (
+        # Conflict checks seek straight to an employee's (or an employer's own) days in a range
+        Index("ix_booking_days_employee_day", "employee_id", "day"),
+        Index("ix_booking_days_employer_employee_day", "employer_id", "employee_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    booking_id = Column(Integer, ForeignKey("coworking_bookings.id"), nullable=False, index=True)
+    employer_id = Column(Integer, ForeignKey("employers.id"))
+    employee_id = Column(Integer, ForeignKey("employees.id"))  # None for employer self-bookings
+    day = Column(Date, nullable=False)
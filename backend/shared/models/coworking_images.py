@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from shared.database import Base
 from datetime import datetime
 
 class CoworkingImage(Base):
     __tablename__ = "coworking_images"
+    __table_args__ = (
+        # Images of a space, or of one package within it
+        Index("ix_coworking_images_space_package", "space_id", "package_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     space_id = Column(Integer, ForeignKey("coworkingspacelistings.id"), nullable=False)
@@ -12,11 +16,15 @@ class CoworkingImage(Base):
     image_url = Column(String, nullable=False)
     image_name = Column(String, nullable=True)
     image_description = Column(String, nullable=True)
+    content_sha256 = Column(String, nullable=True, index=True)  # Hash of the uploaded file, computed while streaming
+    blob_id = Column(Integer, ForeignKey("image_blobs.id"), nullable=True, index=True)  # Shared file; NULL for images stored before deduplication
     is_primary = Column(Integer, default=0)  # 1 for primary image, 0 for others
     # Thumbnail fields
     thumbnail_url = Column(String, nullable=True)  # URL to the thumbnail image
     thumbnail_small_url = Column(String, nullable=True)  # URL to small thumbnail (e.g., 150x150)
     thumbnail_medium_url = Column(String, nullable=True)  # URL to medium thumbnail (e.g., 300x300)
+    thumbnail_status = Column(String, nullable=False, default="ready")  # pending while the worker pool generates thumbnails, then ready or failed
+    thumbnail_error = Column(String, nullable=True)  # Why thumbnail generation failed
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship - temporarily disabled until properly configured
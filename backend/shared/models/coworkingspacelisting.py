@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Date, Time, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, Date, Time, Enum, ForeignKey, Index
 from shared.database import Base
 from sqlalchemy.orm import relationship
 
 
 class CoworkingSpaceListing(Base):
     __tablename__ = "coworkingspacelistings"
+    __table_args__ = (
+        # Radius searches filter verified spaces by a lat/lon bounding box
+        Index("ix_coworkingspacelistings_verified_lat_lon", "is_verified", "latitude", "longitude"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from datetime import datetime
+from shared.database import Base
+
+
+class DashboardCounter(Base):
+    """Pre-aggregated dashboard count (or sum) per tenant, kept current on write"""
+    __tablename__ = "dashboard_counters"
+    __table_args__ = (
+        # A dashboard reads every counter of one tenant with a single index range
+        Index("ix_dashboard_counters_scope_name_period", "scope", "scope_id", "name", "period", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)  # employer, coworking_user or global
+    scope_id = Column(Integer, nullable=False)  # tenant id; 0 for global
+    name = Column(String, nullable=False)
+    period = Column(String, nullable=False, default="")  # "" or a YYYY-MM / YYYY-MM-DD bucket
+    value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from shared.database import Base
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Space changes look for the employees inside a lat/lon bounding box
+        Index("ix_employees_lat_lon", "latitude", "longitude"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(255), nullable=False)
@@ -17,6 +21,7 @@ class Employee(Base):
     country = Column(String(255), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    geocoded_address = Column(Text, nullable=True)  # Address key the coordinates were geocoded from
     timezone = Column(String(255), nullable=False)
     phone_number = Column(String(255), nullable=False)
     profile_picture_url = Column(String(255), nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from datetime import datetime
+from shared.database import Base
+
+
+class EmployeeSpaceProximity(Base):
+    """Materialized top-K nearest verified coworking spaces per employee"""
+    __tablename__ = "employee_space_proximity"
+    __table_args__ = (
+        # Per-employee reads come back in rank order straight from the index
+        Index("ix_employee_space_proximity_employee_rank", "employee_id", "rank", unique=True),
+        # The largest stored distance bounds the employees a space change is checked against
+        Index("ix_employee_space_proximity_distance", "distance_km"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    space_id = Column(Integer, ForeignKey("coworkingspacelistings.id"), nullable=False, index=True)
+    distance_km = Column(Float, nullable=False)
+    rank = Column(Integer, nullable=False)  # 1 = nearest
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from shared.database import Base
@@ -19,6 +19,7 @@ class Employer(Base):
     state = Column(String(255), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    geocoded_address = Column(Text, nullable=True)  # Address key the coordinates were geocoded from
     timezone = Column(String(255), nullable=False)
     phone_number = Column(String(255), nullable=False)
     profile_picture_url = Column(String(255), nullable=True)
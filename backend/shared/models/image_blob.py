@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from shared.database import Base
+
+
+class ImageBlob(Base):
+    """One stored image file, shared by every coworking image with the same content"""
+    __tablename__ = "image_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String, nullable=False, unique=True, index=True)  # Content hash of the file
+    filename = Column(String, nullable=False)  # Name under uploads/coworking_images: <sha256>.<ext>, or the original name of a backfilled image
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # coworking_images rows pointing here
+    # Thumbnails are generated once per blob and copied onto its images
+    thumbnail_url = Column(String, nullable=True)
+    thumbnail_small_url = Column(String, nullable=True)
+    thumbnail_medium_url = Column(String, nullable=True)
+    thumbnail_status = Column(String, nullable=False, default="pending")
+    thumbnail_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
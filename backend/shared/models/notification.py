@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from shared.database import Base
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Notification feed and unread counts per employer
+        Index("ix_notifications_employer_read_created", "employer_id", "is_read", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employer_id = Column(Integer, ForeignKey("employers.id"), nullable=False)
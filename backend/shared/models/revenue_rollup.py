@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from datetime import datetime
+from shared.database import Base
+
+
+class RevenueRollup(Base):
+    """Booking revenue per coworking space, package and day / week / month, kept current on write"""
+    __tablename__ = "revenue_rollups"
+    __table_args__ = (
+        # Chart reads seek each space's periods of one granularity in date order
+        Index("ix_revenue_rollups_space_granularity_period", "space_id", "granularity", "period_start", "package_id",
+              unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    space_id = Column(Integer, ForeignKey("coworkingspacelistings.id"), nullable=False)
+    package_id = Column(String, nullable=False, default="")  # "" for bookings made without a package
+    granularity = Column(String, nullable=False)  # day, week (starting Monday) or month
+    period_start = Column(Date, nullable=False)
+    revenue = Column(Float, nullable=False, default=0)
+    bookings = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
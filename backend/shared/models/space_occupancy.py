@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
+from shared.database import Base
+
+
+class SpaceOccupancy(Base):
+    """Seats booked per coworking space, package and day"""
+    __tablename__ = "space_occupancy"
+    __table_args__ = (
+        # One ledger row per (space, package, day); range reads per space come straight from it
+        Index("ix_space_occupancy_space_package_day", "space_id", "package_id", "day", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    space_id = Column(Integer, ForeignKey("coworkingspacelistings.id"), nullable=False)
+    package_id = Column(String, nullable=False, default="")  # "" for bookings made without a package
+    day = Column(Date, nullable=False)
+    booked_seats = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from shared.database import Base
@@ -6,6 +6,10 @@ from shared.database import Base
 
 class TaskAssignment(Base):
     __tablename__ = "task_assignments"
+    __table_args__ = (
+        # Assignments of one employee over a date range
+        Index("ix_task_assignments_employee_assigned", "employee_id", "assigned_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assigned_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+# Settings and the engine are read at import, so point them at a scratch database first
+_DB_DIR = tempfile.mkdtemp(prefix="remoty-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(_DB_DIR, "geocode_cache.db")
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "test-key")
+# Apply proximity updates inside the commit so tests read them straight away
+os.environ["PROXIMITY_BACKGROUND_UPDATES"] = "false"
+
+import pytest
+
+import shared.models
+from app.utils.listeners import register_listeners
+from shared.database import Base, SessionLocal, engine
+
+register_listeners()
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again afterwards"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def memory_db():
+    """(session, statements) on a fresh in-memory database; statements collects every SQL statement run"""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    memory_engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=memory_engine)
+    session = sessionmaker(bind=memory_engine, autocommit=False, autoflush=False)()
+    statements = []
+    event.listen(memory_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    try:
+        yield session, statements
+    finally:
+        session.close()
+        memory_engine.dispose()
+
+
+@pytest.fixture
+def employer_api(memory_db, monkeypatch):
+    """
+    (client, session, statements, headers): the employer routes on the in-memory
+    database, with a fresh spatial index and the bearer header of a signed-in employer.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import employer_module.routes.employer as employer_routes
+    from app.auth import create_access_token
+    from app.utils.spatial_index import SpatialIndex
+    from shared.database import get_db
+    from tests.factories import make_employer
+
+    session, statements = memory_db
+    monkeypatch.setattr(employer_routes, "verified_space_index", SpatialIndex(resync_interval=3600))
+
+    app = FastAPI()
+    app.include_router(employer_routes.router)
+    app.dependency_overrides[get_db] = lambda: session
+
+    employer = make_employer(session, "employer@example.com")
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(employer.id), 'role': 'employer'})}"}
+    with TestClient(app) as client:
+        yield client, session, statements, headers
@@ -0,0 +1,92 @@
+"""Rows for tests, with only the columns a test cares about to fill in"""
+import json
+from datetime import date, datetime
+
+from shared.models.booking import CoworkingBooking
+from shared.models.coworking_user import CoworkingUser
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.employee import Employee
+from shared.models.employer import Employer
+from shared.models.employer_employee import EmployerEmployee
+from shared.models.task import Task, TaskStatus
+from shared.models.task_assignment import TaskAssignment
+
+
+def make_employer(db, email: str, **fields) -> Employer:
+    values = dict(
+        first_name="Ada", last_name="Lovelace", email=email, password_hash="x",
+        address="1 Main St", city="London", country="UK", state="London",
+        latitude=51.5, longitude=-0.12, timezone="Europe/London",
+        phone_number="+440000000", company_name="Analytical Engines"
+    )
+    values.update(fields)
+    employer = Employer(**values)
+    db.add(employer)
+    db.commit()
+    return employer
+
+
+def make_employee(db, email: str, latitude: float, longitude: float, **fields) -> Employee:
+    values = dict(
+        first_name="Grace", last_name="Hopper", email=email, password_hash="x",
+        address="1 Main St", city="London", zip_code="N1", country="UK",
+        latitude=latitude, longitude=longitude, timezone="Europe/London",
+        phone_number="+440000000", profile_picture_url="", invite_token_used="token"
+    )
+    values.update(fields)
+    employee = Employee(**values)
+    db.add(employee)
+    db.commit()
+    return employee
+
+
+def hire(db, employer: Employer, employee: Employee) -> EmployerEmployee:
+    link = EmployerEmployee(employer_id=employer.id, employee_id=employee.id, role_title="Engineer")
+    db.add(link)
+    db.commit()
+    return link
+
+
+def assign_task(db, employer: Employer, employee: Employee, status: TaskStatus, assigned_at: datetime,
+                due_date: datetime = None, completed_at: datetime = None, **fields) -> TaskAssignment:
+    task = Task(title="Task", status=status, due_date=due_date, employer_id=employer.id, created_by_id=employer.id, **fields)
+    db.add(task)
+    db.flush()
+    assignment = TaskAssignment(
+        task_id=task.id, employee_id=employee.id, employer_id=employer.id, assigned_by_id=employer.id,
+        assigned_at=assigned_at, completed_at=completed_at
+    )
+    db.add(assignment)
+    db.commit()
+    return assignment
+
+
+def make_coworking_user(db, email: str, **fields) -> CoworkingUser:
+    values = dict(first_name="Alan", last_name="Turing", email=email, phone="+440000000", password_hash="x")
+    values.update(fields)
+    user = CoworkingUser(**values)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def make_space(db, capacity: int = None, **fields) -> CoworkingSpaceListing:
+    package = {"id": "desk", "name": "Hot desk"}
+    if capacity is not None:
+        package["capacity"] = capacity
+    values = dict(title="Hub", latitude=51.5, longitude=-0.12, is_verified=True, packages=json.dumps([package]))
+    values.update(fields)
+    space = CoworkingSpaceListing(**values)
+    db.add(space)
+    db.commit()
+    return space
+
+
+def book(db, employer: Employer, space: CoworkingSpaceListing, start_date: date, end_date: date, **fields) -> CoworkingBooking:
+    booking = CoworkingBooking(
+        employer_id=employer.id, coworking_space_id=space.id, package_id="desk",
+        booking_type="daily", start_date=start_date, end_date=end_date, **fields
+    )
+    db.add(booking)
+    db.commit()
+    return booking
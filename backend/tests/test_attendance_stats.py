@@ -0,0 +1,68 @@
+"""The grouped attendance-stats aggregate returns what the per-employee loop it replaced returned"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from employer_module.routes.employer import get_employees_attendance_stats
+from shared.models.attendance import Attendance, AttendanceStatus
+from shared.models.employee import Employee
+from shared.models.employer_employee import EmployerEmployee
+from tests.factories import hire, make_employee, make_employer
+
+
+def reference_stats(db, employer_id, days):
+    """The per-employee loop, filtered to the employer as the aggregate now is"""
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days)
+    stats = {}
+    employees = db.query(Employee).join(EmployerEmployee).filter(EmployerEmployee.employer_id == employer_id)
+    for employee in employees:
+        records = db.query(Attendance).filter(
+            Attendance.employee_id == employee.id,
+            Attendance.employer_id == employer_id,
+            Attendance.date >= start_date,
+            Attendance.date <= end_date
+        ).all()
+        present = sum(1 for record in records if record.status == AttendanceStatus.ATTENDED)
+        absent = sum(1 for record in records if record.status == AttendanceStatus.ABSENT)
+        partial = sum(1 for record in records if record.status == AttendanceStatus.PARTIAL)
+        stats[employee.id] = {
+            "employee_id": employee.id,
+            "employee_name": f"{employee.first_name} {employee.last_name}",
+            "first_name": employee.first_name,
+            "last_name": employee.last_name,
+            "present_days": present,
+            "absent_days": absent,
+            "partial_days": partial,
+            "total_records": len(records),
+            "attendance_rate": round((present + partial * 0.5) / len(records) * 100, 1) if records else 0
+        }
+    return stats
+
+
+@pytest.fixture
+def team(db):
+    employer = make_employer(db, "boss@example.com")
+    other = make_employer(db, "other@example.com")
+    regular, part_time, new = (make_employee(db, f"{name}@example.com", 51.5, -0.12) for name in ("regular", "part", "new"))
+    for employee in (regular, part_time, new):
+        hire(db, employer, employee)
+
+    today = datetime.now().date()
+    statuses = [AttendanceStatus.ATTENDED, AttendanceStatus.PARTIAL, AttendanceStatus.ABSENT]
+    for offset in range(60):
+        day = today - timedelta(days=offset)
+        regular_status = AttendanceStatus.ABSENT if offset % 3 == 2 else AttendanceStatus.ATTENDED
+        db.add(Attendance(employee_id=regular.id, employer_id=employer.id, date=day, status=regular_status))
+        if offset % 2:
+            db.add(Attendance(employee_id=part_time.id, employer_id=employer.id, date=day, status=statuses[offset % 3]))
+    # Days logged for another employer are not this employer's attendance
+    db.add(Attendance(employee_id=regular.id, employer_id=other.id, date=today, status=AttendanceStatus.ATTENDED))
+    db.commit()
+    return employer
+
+
+@pytest.mark.parametrize("days", [0, 7, 30, 90])
+def test_attendance_stats_match_the_per_employee_loop(db, team, days):
+    payload = get_employees_attendance_stats(days=days, db=db, current={"role": "employer", "user": team})
+    assert {row["employee_id"]: row for row in payload["employees"]} == reference_stats(db, team.id, days)
@@ -0,0 +1,42 @@
+from datetime import date
+
+from app.utils.booking_conflicts import booking_dates, check_proposals, find_conflicts
+from shared.models.booking_day import BookingDay
+from tests.factories import book, make_employer, make_space
+
+
+def test_booking_days_follow_days_of_week(db):
+    employer = make_employer(db, "first@example.com")
+    booking = book(db, employer, make_space(db), date(2030, 1, 7), date(2030, 1, 13), days_of_week="Mon,Wed")
+
+    days = [day for (day,) in db.query(BookingDay.day).filter(BookingDay.booking_id == booking.id).order_by(BookingDay.day)]
+    assert days == [date(2030, 1, 7), date(2030, 1, 9)]
+    assert days == list(booking_dates(booking.start_date, booking.end_date, booking.days_of_week))
+
+
+def test_deleting_employer_drops_booking_days_of_cascaded_bookings(db):
+    employer = make_employer(db, "first@example.com")
+    book(db, employer, make_space(db), date(2030, 1, 7), date(2030, 1, 11))
+    assert db.query(BookingDay).count() == 5
+
+    db.delete(employer)
+    db.commit()
+    assert db.query(BookingDay).count() == 0
+
+
+def test_open_ended_booking_conflicts_beyond_the_horizon(db):
+    employer = make_employer(db, "first@example.com")
+    ongoing = book(db, employer, make_space(db), date(2030, 1, 7), None, days_of_week="Mon")
+    assert db.query(BookingDay).count() == 0
+
+    # Three years on, the open-ended Monday booking still holds
+    assert find_conflicts(db, employer.id, None, date(2033, 1, 3), date(2033, 1, 9)) == {ongoing.id: [date(2033, 1, 3)]}
+    assert find_conflicts(db, employer.id, None, date(2033, 1, 4), date(2033, 1, 8)) == {}
+
+
+def test_open_ended_proposal_reaches_the_last_booked_day(db):
+    employer = make_employer(db, "first@example.com")
+    later = book(db, employer, make_space(db), date(2034, 3, 6), date(2034, 3, 6))
+
+    [report] = check_proposals(db, employer.id, [{"employee_id": None, "start_date": date(2030, 1, 7), "end_date": None, "days_of_week": "Mon"}])
+    assert report["conflicts"] == [{"booking_id": later.id, "dates": ["2034-03-06"]}]
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.booking import BulkCoworkingBookingCreate
+from employer_module.routes.employer import book_coworking_space_bulk
+from tests.factories import make_employer, make_space
+
+
+def bulk(db, employer, rows, partial=True):
+    data = BulkCoworkingBookingCreate(bookings=rows, partial=partial)
+    return book_coworking_space_bulk(data=data, db=db, current_user={"role": "employer", "user": employer})
+
+
+def row(space, start_date, end_date, **fields):
+    return {
+        "coworking_space_id": space.id, "package_id": "desk", "booking_type": "one-time",
+        "start_date": start_date, "end_date": end_date, **fields
+    }
+
+
+def test_partial_books_first_of_two_overlapping_rows(db):
+    employer = make_employer(db, "first@example.com")
+    space = make_space(db)
+
+    response = bulk(db, employer, [
+        row(space, date(2030, 1, 7), date(2030, 1, 9)),
+        row(space, date(2030, 1, 8), date(2030, 1, 10)),
+    ])
+
+    assert response["created"] == 1
+    assert [result["status"] for result in response["results"]] == ["booked", "failed"]
+    assert response["results"][1]["errors"] == ["Overlaps rows [0] of this request"]
+
+
+def test_invalid_row_does_not_block_overlapping_row(db):
+    employer = make_employer(db, "first@example.com")
+    space = make_space(db)
+
+    response = bulk(db, employer, [
+        row(space, date(2030, 1, 7), date(2030, 1, 9), coworking_space_id=space.id + 1),
+        row(space, date(2030, 1, 8), date(2030, 1, 10)),
+    ])
+
+    assert [result["status"] for result in response["results"]] == ["failed", "booked"]
+    assert response["results"][0]["errors"] == ["Coworking space not found or not verified"]
+
+
+def test_overlapping_rows_reject_whole_batch_without_partial(db):
+    employer = make_employer(db, "first@example.com")
+    space = make_space(db)
+
+    with pytest.raises(HTTPException) as error:
+        bulk(db, employer, [
+            row(space, date(2030, 1, 7), date(2030, 1, 9)),
+            row(space, date(2030, 1, 9), date(2030, 1, 9)),
+        ], partial=False)
+    assert error.value.status_code == 409
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import app.utils.bulk_geocode as bulk_geocode
+from app.utils.bulk_geocode import address_key, checkpoint_key, pending_query, run_bulk_geocode
+from tests.factories import hire, make_employee, make_employer
+
+
+def geocoded_employee(db, email, **fields):
+    employee = make_employee(db, email, 51.5, -0.12, **fields)
+    employee.geocoded_address = address_key(employee)
+    db.commit()
+    return employee
+
+
+def fake_geocoder(calls):
+    async def geocode(address, client=None):
+        calls.append(address)
+        return 48.85, 2.35
+    return geocode
+
+
+def test_changed_address_is_pending_again(db):
+    employee = geocoded_employee(db, "moved@example.com")
+    geocoded_employee(db, "stayed@example.com")
+    assert pending_query(db, "employees").all() == []
+
+    employee.address = "2 Rue de Rivoli"
+    employee.city = "Paris"
+    db.commit()
+
+    assert [row.id for row in pending_query(db, "employees")] == [employee.id]
+
+
+def test_geocoding_records_the_address(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr(bulk_geocode, "async_geocode_address", fake_geocoder(calls))
+    employee = geocoded_employee(db, "moved@example.com")
+    employee.city = "Paris"
+    db.commit()
+
+    summary = asyncio.run(run_bulk_geocode(db, targets=["employees"]))
+
+    assert summary["employees"]["geocoded"] == 1
+    assert calls == ["1 Main St, Paris, N1, UK"]
+    assert (employee.latitude, employee.geocoded_address) == (48.85, address_key(employee))
+    assert pending_query(db, "employees").count() == 0
+
+
+def test_checkpoint_of_another_employer_is_ignored(db, monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(bulk_geocode, "async_geocode_address", fake_geocoder(calls))
+    employer = make_employer(db, "boss@example.com")
+    employee = make_employee(db, "new@example.com", 0, 0)
+    hire(db, employer, employee)
+
+    # An interrupted run for another employer got past this employee's id
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint_path.write_text(json.dumps({checkpoint_key("employees", employer.id + 1): employee.id}))
+
+    summary = asyncio.run(run_bulk_geocode(
+        db, targets=["employees"], employer_id=employer.id, checkpoint_path=str(checkpoint_path)
+    ))
+
+    assert summary["employees"]["geocoded"] == 1
+    assert employee.latitude == 48.85
@@ -0,0 +1,42 @@
+import importlib.util
+import os
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.utils.counters import read_counters
+from shared.database import Base
+from shared.models.employer import Employer
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations", "create_dashboard_counters_table.py")
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("create_dashboard_counters_table", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_migration_seeds_counters_from_existing_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = create_engine("sqlite:///app.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        # Rows written before the counters existed, so no listener counted them
+        connection.execute(insert(Employer), [
+            dict(first_name="Ada", last_name="Lovelace", email=f"{i}@example.com", password_hash="x",
+                 address="1 Main St", city="London", country="UK", state="London", latitude=51.5,
+                 longitude=-0.12, timezone="Europe/London", phone_number="+440000000",
+                 company_name="Analytical Engines", status="active", number_of_remote_employees=0)
+            for i in range(3)
+        ])
+
+    assert load_migration().migrate_database()
+
+    db = Session(bind=engine)
+    try:
+        assert read_counters(db, "global", 0)["employers"] == 3
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.utils.distance import EARTH_RADIUS_KM, haversine_distance, haversine_many, haversine_matrix
+
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+# (lat1, lon1, lat2, lon2, km)
+CASES = [
+    (51.5, -0.12, 51.5, -0.12, 0.0),  # identical points
+    (0.0, 179.5, 0.0, -179.5, 111.19),  # across the antimeridian
+    (90.0, 0.0, 90.0, 120.0, 0.0),  # the pole, whatever the longitude
+    (90.0, 0.0, -90.0, 0.0, HALF_CIRCUMFERENCE_KM),  # pole to pole
+    (0.0, 0.0, 0.0, 180.0, HALF_CIRCUMFERENCE_KM),  # antipodes on the equator
+    (51.5074, -0.1278, 48.8566, 2.3522, 343.56),  # London to Paris
+]
+
+
+@pytest.mark.parametrize("lat1, lon1, lat2, lon2, km", CASES)
+def test_scalar_distance(lat1, lon1, lat2, lon2, km):
+    distance = haversine_distance(lat1, lon1, lat2, lon2)
+    assert type(distance) is float
+    assert distance == pytest.approx(km, abs=0.01)
+
+
+def test_many_matches_the_scalar_path():
+    lat, lon = 0.0, 179.5
+    lats = [case[2] for case in CASES]
+    lons = [case[3] for case in CASES]
+
+    distances = haversine_many(lat, lon, lats, lons)
+
+    assert distances.shape == (len(CASES),)
+    assert distances == pytest.approx([haversine_distance(lat, lon, a, b) for a, b in zip(lats, lons)], abs=1e-9)
+    assert haversine_many(lat, lon, [], []).shape == (0,)
+
+
+def test_matrix_matches_the_scalar_path():
+    origin_lats = [case[0] for case in CASES]
+    origin_lons = [case[1] for case in CASES]
+    dest_lats = [case[2] for case in CASES]
+    dest_lons = [case[3] for case in CASES]
+
+    matrix = haversine_matrix(origin_lats, origin_lons, dest_lats, dest_lons)
+
+    assert matrix.shape == (len(CASES), len(CASES))
+    expected = [
+        [haversine_distance(a, b, c, d) for c, d in zip(dest_lats, dest_lons)]
+        for a, b in zip(origin_lats, origin_lons)
+    ]
+    assert np.allclose(matrix, expected, atol=1e-9)
+    # Diagonal rows are the cases themselves
+    assert np.diag(matrix) == pytest.approx([case[4] for case in CASES], abs=0.01)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.utils import geocode
+from app.utils.geocode_cache import GeocodeCache
+from app.utils.maps_client import AsyncMapsClient
+from tests.maps_stub import MapsStub
+
+FOUND = {"status": "OK", "results": [{"geometry": {"location": {"lat": 51.5, "lng": -0.12}}}]}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = GeocodeCache(path=str(tmp_path / "geocode_cache.db"))
+    monkeypatch.setattr(geocode, "geocode_cache", cache)
+    return cache
+
+
+class Responder:
+    """Serves one (status code, body) answer until it is changed"""
+
+    def __init__(self, answer):
+        self.answer = answer
+
+    def __call__(self, path, params):
+        return self.answer
+
+
+def async_lookup(stub: MapsStub, address: str):
+    async def run():
+        client = AsyncMapsClient(api_key="test-key", base_url=stub.base_url, retries=2, backoff_base=0)
+        try:
+            return await geocode.async_cached_geocode(address, client)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def sync_lookup(stub: MapsStub, address: str, monkeypatch):
+    monkeypatch.setattr(geocode.settings, "GOOGLE_MAPS_BASE_URL", stub.base_url)
+    return geocode.cached_geocode(address, retries=2, delay=0)
+
+
+@pytest.mark.parametrize("lookup", ["async", "sync"])
+@pytest.mark.parametrize("failure", [
+    (500, {"error_message": "backend error"}),
+    (200, {"status": "OVER_QUERY_LIMIT", "results": []}),
+    (200, {"status": "REQUEST_DENIED", "results": []}),
+])
+def test_failed_lookup_is_not_cached(cache, monkeypatch, lookup, failure):
+    respond = Responder(failure)
+    with MapsStub(respond) as stub:
+        geocode_once = (lambda: async_lookup(stub, "1 Main St, London")) if lookup == "async" \
+            else (lambda: sync_lookup(stub, "1 Main St, London", monkeypatch))
+        assert geocode_once() == (None, None)
+        assert cache.get("1 Main St, London") == (False, None)
+
+        respond.answer = (200, FOUND)
+        assert geocode_once() == (51.5, -0.12)
+
+
+@pytest.mark.parametrize("lookup", ["async", "sync"])
+def test_address_without_results_is_cached(cache, monkeypatch, lookup):
+    with MapsStub(Responder((200, {"status": "ZERO_RESULTS", "results": []}))) as stub:
+        geocode_once = (lambda: async_lookup(stub, "Nowhere")) if lookup == "async" \
+            else (lambda: sync_lookup(stub, "Nowhere", monkeypatch))
+        assert geocode_once() == (None, None)
+        assert geocode_once() == (None, None)
+
+    assert len(stub.requests) == 1
+    assert cache.get("Nowhere") == (True, None)
+
+
+def test_cache_hit_only_records_use_after_touch_interval(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode_cache.db"), touch_interval_seconds=3600)
+    cache.set("1 Main St, London", 51.5, -0.12)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+
+    assert cache.get("1 main st london") == (False, None)
+    assert cache.get("1 Main St, London") == (True, (51.5, -0.12))
+    assert not [statement for statement in statements if statement.startswith("UPDATE")]
+
+    cache._conn.execute("UPDATE geocode_cache SET last_used_at = last_used_at - 7200")
+    statements.clear()
+    cache.get("1 Main St, London")
+    assert [statement for statement in statements if statement.startswith("UPDATE")]
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,69 @@
+import os
+
+from coworking_module.routes.coworking_complete import PackageUpdateData, get_space_details, update_single_package
+from coworking_module.utils.image_store import stored_filename
+from shared.models.coworking_images import CoworkingImage
+from shared.models.image_blob import ImageBlob
+from tests.factories import make_coworking_user, make_space
+
+UPLOAD_DIR = os.path.join("uploads", "coworking_images")
+
+
+def store_image(db, space, filename: str) -> CoworkingImage:
+    """A blob with its file and thumbnail on disk, referenced by one image of the space's package"""
+    os.makedirs(os.path.join(UPLOAD_DIR, "thumbnails", "medium"), exist_ok=True)
+    with open(os.path.join(UPLOAD_DIR, filename), "wb") as f:
+        f.write(b"image")
+    base_filename = os.path.splitext(filename)[0]
+    with open(os.path.join(UPLOAD_DIR, "thumbnails", "medium", f"{base_filename}.jpg"), "wb") as f:
+        f.write(b"thumb")
+
+    thumbnail_url = f"/uploads/coworking_images/thumbnails/medium/{base_filename}.jpg"
+    blob = ImageBlob(
+        sha256=base_filename, filename=filename, content_type="image/jpeg", size=5, ref_count=1,
+        thumbnail_medium_url=thumbnail_url, thumbnail_status="ready"
+    )
+    db.add(blob)
+    db.flush()
+    image = CoworkingImage(
+        space_id=space.id, package_id="desk", image_url=f"/uploads/coworking_images/{filename}",
+        blob_id=blob.id, content_sha256=blob.sha256, is_primary=1,
+        thumbnail_medium_url=thumbnail_url, thumbnail_status="ready"
+    )
+    db.add(image)
+    db.commit()
+    return image
+
+
+def test_stored_filename_ignores_scheme_and_host():
+    assert stored_filename("http://localhost:8001/uploads/coworking_images/abc.jpg") == "abc.jpg"
+    assert stored_filename("/uploads/coworking_images/abc.jpg") == "abc.jpg"
+    assert stored_filename("https://example.com/photo.jpg") is None
+    assert stored_filename(None) is None
+
+
+def test_saving_package_with_absolute_urls_keeps_its_images(db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    user = make_coworking_user(db, "owner@example.com")
+    space = make_space(db, coworking_user_id=user.id)
+    store_image(db, space, "kept.jpg")
+    store_image(db, space, "dropped.jpg")
+    current_user = {"user": user}
+
+    # The edit page sends back the images it was given, absolute URLs and all, minus the one removed
+    details = get_space_details(space_id=space.id, current_user=current_user, db=db)
+    images = [image for image in details["packages"][0]["images"] if image["image_url"].endswith("kept.jpg")]
+    assert images[0]["image_url"].startswith("http://")
+    update_single_package(
+        space_id=space.id, package_id="desk", data=PackageUpdateData(images=images), current_user=current_user, db=db
+    )
+
+    blobs = {blob.filename: blob.ref_count for blob in db.query(ImageBlob)}
+    assert blobs == {"kept.jpg": 1}
+    image = db.query(CoworkingImage).one()
+    assert image.image_url == "/uploads/coworking_images/kept.jpg"
+    assert image.blob_id is not None
+    assert os.path.exists(os.path.join(UPLOAD_DIR, "kept.jpg"))
+    assert os.path.exists(os.path.join(UPLOAD_DIR, "thumbnails", "medium", "kept.jpg"))
+    assert not os.path.exists(os.path.join(UPLOAD_DIR, "dropped.jpg"))
+    assert not os.path.exists(os.path.join(UPLOAD_DIR, "thumbnails", "medium", "dropped.jpg"))
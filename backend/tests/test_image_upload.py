@@ -0,0 +1,47 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import coworking_module.routes.coworking_complete as coworking_routes
+from app.auth import create_access_token
+from shared.database import engine, get_db
+from shared.models.coworking_images import CoworkingImage
+from tests.factories import make_coworking_user, make_space
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def test_upload_keeps_database_work_off_the_event_loop(db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queued = []
+    monkeypatch.setattr(coworking_routes, "enqueue_thumbnails", lambda *args: queued.append(args))
+    owner = make_coworking_user(db, "owner@example.com")
+    space = make_space(db, coworking_user_id=owner.id)
+
+    app = FastAPI()
+    app.include_router(coworking_routes.router, prefix="/coworking")
+    app.dependency_overrides[get_db] = lambda: db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(owner.id), 'role': 'coworking'})}"}
+
+    threads = []
+    record = lambda *args: threads.append(threading.current_thread().name)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with TestClient(app) as client:
+            loop_thread = client.portal.call(lambda: threading.current_thread().name)
+            response = client.post(
+                f"/coworking/spaces/{space.id}/images",
+                files={"file": ("desk.png", PNG, "image/png")},
+                data={"package_id": "desk"},
+                headers=headers
+            )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["is_primary"] == 1
+    assert db.query(CoworkingImage).filter(CoworkingImage.space_id == space.id).count() == 1
+    assert len(queued) == 1
+    assert threads and loop_thread not in threads
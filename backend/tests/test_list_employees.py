@@ -0,0 +1,66 @@
+"""list_employees resolves every employee's next booking at once, with what the per-employee query found"""
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from employer_module.routes.employer import list_employees
+from shared.database import engine
+from shared.models.booking import CoworkingBooking
+from tests.factories import book, hire, make_employee, make_employer, make_space
+
+
+def reference_next_booking(db, employee_id):
+    """The query list_employees used to run once per employee"""
+    return db.query(CoworkingBooking).filter(
+        CoworkingBooking.employee_id == employee_id,
+        CoworkingBooking.start_date >= date.today()
+    ).order_by(CoworkingBooking.start_date.asc(), CoworkingBooking.id.asc()).first()
+
+
+def count_statements(call):
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        return call(), len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_next_bookings_match_the_per_employee_query(db):
+    employer = make_employer(db, "boss@example.com")
+    near, far = make_space(db, title="Near"), make_space(db, title="Far")
+    today = date.today()
+
+    employees = []
+    for index in range(6):
+        employee = make_employee(db, f"employee{index}@example.com", 51.5, -0.12)
+        hire(db, employer, employee)
+        employees.append(employee)
+    # Past bookings, ties on the start date, and employees with nothing upcoming
+    book(db, employer, near, today - timedelta(days=5), today - timedelta(days=1), employee_id=employees[0].id)
+    book(db, employer, far, today + timedelta(days=9), today + timedelta(days=10), employee_id=employees[0].id)
+    book(db, employer, near, today + timedelta(days=3), today + timedelta(days=4), employee_id=employees[0].id)
+    book(db, employer, far, today, today, employee_id=employees[1].id)
+    book(db, employer, near, today, today + timedelta(days=2), employee_id=employees[1].id)
+    book(db, employer, near, today - timedelta(days=30), today - timedelta(days=20), employee_id=employees[2].id)
+    book(db, employer, far, today + timedelta(days=60), today + timedelta(days=61), employee_id=employees[4].id)
+    db.expire_all()
+    db.refresh(employer)
+
+    payload, statements = count_statements(lambda: list_employees(db=db, current={"role": "employer", "user": employer}))
+
+    for row in payload:
+        booking = reference_next_booking(db, row["id"])
+        expected = None if booking is None else {
+            "id": booking.coworking_space_id,
+            "name": booking.coworking_space.title,
+            "address": booking.coworking_space.address,
+            "start_date": booking.start_date.isoformat(),
+            "end_date": booking.end_date.isoformat(),
+            "booking_type": booking.booking_type
+        }
+        assert row["assigned_coworking_space"] == expected
+    assert [row["assigned_coworking_space"] is not None for row in payload] == [True, True, False, False, True, False]
+    # Employees, then their next bookings with spaces
+    assert statements == 2
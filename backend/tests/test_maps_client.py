@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.maps_client import AsyncMapsClient, AsyncRateLimiter, MapsAPIError
+from tests.maps_stub import MapsStub
+
+GEOCODE_OK = {"status": "OK", "results": [{"geometry": {"location": {"lat": 51.5, "lng": -0.12}}}]}
+
+
+def scripted(*answers):
+    """A responder giving each answer in turn, then repeating the last"""
+    answers = list(answers)
+
+    def respond(path, params):
+        return answers.pop(0) if len(answers) > 1 else answers[0]
+    return respond
+
+
+def run(client: AsyncMapsClient, call):
+    async def main():
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def make_client(stub: MapsStub, **options) -> AsyncMapsClient:
+    return AsyncMapsClient(api_key="test-key", base_url=stub.base_url, backoff_base=0, **options)
+
+
+def test_transient_failures_are_retried():
+    with MapsStub(scripted((503, {}), (200, {"status": "OVER_QUERY_LIMIT"}), (200, GEOCODE_OK))) as stub:
+        coords = run(make_client(stub, retries=3), lambda client: client.geocode_lookup("1 Main St"))
+
+    assert coords == (51.5, -0.12)
+    assert len(stub.requests) == 3
+    assert all(params["key"] == "test-key" and params["address"] == "1 Main St" for _, params in stub.requests)
+
+
+def test_retries_give_up_with_the_last_error():
+    with MapsStub(scripted((500, {}))) as stub:
+        with pytest.raises(MapsAPIError, match="HTTP 500"):
+            run(make_client(stub, retries=2), lambda client: client.geocode_lookup("1 Main St"))
+    assert len(stub.requests) == 2
+
+
+def test_final_answers_are_not_retried():
+    with MapsStub(scripted((400, {"error_message": "bad request"}))) as stub:
+        with pytest.raises(MapsAPIError, match="HTTP 400"):
+            run(make_client(stub, retries=3), lambda client: client.geocode_lookup("1 Main St"))
+    with MapsStub(scripted((200, {"status": "ZERO_RESULTS"}))) as empty:
+        assert run(make_client(empty, retries=3), lambda client: client.geocode_lookup("Nowhere")) is None
+
+    assert len(stub.requests) == 1
+    assert len(empty.requests) == 1
+
+
+def test_calls_share_one_pooled_client():
+    async def twice(client):
+        await client.geocode_lookup("1 Main St")
+        first = client._client
+        await client.geocode_lookup("2 Main St")
+        return first, client._client
+
+    with MapsStub(scripted((200, GEOCODE_OK))) as stub:
+        first, second = run(make_client(stub), twice)
+
+    assert first is second
+
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = AsyncRateLimiter(rate_per_second=50)
+
+    async def burst():
+        started = time.monotonic()
+        await asyncio.gather(*[limiter.acquire() for _ in range(6)])
+        return time.monotonic() - started
+
+    # Six calls at 50 per second need at least five 20 ms gaps
+    assert asyncio.run(burst()) >= 0.09
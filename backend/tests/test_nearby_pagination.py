@@ -0,0 +1,42 @@
+"""Nearby-space search pages through every match once, nearest first, with the X-Next-Cursor cursor"""
+import pytest
+
+from app.utils.proximity import TOP_K
+from shared.models.employer import Employer
+from tests.factories import hire, make_employee, make_space
+
+
+def search(client, headers, employee_id, **params):
+    return client.get("/employer/coworking-spaces", params={"employee_id": employee_id, "max_distance_km": 50, **params}, headers=headers)
+
+
+# Fewer spaces than the stored top-K are answered from employee_space_proximity, more from the spatial index
+@pytest.mark.parametrize("count", [11, TOP_K + 7])
+def test_cursor_pages_through_every_space_once(employer_api, count):
+    client, session, statements, headers = employer_api
+    employee = make_employee(session, "employee@example.com", 51.5, -0.12)
+    hire(session, session.query(Employer).one(), employee)
+    for index in range(count):
+        # Pairs of spaces share a location, so pages must break distance ties on id
+        make_space(session, title=f"Hub {index}", latitude=51.5 + (index // 2) * 0.01, longitude=-0.12)
+    make_space(session, title="Too far", latitude=52.5, longitude=-0.12)
+
+    everything = search(client, headers, employee.id).json()
+    assert len(everything) == count
+    assert [space["distance_km"] for space in everything] == sorted(space["distance_km"] for space in everything)
+
+    pages, cursor = [], None
+    while True:
+        response = search(client, headers, employee.id, limit=4, **({"cursor": cursor} if cursor else {}))
+        assert response.status_code == 200
+        pages.append([space["id"] for space in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert all(len(page) == 4 for page in pages[:-1]) and 0 < len(pages[-1]) <= 4
+    assert [space_id for page in pages for space_id in page] == [space["id"] for space in everything]
+
+    nearest = search(client, headers, employee.id, nearest=5).json()
+    assert [space["id"] for space in nearest] == [space["id"] for space in everything[:5]]
+    assert search(client, headers, employee.id, cursor="nowhere").status_code == 400
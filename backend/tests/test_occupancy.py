@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from app.utils.occupancy import CapacityError
+from shared.models.coworkingspacelisting import CoworkingSpaceListing
+from shared.models.space_occupancy import SpaceOccupancy
+from tests.factories import book as make_booking, make_employer, make_space
+
+START = date(2030, 1, 7)
+END = date(2030, 1, 11)
+
+
+def book(db, employer, space):
+    return make_booking(db, employer, space, START, END)
+
+
+def booked_seats(db, space: CoworkingSpaceListing) -> dict:
+    return {
+        row.day: row.booked_seats
+        for row in db.query(SpaceOccupancy).filter(SpaceOccupancy.space_id == space.id)
+    }
+
+
+def test_full_package_rejects_booking(db):
+    space = make_space(db, capacity=1)
+    book(db, make_employer(db, "first@example.com"), space)
+
+    with pytest.raises(CapacityError):
+        book(db, make_employer(db, "second@example.com"), space)
+    db.rollback()
+    assert set(booked_seats(db, space).values()) == {1}
+
+
+def test_deleting_employer_frees_seats_of_cascaded_bookings(db):
+    space = make_space(db, capacity=1)
+    employer = make_employer(db, "first@example.com")
+    book(db, employer, space)
+
+    db.delete(employer)
+    db.commit()
+    assert booked_seats(db, space) == {}
+
+    booking = book(db, make_employer(db, "second@example.com"), space)
+    assert booking.id is not None
+    assert set(booked_seats(db, space).values()) == {1}
+
+
+def test_moving_booking_moves_its_seats(db):
+    space = make_space(db, capacity=1)
+    booking = book(db, make_employer(db, "first@example.com"), space)
+
+    booking.start_date = date(2030, 2, 4)
+    booking.end_date = date(2030, 2, 4)
+    db.commit()
+    assert booked_seats(db, space) == {date(2030, 2, 4): 1}
+
+    book(db, make_employer(db, "second@example.com"), space)
+    assert booked_seats(db, space)[START] == 1
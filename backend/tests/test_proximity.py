@@ -0,0 +1,75 @@
+from app.utils import proximity
+from app.utils.proximity import TOP_K
+from shared.models.employee_space_proximity import EmployeeSpaceProximity
+from tests.factories import make_employee, make_space
+
+
+def stored_lists(db) -> dict:
+    lists = {}
+    for row in db.query(EmployeeSpaceProximity).order_by(EmployeeSpaceProximity.employee_id, EmployeeSpaceProximity.rank):
+        lists.setdefault(row.employee_id, []).append(row.space_id)
+    return lists
+
+
+def test_space_change_only_looks_at_employees_around_it(db, monkeypatch):
+    near = make_employee(db, "near@example.com", 51.5, -0.12)
+    sydney = make_employee(db, "sydney@example.com", -33.9, 151.2)
+    for i in range(TOP_K + 1):
+        make_space(db, latitude=51.51 + i * 0.01, longitude=-0.12)
+        make_space(db, latitude=-33.91 - i * 0.01, longitude=151.2)
+
+    measured = []
+    haversine_many = proximity.haversine_many
+
+    def measuring(lat, lon, lats, lons):
+        measured.extend(lats)
+        return haversine_many(lat, lon, lats, lons)
+
+    # Every K-th distance is a few dozen km, so the Sydney employee is outside the box and never measured
+    space = make_space(db, latitude=51.501, longitude=-0.12)
+    monkeypatch.setattr(proximity, "haversine_many", measuring)
+    assert proximity.employees_affected_by_space(db, space.id, (space.latitude, space.longitude)) == {near.id}
+    assert measured == [51.5]
+    monkeypatch.undo()
+
+    # The listener kept the lists current as the spaces were added
+    incremental = stored_lists(db)
+    proximity.rebuild(db)
+    db.commit()
+    assert incremental == stored_lists(db)
+    assert incremental[near.id][0] == space.id
+    assert len(incremental[sydney.id]) == TOP_K
+
+
+def test_every_employee_takes_a_space_while_lists_are_not_full(db):
+    london = make_employee(db, "london@example.com", 51.5, -0.12)
+    sydney = make_employee(db, "sydney@example.com", -33.9, 151.2)
+    make_space(db, latitude=51.51, longitude=-0.12)
+
+    space = make_space(db, latitude=-33.91, longitude=151.2)
+    assert proximity.employees_affected_by_space(db, space.id, (space.latitude, space.longitude)) == {london.id, sydney.id}
+    assert stored_lists(db) == {london.id: [1, space.id], sydney.id: [space.id, 1]}
+
+
+def test_background_update_runs_after_the_commit(db, monkeypatch):
+    monkeypatch.setattr(proximity.settings, "PROXIMITY_BACKGROUND_UPDATES", True)
+    employee = make_employee(db, "london@example.com", 51.5, -0.12)
+    proximity.wait_for_updates(timeout=5)
+    started = proximity.threading.Event()
+    release = proximity.threading.Event()
+    apply_changes = proximity.apply_changes
+
+    def held(*args):
+        started.set()
+        release.wait(5)
+        return apply_changes(*args)
+
+    monkeypatch.setattr(proximity, "apply_changes", held)
+    space = make_space(db, latitude=51.51, longitude=-0.12)
+
+    # The commit returned while the update thread is still held
+    assert started.wait(5)
+    assert stored_lists(db) == {}
+    release.set()
+    proximity.wait_for_updates(timeout=5)
+    assert stored_lists(db) == {employee.id: [space.id]}
@@ -0,0 +1,42 @@
+"""The nearby-space endpoint issues a fixed number of queries, however many spaces match"""
+import json
+
+import employer_module.routes.employer as employer_routes
+from app.utils.proximity import TOP_K
+from app.utils.spatial_index import SpatialIndex
+from shared.models.coworking_images import CoworkingImage
+from shared.models.employer import Employer
+from tests.factories import hire, make_employee, make_space
+
+
+def add_spaces(session, count: int):
+    """count verified spaces around London, each with two images on its one package"""
+    spaces = [make_space(session, title=f"Hub {i}", latitude=51.5 + i * 0.001, longitude=-0.12) for i in range(count)]
+    session.add_all(
+        CoworkingImage(space_id=space.id, package_id="desk", image_url=f"/uploads/coworking_images/{space.id}-{n}.jpg")
+        for space in spaces for n in range(2)
+    )
+    session.commit()
+
+
+def test_nearby_spaces_take_constant_queries(employer_api, monkeypatch):
+    client, session, statements, headers = employer_api
+    employee = make_employee(session, "employee@example.com", 51.5, -0.12)
+    hire(session, session.query(Employer).one(), employee)
+
+    counts = []
+    # Both more than the stored top-K, so both are answered from the spatial index
+    for count in (TOP_K + 5, 2 * TOP_K):
+        add_spaces(session, count)
+        # A fresh index loads every space, so both sizes pay the same warm-up
+        monkeypatch.setattr(employer_routes, "verified_space_index", SpatialIndex(resync_interval=3600))
+        del statements[:]
+        response = client.get(
+            "/employer/coworking-spaces", params={"employee_id": employee.id, "max_distance_km": 50}, headers=headers
+        )
+        assert response.status_code == 200
+        assert len(response.json()) == session.query(CoworkingImage.space_id).distinct().count()
+        assert all(len(package["images"]) == 2 for space in response.json() for package in json.loads(space["packages"]))
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from migrations.add_hot_filter_indexes import INDEXES, migrate_database
+from scripts.check_query_plans import copy_schema, explain, full_scans, hot_queries
+from shared.database import Base
+
+HOT_QUERIES = hot_queries()
+
+
+def schema_engine(path=None):
+    engine = create_engine("sqlite://")
+    if path:
+        copy_schema(path, engine)
+    else:
+        Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.mark.parametrize("name,statement", HOT_QUERIES, ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_an_index(name, statement):
+    plan = explain(schema_engine(), statement)
+    assert not full_scans(plan), plan
+
+
+def test_migration_indexes_match_the_models():
+    declared = {
+        index.name: (table.name, tuple(column.name for column in index.columns))
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    for index_name, table, columns in INDEXES:
+        assert declared.get(index_name) == (table, columns)
+
+
+def test_migration_brings_an_old_database_up_to_date(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'second_hire.db'}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    conn = sqlite3.connect(tmp_path / "second_hire.db")
+    for index_name, _, _ in INDEXES:
+        conn.execute(f"DROP INDEX {index_name}")
+    conn.commit()
+    conn.close()
+
+    old = schema_engine(str(tmp_path / "second_hire.db"))
+    assert any(full_scans(explain(old, statement)) for _, statement in HOT_QUERIES)
+
+    monkeypatch.chdir(tmp_path)
+    assert migrate_database()
+    assert migrate_database()  # Safe to run again
+
+    migrated = schema_engine(str(tmp_path / "second_hire.db"))
+    for name, statement in HOT_QUERIES:
+        assert not full_scans(explain(migrated, statement)), name
@@ -0,0 +1,48 @@
+from app.utils.spatial_index import MAX_SEARCH_RADIUS_KM, SpatialIndex, nearest_by_expanding_radius
+
+
+def make_index(points) -> SpatialIndex:
+    index = SpatialIndex(resync_interval=3600)
+    index.rebuild(points)
+    return index
+
+
+def test_wide_query_visits_only_occupied_cells():
+    index = make_index([(1, 89.95, 10.0), (2, 51.5, -0.12), (3, -33.9, 151.2)])
+
+    # Reaches the pole, so the box spans every column: millions of grid cells, three occupied
+    cells = list(index._candidate_cells(89.9, 0.0, 500.0))
+    assert len(cells) == 1
+    assert [space_id for space_id, _ in index.query_radius(89.9, 0.0, 500.0)] == [1]
+    assert [space_id for space_id, _ in index.query_radius(0.0, 0.0, MAX_SEARCH_RADIUS_KM)] == [2, 1, 3]
+
+
+def test_query_nearest_stops_once_every_space_is_found():
+    index = make_index([(1, 51.5, -0.12), (2, 51.6, -0.1)])
+    radii = []
+    query_radius = index.query_radius
+
+    def counting_query(lat, lon, radius_km):
+        radii.append(radius_km)
+        return query_radius(lat, lon, radius_km)
+
+    index.query_radius = counting_query
+    assert [space_id for space_id, _ in index.query_nearest(51.5, -0.12, 10)] == [1, 2]
+    assert max(radii) < MAX_SEARCH_RADIUS_KM
+
+
+def test_expanding_radius_counts_before_keep():
+    def query(radius_km):
+        return [(1, 1.0), (2, 2.0)]
+
+    radii = []
+    matches = nearest_by_expanding_radius(
+        lambda radius_km: radii.append(radius_km) or query(radius_km),
+        5,
+        start_radius_km=10.0,
+        total=2,
+        keep=lambda matches: matches[1:]
+    )
+    assert matches == [(2, 2.0)]
+    assert radii == [10.0]
+    assert nearest_by_expanding_radius(query, 5, start_radius_km=10.0, total=0) == []
@@ -0,0 +1,121 @@
+"""The grouped task-performance aggregates return what the per-employee loops they replaced returned"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from employer_module.routes.employer import get_employee_task_performance, get_employees_task_performance
+from shared.models.employee import Employee
+from shared.models.employer_employee import EmployerEmployee
+from shared.models.task import TaskStatus
+from shared.models.task_assignment import TaskAssignment
+from tests.factories import assign_task, hire, make_employee, make_employer
+
+
+def reference_ranged_stats(db, employer_id, days):
+    """The per-employee loop get_employees_task_performance used to run"""
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days)
+    stats = {}
+    employees = db.query(Employee).join(EmployerEmployee).filter(EmployerEmployee.employer_id == employer_id)
+    for employee in employees:
+        assignments = db.query(TaskAssignment).filter(
+            TaskAssignment.employee_id == employee.id,
+            TaskAssignment.employer_id == employer_id,
+            TaskAssignment.assigned_at >= start_date,
+            TaskAssignment.assigned_at <= end_date
+        ).all()
+        counts = {status: sum(1 for a in assignments if a.task.status == status) for status in TaskStatus}
+        total = len(assignments)
+        stats[employee.id] = {
+            "employee_id": employee.id,
+            "employee_name": f"{employee.first_name} {employee.last_name}",
+            "first_name": employee.first_name,
+            "last_name": employee.last_name,
+            "completed_tasks": counts[TaskStatus.COMPLETED],
+            "in_progress_tasks": counts[TaskStatus.IN_PROGRESS],
+            "pending_tasks": counts[TaskStatus.PENDING],
+            "cancelled_tasks": counts[TaskStatus.CANCELLED],
+            "total_tasks": total,
+            "completion_rate": round(counts[TaskStatus.COMPLETED] / total * 100, 1) if total else 0
+        }
+    return stats
+
+
+def reference_comparison(db, employer_id):
+    """The per-employee, per-task loop get_employee_task_performance used to run"""
+    stats = {}
+    employees = db.query(Employee).join(EmployerEmployee).filter(EmployerEmployee.employer_id == employer_id)
+    for employee in employees:
+        assignments = [a for a in db.query(TaskAssignment).filter(TaskAssignment.employee_id == employee.id) if a.task.employer_id == employer_id]
+        completed = on_time = overdue = 0
+        completion_days = []
+        for assignment in assignments:
+            task = assignment.task
+            if task.status == TaskStatus.COMPLETED and assignment.completed_at:
+                completed += 1
+                if task.due_date:
+                    completion_days.append((assignment.completed_at.date() - assignment.assigned_at.date()).days)
+                    if assignment.completed_at <= task.due_date:
+                        on_time += 1
+                    else:
+                        overdue += 1
+            elif task.due_date and task.due_date < datetime.now() and task.status != TaskStatus.COMPLETED:
+                overdue += 1
+        total = len(assignments)
+        completion_rate = completed / total * 100 if total else 0
+        on_time_rate = on_time / completed * 100 if completed else 0
+        avg_days = sum(completion_days) / len(completion_days) if completion_days else 0
+        stats[employee.id] = {
+            "employee_id": employee.id,
+            "employee_name": f"{employee.first_name} {employee.last_name}",
+            "email": employee.email,
+            "total_tasks": total,
+            "completed_tasks": completed,
+            "completion_rate": round(completion_rate, 1),
+            "on_time_completions": on_time,
+            "on_time_rate": round(on_time_rate, 1),
+            "overdue_tasks": overdue,
+            "avg_completion_days": round(avg_days, 1),
+            "efficiency_score": round(completion_rate * 0.6 + on_time_rate * 0.4, 1)
+        }
+    return stats
+
+
+@pytest.fixture
+def team(db):
+    """An employer whose employees have tasks in every status, on time, late, overdue and out of range"""
+    employer = make_employer(db, "boss@example.com")
+    other = make_employer(db, "other@example.com")
+    busy, idle, late = (make_employee(db, f"{name}@example.com", 51.5, -0.12, first_name=name.title()) for name in ("busy", "idle", "late"))
+    for employee in (busy, idle, late):
+        hire(db, employer, employee)
+
+    now = datetime.now()
+    days_ago = lambda days: now - timedelta(days=days)
+    assign_task(db, employer, busy, TaskStatus.COMPLETED, days_ago(10), due_date=days_ago(2), completed_at=days_ago(3))
+    assign_task(db, employer, busy, TaskStatus.COMPLETED, days_ago(9), due_date=days_ago(5), completed_at=days_ago(1))
+    assign_task(db, employer, busy, TaskStatus.COMPLETED, days_ago(8), completed_at=days_ago(7))
+    assign_task(db, employer, busy, TaskStatus.IN_PROGRESS, days_ago(6), due_date=days_ago(1))
+    assign_task(db, employer, busy, TaskStatus.PENDING, days_ago(5), due_date=now + timedelta(days=3))
+    assign_task(db, employer, busy, TaskStatus.CANCELLED, days_ago(4))
+    assign_task(db, employer, busy, TaskStatus.COMPLETED, days_ago(90), due_date=days_ago(80), completed_at=days_ago(85))
+    assign_task(db, employer, late, TaskStatus.COMPLETED, days_ago(3), due_date=days_ago(20))
+    assign_task(db, employer, late, TaskStatus.PENDING, days_ago(40), due_date=days_ago(35))
+    # Another employer's task assigned to the same employee is not counted
+    assign_task(db, other, late, TaskStatus.COMPLETED, days_ago(2), due_date=days_ago(1), completed_at=days_ago(2))
+    return employer
+
+
+@pytest.mark.parametrize("days", [7, 30, 365])
+def test_ranged_stats_match_the_per_employee_loop(db, team, days):
+    payload = get_employees_task_performance(days=days, db=db, current={"role": "employer", "user": team})
+    assert {row["employee_id"]: row for row in payload["employees"]} == reference_ranged_stats(db, team.id, days)
+
+
+def test_comparison_matches_the_per_task_loop(db, team):
+    payload = get_employee_task_performance(db=db, current={"role": "employer", "user": team})
+    expected = reference_comparison(db, team.id)
+
+    assert {row["employee_id"]: row for row in payload["employees"]} == expected
+    assert [row["efficiency_score"] for row in payload["employees"]] == sorted((row["efficiency_score"] for row in expected.values()), reverse=True)
+    assert payload["summary"]["total_employees"] == 3
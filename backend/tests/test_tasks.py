@@ -0,0 +1,61 @@
+"""The task board loads in a fixed number of queries and pages through every task with the keyset cursor"""
+from datetime import datetime, timedelta
+
+from shared.models.employer import Employer
+from shared.models.task import TaskStatus
+from shared.models.task_assignment import TaskAssignment
+from tests.factories import assign_task, hire, make_employee
+
+
+def test_task_board_takes_constant_queries(employer_api):
+    client, session, statements, headers = employer_api
+    employer = session.query(Employer).one()
+    employees = [make_employee(session, f"e{i}@example.com", 51.5, -0.12) for i in range(3)]
+    for employee in employees:
+        hire(session, employer, employee)
+
+    counts = []
+    for count in (3, 30):
+        for index in range(count):
+            # Two assignees per task
+            assignment = assign_task(session, employer, employees[index % 3], TaskStatus.PENDING, datetime(2030, 1, 1))
+            session.add(TaskAssignment(
+                task_id=assignment.task_id, employee_id=employees[(index + 1) % 3].id,
+                employer_id=employer.id, assigned_by_id=employer.id
+            ))
+        session.commit()
+        del statements[:]
+        response = client.get("/employer/tasks", headers=headers)
+        assert response.status_code == 200
+        assert all(len(task["assigned_employees"]) == 2 for task in response.json())
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_cursor_pages_through_every_task_once(employer_api):
+    client, session, statements, headers = employer_api
+    employer = session.query(Employer).one()
+    employee = make_employee(session, "e@example.com", 51.5, -0.12)
+    hire(session, employer, employee)
+    base = datetime(2030, 1, 1)
+    # Pairs of tasks share a created_at, so pages must break ties on id
+    for index in range(11):
+        created_at = base + timedelta(hours=index // 2)
+        assign_task(session, employer, employee, TaskStatus.PENDING, created_at, created_at=created_at)
+
+    everything = [task["id"] for task in client.get("/employer/tasks", headers=headers).json()]
+    paged, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/employer/tasks", params=params, headers=headers)
+        assert response.status_code == 200
+        paged.append([task["id"] for task in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [len(page) for page in paged] == [3, 3, 3, 2]
+    assert [task_id for page in paged for task_id in page] == everything
+    assert len(set(everything)) == 11
+    assert client.get("/employer/tasks", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
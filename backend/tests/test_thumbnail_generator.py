@@ -0,0 +1,49 @@
+import pytest
+from PIL import Image, ImageChops, ImageStat
+
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+
+SIZES = {"small": ThumbnailGenerator.SMALL_SIZE, "medium": ThumbnailGenerator.MEDIUM_SIZE, "large": ThumbnailGenerator.LARGE_SIZE}
+
+
+def photo(path, size=(4000, 3000), mode="RGB"):
+    """A smooth gradient standing in for a camera photo"""
+    red = Image.linear_gradient("L").resize(size)
+    green = red.transpose(Image.Transpose.ROTATE_90).resize(size)
+    blue = Image.radial_gradient("L").resize(size)
+    bands = [red, green, blue] + ([Image.new("L", size, 128)] if mode == "RGBA" else [])
+    Image.merge(mode, bands).save(path)
+    return str(path)
+
+
+def generated(upload_dir, source, cascade, spy=None):
+    generator = ThumbnailGenerator(str(upload_dir), cascade=cascade)
+    if spy is not None:
+        create = generator._create_thumbnail
+        generator._create_thumbnail = lambda img, size: spy.append(img.size) or create(img, size)
+    urls = generator.generate_thumbnails(source, "photo")
+    return {name: Image.open(upload_dir / "thumbnails" / name / "photo.jpg").convert("RGB") for name in urls}
+
+
+def test_cascade_decodes_once_and_resamples_the_large_thumbnail(tmp_path):
+    source = photo(tmp_path / "photo.jpg")
+    inputs = []
+
+    thumbs = generated(tmp_path / "cascade", source, cascade=True, spy=inputs)
+
+    # The decoder shrank the 4000x3000 original to 1/2 scale, still at least twice the large size
+    assert inputs == [(2000, 1500), SIZES["large"], SIZES["large"]]
+    assert {name: thumb.size for name, thumb in thumbs.items()} == SIZES
+
+
+@pytest.mark.parametrize("filename,mode", [("photo.jpg", "RGB"), ("photo.png", "RGBA")])
+def test_cascade_matches_full_resolution_thumbnails(tmp_path, filename, mode):
+    source = photo(tmp_path / filename, mode=mode)
+
+    cascade = generated(tmp_path / "cascade", source, cascade=True)
+    direct = generated(tmp_path / "direct", source, cascade=False)
+
+    for name, size in SIZES.items():
+        assert cascade[name].size == direct[name].size == size
+        difference = ImageStat.Stat(ImageChops.difference(cascade[name], direct[name])).mean
+        assert max(difference) < 2, (name, difference)
@@ -0,0 +1,107 @@
+from concurrent.futures import Future
+
+import coworking_module.utils.thumbnail_jobs as thumbnail_jobs
+from coworking_module.utils.thumbnail_generator import ThumbnailGenerator
+from coworking_module.utils.thumbnail_jobs import (
+    THUMBNAIL_FAILED, THUMBNAIL_PENDING, THUMBNAIL_READY, _record_result, requeue_pending
+)
+from shared.models.coworking_images import CoworkingImage
+from shared.models.image_blob import ImageBlob
+from tests.factories import make_space
+
+URLS = {"small": "/uploads/s.jpg", "medium": "/uploads/m.jpg", "large": "/uploads/l.jpg"}
+
+
+def finished(result=None, error=None) -> Future:
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def stored_blob(db, sha="abc", images=2):
+    blob = ImageBlob(sha256=sha, filename=f"{sha}.jpg", content_type="image/jpeg", size=10,
+                     ref_count=images, thumbnail_status=THUMBNAIL_PENDING)
+    db.add(blob)
+    db.flush()
+    space = make_space(db)
+    for _ in range(images):
+        db.add(CoworkingImage(space_id=space.id, image_url=f"/uploads/coworking_images/{sha}.jpg",
+                              blob_id=blob.id, thumbnail_status=THUMBNAIL_PENDING))
+    db.commit()
+    return blob
+
+
+def test_finished_job_marks_the_blob_and_its_images_ready(db):
+    blob = stored_blob(db)
+
+    _record_result(ImageBlob, blob.id, "uploads", "abc", finished(URLS))
+
+    db.expire_all()
+    for row in [db.get(ImageBlob, blob.id)] + db.query(CoworkingImage).all():
+        assert row.thumbnail_status == THUMBNAIL_READY
+        assert (row.thumbnail_small_url, row.thumbnail_medium_url, row.thumbnail_url) == (
+            URLS["small"], URLS["medium"], URLS["large"]
+        )
+
+
+def test_failed_job_marks_the_blob_and_its_images_failed(db):
+    blob = stored_blob(db)
+
+    _record_result(ImageBlob, blob.id, "uploads", "abc", finished(error=OSError("cannot identify image file")))
+
+    db.expire_all()
+    for row in [db.get(ImageBlob, blob.id)] + db.query(CoworkingImage).all():
+        assert row.thumbnail_status == THUMBNAIL_FAILED
+        assert row.thumbnail_error == "cannot identify image file"
+        assert row.thumbnail_url is None
+
+
+def test_thumbnails_of_a_deleted_blob_are_removed(db, monkeypatch):
+    deleted = []
+    monkeypatch.setattr(ThumbnailGenerator, "delete_thumbnails", lambda self, base: deleted.append(base))
+    blob = stored_blob(db, images=0)
+    db.delete(blob)
+    db.commit()
+
+    _record_result(ImageBlob, blob.id, "uploads", "abc", finished(URLS))
+    assert deleted == ["abc"]
+
+    # A newer blob that reused the id keeps its pending state
+    newer = stored_blob(db, sha="def", images=0)
+    assert newer.id == blob.id
+    _record_result(ImageBlob, newer.id, "uploads", "abc", finished(URLS))
+    db.expire_all()
+    assert db.get(ImageBlob, newer.id).thumbnail_status == THUMBNAIL_PENDING
+
+
+def test_cancelled_job_leaves_rows_pending(db):
+    blob = stored_blob(db)
+    future = Future()
+    future.cancel()
+
+    _record_result(ImageBlob, blob.id, "uploads", "abc", future)
+
+    db.expire_all()
+    assert db.get(ImageBlob, blob.id).thumbnail_status == THUMBNAIL_PENDING
+
+
+def test_requeue_pending_submits_pending_blobs_and_legacy_images(db, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(thumbnail_jobs, "_submit", lambda model, row_id, path, upload_dir: submitted.append((model, row_id, path)))
+    blob = stored_blob(db)
+    done = stored_blob(db, sha="done", images=1)
+    done.thumbnail_status = THUMBNAIL_READY
+    space = make_space(db)
+    legacy = CoworkingImage(space_id=space.id, image_url="/uploads/coworking_images/old.png", thumbnail_status=THUMBNAIL_PENDING)
+    finished_legacy = CoworkingImage(space_id=space.id, image_url="/uploads/coworking_images/older.png")
+    db.add_all([legacy, finished_legacy])
+    db.commit()
+
+    assert requeue_pending("uploads/coworking_images") == 2
+    assert sorted(submitted, key=lambda job: job[2]) == [
+        (ImageBlob, blob.id, "uploads/coworking_images/abc.jpg"),
+        (CoworkingImage, legacy.id, "uploads/coworking_images/old.png"),
+    ]
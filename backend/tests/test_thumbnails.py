@@ -0,0 +1,55 @@
+import importlib
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from coworking_module.routes import images
+from coworking_module.routes.images import accepted_types
+
+
+def test_accepted_types_skip_wildcards_and_refusals():
+    accept = "image/avif;q=0, image/webp;q=0.8, IMAGE/PNG, image/*;q=0.5, */*;q=0.1, image/jpeg;q=oops"
+    assert accepted_types(accept) == {"image/webp": 0.8, "image/png": 1.0}
+    assert accepted_types("") == {}
+
+
+@pytest.fixture
+def thumbnails(tmp_path, monkeypatch):
+    """A client for the thumbnail route, run in a directory holding desk.jpg and its WebP copy"""
+    monkeypatch.chdir(tmp_path)
+    directory = os.path.join(images.THUMBNAILS_DIR, "medium")
+    os.makedirs(directory)
+    for extension in ("jpg", "webp"):
+        with open(os.path.join(directory, f"desk.{extension}"), "wb") as f:
+            f.write(extension.encode())
+    app = FastAPI()
+    app.include_router(images.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("accept, content_type", [
+    ("image/avif,image/webp,*/*", "image/webp"),  # no AVIF copy, so the next accepted format
+    ("image/avif,image/*", "image/jpeg"),  # a wildcard does not promise WebP
+    ("image/webp;q=0,*/*", "image/jpeg"),
+    ("", "image/jpeg"),
+])
+def test_thumbnail_falls_back_to_jpeg(thumbnails, accept, content_type):
+    response = thumbnails.get("/uploads/coworking_images/thumbnails/medium/desk.jpg", headers={"Accept": accept})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+    assert response.headers["vary"] == "Accept"
+
+
+@pytest.mark.parametrize("module", ["app.main", "app.main_admin", "app.main_coworking", "app.main_employer"])
+def test_apps_negotiate_thumbnails_ahead_of_the_uploads_mount(module, thumbnails):
+    # Not entered as a context manager, so startup jobs do not run
+    client = TestClient(importlib.import_module(module).app)
+    response = client.get("/uploads/coworking_images/thumbnails/medium/desk.jpg", headers={"Accept": "image/webp"})
+    assert response.headers["content-type"] == "image/webp"
+
+    # Originals are still served by the static mount
+    with open(os.path.join("uploads", "coworking_images", "desk.png"), "wb") as f:
+        f.write(b"png")
+    assert client.get("/uploads/coworking_images/desk.png").content == b"png"
@@ -0,0 +1,126 @@
+import asyncio
+
+from app.utils.maps_client import AsyncMapsClient
+from app.utils.travel_time import MAX_DESTINATIONS_PER_REQUEST, TravelTimeService
+from tests.maps_stub import MapsStub
+
+ORIGIN = (51.5, -0.12)
+
+
+def destinations(count: int):
+    return [(i, 51.5 + i * 0.001, -0.1) for i in range(count)]
+
+
+def matrix_response(path, params):
+    """One OK element per destination; destination i is i km and i minutes away"""
+    elements = []
+    for destination in params["destinations"].split("|"):
+        index = round((float(destination.split(",")[0]) - 51.5) / 0.001)
+        elements.append({
+            "status": "OK",
+            "distance": {"text": f"{index} km", "value": index * 1000},
+            "duration": {"text": f"{index} mins", "value": index * 60}
+        })
+    return 200, {"status": "OK", "rows": [{"elements": elements}]}
+
+
+def lookup(service: TravelTimeService, count: int):
+    async def run():
+        try:
+            return await service.travel_times(*ORIGIN, destinations(count))
+        finally:
+            await service.client.aclose()
+    return asyncio.run(run())
+
+
+def make_service(stub: MapsStub) -> TravelTimeService:
+    client = AsyncMapsClient(api_key="test-key", base_url=stub.base_url, retries=2, backoff_base=0)
+    return TravelTimeService(client)
+
+
+def test_destinations_are_batched_per_request_limit():
+    with MapsStub(matrix_response) as stub:
+        service = make_service(stub)
+        results = lookup(service, MAX_DESTINATIONS_PER_REQUEST + 5)
+
+    assert sorted(len(params["destinations"].split("|")) for _, params in stub.requests) == [5, MAX_DESTINATIONS_PER_REQUEST]
+    assert all(path == "/distancematrix/json" for path, _ in stub.requests)
+    assert results[7]["duration_value"] == 7 * 60
+
+
+def test_cached_destinations_are_not_fetched_again():
+    with MapsStub(matrix_response) as stub:
+        service = make_service(stub)
+        lookup(service, 10)
+        results = lookup(service, 12)
+
+    assert service.requests_sent == 2
+    assert len(stub.requests[1][1]["destinations"].split("|")) == 2
+    assert results[11]["duration_value"] == 11 * 60
+
+
+def test_failed_batch_is_not_cached():
+    failing = {"on": True}
+
+    def respond(path, params):
+        if failing["on"]:
+            return 500, {"error_message": "backend error"}
+        return matrix_response(path, params)
+
+    with MapsStub(respond) as stub:
+        service = make_service(stub)
+        assert lookup(service, 3) == {0: None, 1: None, 2: None}
+
+        failing["on"] = False
+        results = lookup(service, 3)
+
+    assert service.requests_sent == 2
+    assert results[2]["duration_value"] == 2 * 60
+
+
+def test_unreachable_destination_is_cached():
+    def respond(path, params):
+        status, body = matrix_response(path, params)
+        body["rows"][0]["elements"][0] = {"status": "ZERO_RESULTS"}
+        return status, body
+
+    with MapsStub(respond) as stub:
+        service = make_service(stub)
+        assert lookup(service, 2)[0] is None
+        assert lookup(service, 2)[0] is None
+
+    assert service.requests_sent == 1
+
+
+def test_exact_origin_is_sent_and_cell_is_shared():
+    with MapsStub(matrix_response) as stub:
+        service = make_service(stub)
+        lookup(service, 3)
+
+        async def nearby():
+            try:
+                # Same ~1 km cell as ORIGIN, so answered from the cache
+                return await service.travel_times(ORIGIN[0] + 0.001, ORIGIN[1] + 0.001, destinations(3))
+            finally:
+                await service.client.aclose()
+        results = asyncio.run(nearby())
+
+    assert [params["origins"] for _, params in stub.requests] == [f"{ORIGIN[0]},{ORIGIN[1]}"]
+    assert results[2]["duration_value"] == 2 * 60
+
+
+def test_concurrent_batches_are_limited():
+    service = TravelTimeService(client=None, max_concurrent_batches=2)
+    state = {"in_flight": 0, "peak": 0}
+
+    async def fetch_batch(origin, points, mode):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return [None] * len(points)
+
+    service._fetch_batch = fetch_batch
+    asyncio.run(service.travel_times(*ORIGIN, destinations(MAX_DESTINATIONS_PER_REQUEST * 5)))
+
+    assert state["peak"] == 2
@@ -481,6 +481,7 @@ const StripePaymentComponent = ({
       
       const bookingPayload = {
         coworking_space_id: parseInt(coworkingSpace.id),
+        package_id: selectedPackage?.id != null ? String(selectedPackage.id) : null,
         booking_type: bookingType, // Use the extracted bookingType instead of bookingData.bookingType
         start_date: bookingData.startDate,
         end_date: isOngoing ? 